@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""
+A client for the Energy Charts API.
+
+The public names are resolved on first access (PEP 562), so `import app` loads none of the
+submodules and `from app import EnergyChartsAPI, Countries` only loads the client: NumPy,
+pandas and requests are imported when a DataFrame, an array or an HTTP session is first needed.
+
+Example:
+    from app import Countries, EnergyChartsAPI
+
+    signal = EnergyChartsAPI().get_signal(Countries.GERMANY)
+"""
+
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+# Public name -> submodule defining it
+_EXPORTS = {
+    "EnergyChartsAPI": "app.api",
+    "APIRequestError": "app.exceptions",
+    "ValidationError": "app.exceptions",
+    "AsyncEnergyChartsAPI": "app.async_api",
+    "BindingZones": "app.enums",
+    "ChunkSize": "app.enums",
+    "Countries": "app.enums",
+    "Endpoints": "app.enums",
+    "ForecastType": "app.enums",
+    "ProductionType": "app.enums",
+    "Regions": "app.enums",
+    "SubTypes": "app.enums",
+    "TimeSteps": "app.enums",
+    "MemoryCache": "app.cache",
+    "SQLiteCache": "app.cache",
+    "RequestScheduler": "app.scheduler",
+    "Priority": "app.scheduler",
+    "TransportConfig": "app.transport",
+    "make_dataframe": "app.parser",
+    "make_panel": "app.parser",
+    "RangeStore": "app.store",
+    "LiveFeedPoller": "app.poller",
+    "VintageStore": "app.vintages",
+    "FlowNetwork": "app.flows",
+    "MarketPanel": "app.analytics",
+    "FrequencyArchive": "app.archive",
+    "BatchParser": "app.batch",
+}
+
+__all__ = [
+    "APIRequestError",
+    "AsyncEnergyChartsAPI",
+    "BatchParser",
+    "BindingZones",
+    "ChunkSize",
+    "Countries",
+    "Endpoints",
+    "EnergyChartsAPI",
+    "FlowNetwork",
+    "ForecastType",
+    "FrequencyArchive",
+    "LiveFeedPoller",
+    "MarketPanel",
+    "MemoryCache",
+    "Priority",
+    "ProductionType",
+    "RangeStore",
+    "Regions",
+    "RequestScheduler",
+    "SQLiteCache",
+    "SubTypes",
+    "TimeSteps",
+    "TransportConfig",
+    "ValidationError",
+    "VintageStore",
+    "make_dataframe",
+    "make_panel",
+]
+
+if TYPE_CHECKING:
+    from app.analytics import MarketPanel
+    from app.api import EnergyChartsAPI
+    from app.archive import FrequencyArchive
+    from app.async_api import AsyncEnergyChartsAPI
+    from app.batch import BatchParser
+    from app.cache import MemoryCache, SQLiteCache
+    from app.enums import (
+        BindingZones,
+        ChunkSize,
+        Countries,
+        Endpoints,
+        ForecastType,
+        ProductionType,
+        Regions,
+        SubTypes,
+        TimeSteps,
+    )
+    from app.exceptions import APIRequestError, ValidationError
+    from app.flows import FlowNetwork
+    from app.parser import make_dataframe, make_panel
+    from app.poller import LiveFeedPoller
+    from app.scheduler import Priority, RequestScheduler
+    from app.store import RangeStore
+    from app.transport import TransportConfig
+    from app.vintages import VintageStore
+
+
+def __getattr__(name: str):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(_EXPORTS[name]), name)
+    globals()[name] = value  # later lookups bypass __getattr__
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *__all__})
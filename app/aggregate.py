@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+"""
+This module downsamples time series of the Energy Charts API into fixed buckets while they are fetched.
+
+Classes:
+    Aggregator: Accumulates bucket statistics over consecutive chunks of a series.
+
+Statistics are computed with NumPy reductions over the bucket boundaries of every chunk and
+combined with the partial buckets of previous chunks, so the full-resolution series never has to
+be held in memory at once.
+"""
+
+from datetime import timedelta
+
+import numpy as np
+
+from app.chunking import numeric_columns
+
+# Available statistics per bucket
+STATISTICS = ("mean", "min", "max", "sum", "count", "energy", "weighted_mean")
+
+
+class Aggregator:
+    """Streaming bucket statistics for one or more aligned series.
+
+    The 'energy' statistic integrates every value over the time until the next sample and
+    multiplies by `energy_scale`, e.g. 1e-3 to turn MW into GWh. The last sample of a chunk is
+    first integrated over the median spacing of the chunk and corrected to the actual gap when
+    the following chunk arrives, so chunked updates give the same energy as one update; only the
+    last sample of the series keeps the median spacing. The 'weighted_mean' statistic requires weights, e.g. the load
+    for a load-weighted average price.
+
+    Example:
+        aggregator = Aggregator(timedelta(minutes=1), stats=("mean", "min", "max"))
+        for response in api.iter_range(Endpoints.FREQUENCY, start, end, region="UCTE"):
+            aggregator.update_response(response)
+        minutes = aggregator.result()
+    """
+
+    def __init__(
+        self,
+        step: int | timedelta,
+        stats: tuple[str, ...] = ("mean", "min", "max"),
+        energy_scale: float = 1e-3,
+        origin: int = 0,
+    ):
+        """
+        Parameters:
+            step (int | timedelta): The bucket size, in seconds if given as int.
+            stats (tuple[str, ...]): The statistics to compute, see STATISTICS.
+            energy_scale (float): Factor turning value-hours into the energy unit.
+            origin (int): UNIX timestamp of a bucket boundary, e.g. to align days to local time.
+        """
+        unknown = set(stats) - set(STATISTICS)
+        if unknown:
+            raise ValueError(f"Unsupported statistics: {sorted(unknown)}")
+        self.step = int(step.total_seconds()) if isinstance(step, timedelta) else int(step)
+        self.stats = tuple(stats)
+        self.energy_scale = energy_scale
+        self.origin = origin
+        self._buckets = np.empty(0, dtype=np.int64)
+        # Per series: (sum, count, min, max, energy, weighted sum, weight sum) arrays per bucket
+        self._state: dict[str, np.ndarray] = {}
+        # The last sample so far as (second, integrated hours, values by series name)
+        self._last: tuple[int, float, dict[str, float]] | None = None
+
+    def update(
+        self,
+        seconds: np.ndarray | list[int],
+        columns: dict[str, np.ndarray | list],
+        weights: np.ndarray | list | None = None,
+    ) -> None:
+        """Adds a chunk of samples.
+
+        Parameters:
+            seconds (np.ndarray | list[int]): The UNIX timestamps of the samples.
+            columns (dict[str, np.ndarray | list]): The values by series name.
+            weights (np.ndarray | list | None): Optional weights for 'weighted_mean'.
+        """
+        seconds = np.asarray(seconds, dtype=np.int64)
+        if not len(seconds):
+            return
+        order = np.argsort(seconds, kind="stable")
+        seconds = seconds[order]
+        ids = (seconds - self.origin) // self.step
+        starts = np.flatnonzero(np.r_[True, ids[1:] != ids[:-1]])
+        buckets = ids[starts]
+
+        spacing = np.diff(seconds)
+        last = np.median(spacing) if len(spacing) else 0
+        hours = np.r_[spacing, last] / 3600
+        self._correct_last(int(seconds[0]))
+        weights = None if weights is None else np.asarray(weights, dtype=np.float64)[order]
+
+        chunk = {}
+        for name, values in columns.items():
+            values = np.asarray(values, dtype=np.float64)[order]
+            valid = ~np.isnan(values)
+            filled = np.where(valid, values, 0.0)
+            state = np.empty((7, len(buckets)))
+            state[0] = np.add.reduceat(filled, starts)
+            state[1] = np.add.reduceat(valid, starts)
+            state[2] = np.fmin.reduceat(values, starts)
+            state[3] = np.fmax.reduceat(values, starts)
+            state[4] = np.add.reduceat(filled * hours, starts) * self.energy_scale
+            if weights is not None:
+                weighted = valid & ~np.isnan(weights)
+                state[5] = np.add.reduceat(np.where(weighted, values * weights, 0.0), starts)
+                state[6] = np.add.reduceat(np.where(weighted, weights, 0.0), starts)
+            else:
+                state[5:] = 0.0
+            chunk[name] = state
+        self._combine(buckets, chunk)
+        if self._last is None or seconds[-1] > self._last[0]:
+            tail = {name: np.asarray(v, dtype=np.float64)[order][-1] for name, v in columns.items()}
+            self._last = (int(seconds[-1]), hours[-1], tail)
+
+    def _correct_last(self, first: int) -> None:
+        """Integrates the last sample of the previous chunks up to the first sample of a new
+        chunk instead of over the median spacing."""
+        if self._last is None or first <= self._last[0]:
+            return
+        second, hours, values = self._last
+        correction = (first - second) / 3600 - hours
+        chunk = {}
+        for name, value in values.items():
+            state = np.zeros((7, 1))
+            state[2:4] = np.nan
+            state[4] = 0.0 if np.isnan(value) else value * correction * self.energy_scale
+            chunk[name] = state
+        self._combine(np.array([(second - self.origin) // self.step]), chunk)
+        self._last = None
+
+    def update_response(self, response: dict | None, weights: str | None = None) -> None:
+        """Adds all numeric series of a time-series response, optionally weighted by one of them."""
+        if not response:
+            return
+        names, columns = numeric_columns(response)
+        columns = dict(zip(names, columns))
+        self.update(response["unix_seconds"], columns, columns.get(weights) if weights else None)
+
+    def _combine(self, buckets: np.ndarray, chunk: dict[str, np.ndarray]) -> None:
+        """Merges the statistics of a chunk into the accumulated buckets."""
+        if not len(self._buckets) and not self._state:
+            self._buckets, self._state = buckets, chunk
+            return
+        merged, inverse = np.unique(np.r_[self._buckets, buckets], return_inverse=True)
+        old, new = inverse[: len(self._buckets)], inverse[len(self._buckets) :]
+        for name in self._state.keys() | chunk.keys():
+            state = np.zeros((7, len(merged)))
+            state[2], state[3] = np.inf, -np.inf
+            for positions, part in ((old, self._state.get(name)), (new, chunk.get(name))):
+                if part is None:
+                    continue
+                for row in (0, 1, 4, 5, 6):
+                    np.add.at(state[row], positions, part[row])
+                np.fmin.at(state[2], positions, part[2])
+                np.fmax.at(state[3], positions, part[3])
+            state[2][np.isinf(state[2])] = np.nan
+            state[3][np.isinf(state[3])] = np.nan
+            self._state[name] = state
+        self._buckets = merged
+
+    def result(self) -> dict:
+        """Returns the statistics as a response with 'unix_seconds' of the bucket starts and one
+        '<series>_<statistic>' array per series and statistic."""
+        result = {"unix_seconds": self._buckets * self.step + self.origin}
+        with np.errstate(invalid="ignore", divide="ignore"):
+            for name, state in self._state.items():
+                values = {
+                    "mean": state[0] / state[1],
+                    "min": state[2],
+                    "max": state[3],
+                    "sum": state[0],
+                    "count": state[1],
+                    "energy": state[4],
+                    "weighted_mean": state[5] / state[6],
+                }
+                for stat in self.stats:
+                    result[f"{name}_{stat}"] = values[stat]
+        return result
@@ -0,0 +1,434 @@
+# -*- coding: utf-8 -*-
+"""
+This module provides vectorized market analytics across bidding zones.
+
+Classes:
+    MarketPanel: Day-ahead prices, generation and installed capacity of many bidding zones on
+        one time grid, with capture prices, market values, negative-price and curtailment hours
+        and capacity factors per zone, period and production type.
+
+Prices (EUR/MWh) are step functions: a price applies until the next price of its zone, so
+hourly and 15-minute zones share a grid. Generation (MW) is averaged over each grid interval.
+All metrics are computed on (zone, time, series) arrays at once.
+"""
+
+import logging
+from collections.abc import Iterable
+from enum import Enum
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from app.api import EnergyChartsAPI
+from app.capabilities import CapabilityTable
+from app.chunking import collect_series
+from app.enums import BindingZones, Countries, Endpoints, TimeSteps
+from app.timeaxis import parse_labels
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Countries whose production makes up each bidding zone.
+# The production of all countries of a zone is summed, e.g. DE-LU = Germany + Luxembourg.
+ZONE_COUNTRIES: dict[BindingZones, tuple[Countries, ...]] = {
+    BindingZones.AUSTRIA: (Countries.AUSTRIA,),
+    BindingZones.BELGIUM: (Countries.BELGIUM,),
+    BindingZones.SWITZERLAND: (Countries.SWITZERLAND,),
+    BindingZones.CZECH_REPUBLIC: (Countries.CZECH_REPUBLIC,),
+    BindingZones.GERMANY_LUXEMBOURG: (Countries.GERMANY, Countries.LUXEMBOURG),
+    BindingZones.GERMANY_AUSTRIA_LUXEMBOURG: (
+        Countries.GERMANY,
+        Countries.AUSTRIA,
+        Countries.LUXEMBOURG,
+    ),
+    BindingZones.DENMARK_1: (Countries.DENMARK,),
+    BindingZones.DENMARK_2: (Countries.DENMARK,),
+    BindingZones.FRANCE: (Countries.FRANCE,),
+    BindingZones.HUNGARY: (Countries.HUNGARY,),
+    BindingZones.ITALY_NORTH: (Countries.ITALY,),
+    BindingZones.NETHERLANDS: (Countries.NETHERLANDS,),
+    BindingZones.NORWAY_2: (Countries.NORWAY,),
+    BindingZones.POLAND: (Countries.POLAND,),
+    BindingZones.SWEDEN_4: (Countries.SWEDEN,),
+    BindingZones.SLOVENIA: (Countries.SLOVENIA,),
+}
+
+# Zones that cover only part of their country: their production is that of the whole country,
+# so their capture prices are approximations.
+PARTIAL_ZONES = frozenset(
+    {
+        BindingZones.DENMARK_1,
+        BindingZones.DENMARK_2,
+        BindingZones.ITALY_NORTH,
+        BindingZones.NORWAY_2,
+        BindingZones.SWEDEN_4,
+    }
+)
+
+# Production types analysed by default, as named in the public_power responses
+DEFAULT_SERIES = ("Solar", "Wind onshore", "Wind offshore")
+
+# Period lengths as NumPy datetime units
+PERIODS = {"year": "Y", "month": "M", "day": "D"}
+
+
+def _key(value: Enum | str) -> str:
+    return value.value if isinstance(value, Enum) else value
+
+
+def _interval_hours(grid: np.ndarray) -> np.ndarray:
+    """Returns the length of each grid interval in hours; the last one repeats the median."""
+    spacing = np.diff(grid)
+    last = np.median(spacing) if len(spacing) else 3600
+    return np.r_[spacing, last] / 3600
+
+
+def _member_sum(parts: list[np.ndarray]) -> np.ndarray:
+    """Sums the blocks of the countries of a zone, ignoring NaN; NaN only where every country
+    is NaN, e.g. a series that a member country does not publish counts as zero for it."""
+    stacked = np.stack(parts)
+    total = np.nansum(stacked, axis=0)
+    total[np.isnan(stacked).all(axis=0)] = np.nan
+    return total
+
+
+def step_align(seconds: np.ndarray, values: np.ndarray, grid: np.ndarray) -> np.ndarray:
+    """Samples a step function (each value holds until the next timestamp, the last one for
+    one median step) at the grid timestamps; NaN outside of it."""
+    if not len(seconds):
+        return np.full(len(grid), np.nan)
+    end = seconds[-1] + (np.median(np.diff(seconds)) if len(seconds) > 1 else 3600)
+    positions = np.searchsorted(seconds, grid, side="right") - 1
+    inside = (positions >= 0) & (grid < end)
+    aligned = np.full(len(grid), np.nan)
+    aligned[inside] = values[positions[inside]]
+    return aligned
+
+
+def mean_align(seconds: np.ndarray, values: np.ndarray, grid: np.ndarray) -> np.ndarray:
+    """Aligns samples to the grid intervals [grid[i], grid[i + 1]), ignoring NaN.
+
+    Intervals containing samples get their mean, e.g. 15-minute generation on an hourly grid.
+    Intervals without samples keep the value of the last sample before them while it lasts
+    (until the next sample, at most one median sample spacing), e.g. hourly generation on a
+    15-minute grid.
+
+    Parameters:
+        seconds (np.ndarray): (n,) sorted timestamps of the samples.
+        values (np.ndarray): (n, s) samples.
+        grid (np.ndarray): (t,) interval starts.
+
+    Returns:
+        np.ndarray: (t, s) values, NaN for intervals without a sample covering them.
+    """
+    end = grid[-1] + _interval_hours(grid)[-1] * 3600 if len(grid) else 0
+    bins = np.searchsorted(grid, seconds, side="right") - 1
+    inside = (bins >= 0) & (seconds < end)
+    columns = values.shape[1]
+    valid = ~np.isnan(values[inside])
+    flat = bins[inside][:, None] * columns + np.arange(columns)
+    size = len(grid) * columns
+    sums = np.bincount(flat[valid], values[inside][valid], minlength=size)
+    counts = np.bincount(flat[valid], minlength=size)
+    with np.errstate(invalid="ignore"):
+        means = (sums / counts).reshape(len(grid), columns)
+    if not len(seconds):
+        return means
+
+    # Hold coarser samples over the grid intervals they cover
+    spacing = np.median(np.diff(seconds)) if len(seconds) > 1 else 3600
+    until = np.minimum(np.r_[seconds[1:], seconds[-1] + spacing], seconds + spacing)
+    positions = np.searchsorted(seconds, grid, side="right") - 1
+    covered = (positions >= 0) & (grid < until[np.clip(positions, 0, None)])
+    held = np.full((len(grid), columns), np.nan)
+    held[covered] = values[positions[covered]]
+    return np.where(counts.reshape(len(grid), columns) > 0, means, held)
+
+
+class MarketPanel:
+    """Prices, generation and installed capacity of bidding zones on a shared time grid.
+
+    Attributes:
+        zones (list[str]): The bidding zone codes along the first axis.
+        series (list[str]): The production types along the last axis.
+        unix_seconds (np.ndarray): (t,) the grid.
+        prices (np.ndarray): (zone, t) day-ahead prices in EUR/MWh.
+        generation (np.ndarray): (zone, t, series) mean generation in MW.
+        capacity_seconds (np.ndarray): (k,) the start times of the capacity values.
+        capacity (np.ndarray): (zone, k, series) installed capacity in MW, valid from
+            capacity_seconds until the next value.
+
+    Example:
+        panel = MarketPanel.fetch(api, BindingZones, "2024-01-01", "2025-01-01")
+        metrics = panel.metrics("year")
+        metrics["capture_price"]  # (zone, year, series)
+    """
+
+    def __init__(
+        self,
+        zones: list[str],
+        series: list[str],
+        unix_seconds: np.ndarray,
+        prices: np.ndarray,
+        generation: np.ndarray,
+        capacity_seconds: np.ndarray | None = None,
+        capacity: np.ndarray | None = None,
+    ):
+        self.zones = zones
+        self.series = series
+        self.unix_seconds = unix_seconds
+        self.prices = prices
+        self.generation = generation
+        self.capacity_seconds = (
+            capacity_seconds if capacity_seconds is not None else np.empty(0, dtype=np.int64)
+        )
+        self.capacity = capacity if capacity is not None else np.empty((len(zones), 0, len(series)))
+
+    @classmethod
+    def from_responses(
+        cls,
+        prices: dict[BindingZones | str, dict | None],
+        power: dict[Countries | str, dict | None],
+        installed: dict[Countries | str, dict | None] | None = None,
+        series: Iterable[str] = DEFAULT_SERIES,
+        capacity_scale: float = 1e3,
+    ) -> "MarketPanel":
+        """Aligns price, power and installed power responses of many zones.
+
+        Parameters:
+            prices (dict): get_price responses by bidding zone.
+            power (dict): get_public_power or get_total_power responses by country.
+            installed (dict | None): get_installed_power responses by country.
+            series (Iterable[str]): The production types, matched case-insensitively.
+            capacity_scale (float): Factor from the installed power unit to the generation
+                unit, 1e3 for GW to MW.
+
+        Returns:
+            MarketPanel: The panel; zones without a price response are left out.
+        """
+        series = list(series)
+        wanted = {name.lower(): i for i, name in enumerate(series)}
+        prices = {_key(zone): response for zone, response in prices.items() if response}
+        power = {_key(country): response for country, response in power.items() if response}
+        zones = list(prices)
+
+        seconds = [np.asarray(r["unix_seconds"], dtype=np.int64) for r in prices.values()]
+        grid = np.unique(np.concatenate(seconds or [np.empty(0, np.int64)]))
+        price_block = np.full((len(zones), len(grid)), np.nan)
+        for row, (zone_seconds, response) in enumerate(zip(seconds, prices.values())):
+            values = np.asarray(
+                [np.nan if v is None else v for v in response["price"]], dtype=np.float64
+            )
+            price_block[row] = step_align(zone_seconds, values, grid)
+
+        def columns(response: dict, length: int) -> np.ndarray:
+            block = np.full((length, len(series)), np.nan)
+            for name, values in zip(*collect_series(response)):
+                if (column := wanted.get(str(name).lower())) is not None:
+                    values = np.asarray(
+                        [np.nan if v is None else v for v in values[:length]], dtype=np.float64
+                    )
+                    block[: len(values), column] = values
+            return block
+
+        # Generation per country on the grid, summed per zone
+        aligned = {}
+        for country, response in power.items():
+            country_seconds = np.asarray(response["unix_seconds"], dtype=np.int64)
+            block = columns(response, len(country_seconds))
+            aligned[country] = mean_align(country_seconds, block, grid)
+        generation = np.full((len(zones), len(grid), len(series)), np.nan)
+        for row, zone in enumerate(zones):
+            parts = [
+                aligned[c.value]
+                for c in ZONE_COUNTRIES.get(BindingZones(zone), ())
+                if c.value in aligned
+            ]
+            if parts:
+                generation[row] = _member_sum(parts)
+
+        capacity_seconds, capacity = None, None
+        if installed:
+            installed = {
+                _key(c): r
+                for c, r in installed.items()
+                if r and r.get("time") is not None and len(r["time"])
+            }
+            labels = {c: parse_labels(r["time"]) for c, r in installed.items()}
+            capacity_seconds = np.unique(np.concatenate([*labels.values(), np.empty(0, np.int64)]))
+            per_country = {}
+            for country, response in installed.items():
+                filled = np.full((len(capacity_seconds), len(series)), np.nan)
+                filled[np.searchsorted(capacity_seconds, labels[country])] = columns(
+                    response, len(labels[country])
+                )
+                per_country[country] = filled * capacity_scale
+            capacity = np.full((len(zones), len(capacity_seconds), len(series)), np.nan)
+            for row, zone in enumerate(zones):
+                # A zone's capacity is only known if it is known for all of its countries
+                members = ZONE_COUNTRIES.get(BindingZones(zone), ())
+                if members and all(c.value in per_country for c in members):
+                    capacity[row] = _member_sum([per_country[c.value] for c in members])
+
+        return cls(zones, series, grid, price_block, generation, capacity_seconds, capacity)
+
+    @classmethod
+    def fetch(
+        cls,
+        api: EnergyChartsAPI,
+        zones: Iterable[BindingZones],
+        start: str,
+        end: str,
+        series: Iterable[str] = DEFAULT_SERIES,
+        total: bool = False,
+        capacity: bool = True,
+    ) -> "MarketPanel":
+        """Fetches prices, generation and installed power of many zones concurrently.
+
+        Parameters:
+            api (EnergyChartsAPI): The client.
+            zones (Iterable[BindingZones]): The bidding zones.
+            start (str): Start of the data range, see EnergyChartsAPI.get_price.
+            end (str): End of the data range in the same formats as start.
+            series (Iterable[str]): The production types.
+            total (bool): If true, uses get_total_power instead of get_public_power.
+            capacity (bool): If true, fetches the yearly installed power for capacity factors;
+                countries whose installed power cannot be fetched get NaN capacity factors.
+
+        Returns:
+            MarketPanel: The panel.
+        """
+        zones = list(zones)
+        countries = list(dict.fromkeys(c for z in zones for c in ZONE_COUNTRIES.get(z, ())))
+        method = api.get_total_power if total else api.get_public_power
+        prices = api.get_many(api.get_price, zones, start, end)
+        power = api.get_many(method, countries, start, end)
+        installed = None
+        if capacity:
+            table = api.capabilities if api.capabilities is not None else CapabilityTable()
+            yearly, _ = table.plan(Endpoints.INSTALLED_POWER, countries, time_step=TimeSteps.YEARLY)
+
+            def installed_power(country: Countries) -> dict | None:
+                # The time step can only be chosen for some countries; the others are yearly
+                time_step = TimeSteps.YEARLY.value if country in yearly else None
+                try:
+                    return api.get(
+                        Endpoints.INSTALLED_POWER,
+                        country=country.value,
+                        time_step=time_step,
+                        installation_decommission=False,
+                    )
+                except Exception:
+                    logger.warning("No installed power for %s", country.value, exc_info=True)
+                    return None
+
+            installed = api.get_many(installed_power, countries)
+        return cls.from_responses(prices, power, installed, series)
+
+    def metrics(self, period: str | None = "year") -> dict[str, np.ndarray | list[str]]:
+        """Computes the market metrics of every zone, period and production type.
+
+        Parameters:
+            period (str | None): 'year', 'month' or 'day', or None for the whole grid.
+
+        Returns:
+            dict: 'zones', 'series', 'period_start' (p,) UNIX seconds, and the arrays
+                - 'baseload_price' (zone, p): time-weighted mean price in EUR/MWh,
+                - 'negative_price_hours' (zone, p): hours with a price below zero,
+                - 'energy' (zone, p, series): generation in MWh,
+                - 'revenue' (zone, p, series): market revenue in EUR,
+                - 'capture_price' (zone, p, series): generation-weighted price in EUR/MWh,
+                - 'value_factor' (zone, p, series): capture price / baseload price,
+                - 'curtailment_hours' (zone, p, series): hours with a price at or below zero
+                  while the production type generates, i.e. when it is likely curtailed,
+                - 'capacity_factor' (zone, p, series): energy / (capacity * hours), NaN
+                  without installed power data.
+        """
+        grid = self.unix_seconds
+        if period is None or not len(grid):
+            starts = np.zeros(min(len(grid), 1), dtype=np.int64)
+        else:
+            labels = grid.astype("datetime64[s]").astype(f"datetime64[{PERIODS[period]}]")
+            starts = np.flatnonzero(np.r_[True, labels[1:] != labels[:-1]])
+        period_start = grid[starts]
+
+        hours = _interval_hours(grid)
+        prices, generation = self.prices, self.generation
+        priced = ~np.isnan(prices)
+        generating = ~np.isnan(generation) & priced[:, :, None]
+        energy_parts = np.where(generating, generation, 0.0) * hours[None, :, None]
+        price_filled = np.where(priced, prices, 0.0)
+
+        def total(values: np.ndarray) -> np.ndarray:
+            return np.add.reduceat(values, starts, axis=1) if len(starts) else values[:, :0]
+
+        priced_hours = total(priced * hours)
+        energy = total(energy_parts)
+        revenue = total(energy_parts * price_filled[:, :, None])
+        with np.errstate(invalid="ignore", divide="ignore"):
+            baseload = total(price_filled * hours) / priced_hours
+            capture = revenue / energy
+            value_factor = capture / baseload[:, :, None]
+
+            period_hours = total(np.broadcast_to(hours, prices.shape).astype(np.float64))
+            capacity = self._capacity_at(period_start)
+            capacity_factor = energy / (capacity * period_hours[:, :, None])
+
+        negative = total(np.where(priced & (prices < 0), hours, 0.0))
+        curtailed = total(
+            np.where(
+                generating & (price_filled <= 0)[:, :, None] & (generation > 0),
+                hours[None, :, None],
+                0.0,
+            )
+        )
+        return {
+            "zones": self.zones,
+            "series": self.series,
+            "period_start": period_start,
+            "baseload_price": baseload,
+            "negative_price_hours": negative,
+            "energy": energy,
+            "revenue": revenue,
+            "capture_price": capture,
+            "value_factor": value_factor,
+            "curtailment_hours": curtailed,
+            "capacity_factor": capacity_factor,
+        }
+
+    def _capacity_at(self, seconds: np.ndarray) -> np.ndarray:
+        """Returns the (zone, p, series) installed capacity valid at the given times."""
+        if not len(self.capacity_seconds):
+            return np.full((len(self.zones), len(seconds), len(self.series)), np.nan)
+        positions = np.searchsorted(self.capacity_seconds, seconds, side="right") - 1
+        capacity = self.capacity[:, np.clip(positions, 0, None)]
+        capacity[:, positions < 0] = np.nan
+        return capacity
+
+    def to_pandas(self, metrics: dict | None = None) -> "pd.DataFrame":
+        """Returns metrics as a tidy DataFrame with one row per zone, period and series.
+
+        Parameters:
+            metrics (dict | None): The result of metrics(), computed per year if None.
+        """
+        import pandas as pd
+
+        metrics = self.metrics() if metrics is None else metrics
+        zones, periods, series = len(self.zones), len(metrics["period_start"]), len(self.series)
+        per_zone = ("baseload_price", "negative_price_hours")
+        per_series = ("energy", "revenue", "capture_price", "value_factor")
+        per_series += ("curtailment_hours", "capacity_factor")
+        frame = {
+            "zone": np.repeat(self.zones, periods * series),
+            "period_start": pd.to_datetime(
+                np.tile(np.repeat(metrics["period_start"], series), zones), unit="s"
+            ),
+            "series": np.tile(self.series, zones * periods),
+        }
+        for name in per_zone:
+            frame[name] = np.repeat(metrics[name].ravel(), series)
+        for name in per_series:
+            frame[name] = metrics[name].ravel()
+        return pd.DataFrame(frame)
@@ -7,12 +7,21 @@ Classes:
     EnergyChartsAPI: A derived class that provides specific methods for accessing various endpoints of the Energy Charts API.
 """
 
-from typing import Any
-
-import requests
-
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from enum import Enum
+from typing import TYPE_CHECKING, Any
+
+from app import instrumentation
+from app.cache import MemoryCache, SQLiteCache, make_key, ttl_for
+from app.capabilities import CapabilityTable
 from app.enums import (
     BindingZones,
+    ChunkSize,
     Countries,
     Endpoints,
     ForecastType,
@@ -21,39 +30,422 @@ from app.enums import (
     SubTypes,
     TimeSteps,
 )
+from app.exceptions import APIRequestError, ValidationError
+from app.scheduler import INTERACTIVE_ENDPOINTS, Priority, RequestScheduler
+from app.singleflight import SingleFlight
+from app.transport import TransportConfig, TransportStats, ValidatorStore
 
+if TYPE_CHECKING:
+    import pandas as pd
+    import requests
 
-class ValidationError(Exception):
-    """Raised for validation errors when the API returns a 422 status code."""
-
-
-class APIRequestError(Exception):
-    """Raised for unexpected API errors or non-200/422 status codes."""
+# NumPy, pandas and requests are imported where they are first needed, so that importing the
+# client stays cheap for short-lived processes; see benchmarks/bench_import.py.
 
 
 class _BaseEnergyChartsAPI:
     BASE_URL = "https://api.energy-charts.info"
 
-    def __init__(self):
-        self.session = requests.Session()
+    # Window sizes used in chunked mode; endpoints not listed here are split into months.
+    DEFAULT_CHUNK_SIZES = {Endpoints.FREQUENCY: ChunkSize.DAY}
+
+    # Number of bytes read from the socket at a time in streaming mode
+    STREAM_CHUNK_SIZE = 2**16
+
+    def __init__(
+        self,
+        chunked: bool = False,
+        chunk_sizes: dict[Endpoints, ChunkSize | timedelta] | None = None,
+        max_workers: int = 4,
+        cache: MemoryCache | SQLiteCache | None = None,
+        stream: bool = False,
+        typed: bool = False,
+        scheduler: RequestScheduler | None = None,
+        transport: TransportConfig | None = None,
+        coalesce: bool = False,
+        capabilities: CapabilityTable | None = None,
+    ):
+        """
+        Parameters:
+            chunked (bool): If true, long time ranges are split into windows that are fetched
+                            concurrently and merged into one response.
+            chunk_sizes (dict[Endpoints, ChunkSize | timedelta] | None): Window sizes per
+                            endpoint, overriding DEFAULT_CHUNK_SIZES.
+            max_workers (int): Maximum number of concurrent requests in chunked mode.
+            cache (MemoryCache | SQLiteCache | None): Optional cache for successful responses.
+            stream (bool): If true, responses are decoded incrementally from the socket and
+                            arrays of numbers are returned as NumPy arrays, see app.streaming.
+            typed (bool): If true, responses are returned as NumPy-backed result objects that
+                            behave like read-only dictionaries, see app.results.
+            scheduler (RequestScheduler | None): Optional scheduler applying a rate limit,
+                            bounded concurrency, priority lanes and retries to all requests.
+            transport (TransportConfig | None): Connection pool, keep-alive, compression,
+                            timeout and revalidation settings, defaults to TransportConfig().
+            coalesce (bool): If true, concurrent calls with the same endpoint and parameters
+                            share one request in flight and its result or exception.
+            capabilities (CapabilityTable | None): Optional capability table; unsupported
+                            parameters raise a ValidationError before any request is sent, start/end
+                            values are normalized, and the outcomes of requests are recorded
+                            for CapabilityTable.refreshed().
+        """
+        self.chunked = chunked
+        self.cache = cache
+        self.stream = stream
+        self.typed = typed
+        self.scheduler = scheduler
+        self.chunk_sizes = {**self.DEFAULT_CHUNK_SIZES, **(chunk_sizes or {})}
+        self.max_workers = max_workers
+        self.transport = transport or TransportConfig()
+        self.transport_stats = TransportStats()
+        self.validators = ValidatorStore(
+            self.transport.max_validators, self.transport.max_validator_bytes
+        )
+        self.flights = SingleFlight() if coalesce else None
+        self.capabilities = capabilities
+        self._session = None
+        self._session_lock = threading.Lock()
+        # Number of windows a get_range/iter_range call may fetch concurrently in this thread
+        self._fan_out = threading.local()
+
+    @property
+    def session(self) -> "requests.Session":
+        """The HTTP session, created on first use."""
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    import requests
+
+                    session = requests.Session()
+                    # Keep at least one pooled connection per worker so that concurrent windows
+                    # reuse them
+                    self.transport.configure(session, min_pool_size=self.max_workers)
+                    self._session = session
+        return self._session
+
+    @session.setter
+    def session(self, session) -> None:
+        self._session = session
+
+    @property
+    def _window_workers(self) -> int:
+        """The number of windows fetched concurrently by a call in the current thread."""
+        return getattr(self._fan_out, "workers", self.max_workers)
+
+    @property
+    def cache_hits(self) -> int:
+        """Number of requests answered from the cache."""
+        return self.cache.hits if self.cache is not None else 0
+
+    @property
+    def cache_misses(self) -> int:
+        """Number of requests that were not found in the cache."""
+        return self.cache.misses if self.cache is not None else 0
+
+    @property
+    def coalesced_requests(self) -> int:
+        """Number of requests that shared the result of an identical request in flight."""
+        return self.flights.suppressed if self.flights is not None else 0
 
     def get(
         self, endpoint: Endpoints, **kwargs: dict[str, str | bool | int]
     ) -> dict[str, Any] | None:
-        url = f"{self.BASE_URL}/{endpoint.value}"
+        return self._result(self._fetch(endpoint, **kwargs))
+
+    def _result(self, data: dict[str, Any] | None) -> dict[str, Any] | None:
+        if not self.typed:
+            return data
+        from app.results import wrap_response
+
+        return wrap_response(data)
+
+    def _fetch(
+        self,
+        endpoint: Endpoints,
+        priority: Priority | None = None,
+        **kwargs: dict[str, str | bool | int],
+    ) -> dict[str, Any] | None:
         params = {k: v for k, v in kwargs.items() if v is not None}  # Skip None values
-        response = self.session.get(url, params=params)
+        if self.capabilities is not None:
+            params = self.capabilities.validate(endpoint, params)
+        key = make_key(endpoint, params)
+        if self.cache is not None and (cached := self.cache.get(key)) is not None:
+            return cached
+        if self.flights is not None:
+            return self.flights.do(key, lambda: self._request(endpoint, priority, key, params))
+        return self._request(endpoint, priority, key, params)
+
+    def _request(
+        self,
+        endpoint: Endpoints,
+        priority: Priority | None,
+        key: str,
+        params: dict[str, str | bool | int],
+    ) -> dict[str, Any] | None:
+        url = f"{self.BASE_URL}/{endpoint.value}"
+        headers = self.validators.headers(key) if self.transport.conditional else {}
+        data = None
+        if (instruments := instrumentation.active()) is not None:
+            started = instruments.before_request(endpoint, params)
+
+        sent, backoff = 0.0, 0.0
+
+        def waited(delay: float) -> None:
+            nonlocal backoff
+            backoff += delay
+
+        def send(headers: dict[str, str]) -> "requests.Response":
+            def call() -> "requests.Response":
+                nonlocal sent
+                if instruments is not None:
+                    sent = time.perf_counter()
+                try:
+                    return self.session.get(
+                        url,
+                        params=params,
+                        headers=headers,
+                        stream=self.stream,
+                        timeout=self.transport.timeout,
+                    )
+                except Exception as error:
+                    if instruments is not None:
+                        instruments.failed_attempt(endpoint, error)
+                    raise
+
+            if self.scheduler is None:
+                return call()
+            return self.scheduler.run(call, priority, waited if instruments is not None else None)
+
+        if priority is None:
+            interactive = endpoint in INTERACTIVE_ENDPOINTS
+            priority = Priority.INTERACTIVE if interactive else Priority.BULK
+
+        try:
+            response = send(headers)
+            if response.status_code == 304 and self.validators.data(key) is None:
+                # The validated response has been evicted meanwhile: fetch it unconditionally
+                response.close()
+                response = send({})
+        except Exception as error:
+            if instruments is not None:
+                instruments.failed_request(endpoint, params, error, started, backoff)
+            raise
+        if instruments is not None:
+            received = time.perf_counter()
+        if self.capabilities is not None:
+            self.capabilities.observe(endpoint, params, response.status_code)
+
         match response.status_code:
             case 200:
-                return response.json()
-            case 422:
-                raise ValidationError(response.json())
+                if self.stream:
+                    from app.streaming import decode_stream
+
+                    body = response.iter_content(chunk_size=self.STREAM_CHUNK_SIZE)
+                    decoded = 0
+
+                    def counted(chunks):
+                        nonlocal decoded
+                        for chunk in chunks:
+                            decoded += len(chunk)
+                            yield chunk
+
+                    data = decode_stream(counted(body))
+                else:
+                    decoded = len(response.content)
+                    data = response.json()
+                self.transport_stats.record(response, decoded)
+                if self.transport.conditional:
+                    self.validators.store(key, response, data, decoded)
+            case 304 if (data := self.validators.data(key)) is not None:
+                decoded = 0
+                self.transport_stats.record(response, decoded)
             case _:
-                raise APIRequestError(f"Unexpected status code: {response.status_code}")
+                decoded = len(response.content)
+                self.transport_stats.record(response, decoded)
+        if instruments is not None:
+            ttfb = response.elapsed.total_seconds()
+            instruments.after_request(
+                endpoint,
+                params,
+                response.status_code,
+                ttfb,
+                started,
+                received,
+                decoded,
+                self.stream,
+                sent,
+                backoff,
+            )
+
+        if response.status_code == 422:
+            raise ValidationError(response.json())
+        # A 304 without data means that the validated response was evicted again meanwhile
+        if response.status_code != 200 and data is None:
+            raise APIRequestError(f"Unexpected status code: {response.status_code}")
+
+        if self.cache is not None:
+            self.cache.set(key, data, ttl_for(endpoint, params))
+        return data
+
+    def get_range(
+        self, endpoint: Endpoints, start: str, end: str, **kwargs: dict[str, str | bool | int]
+    ) -> dict[str, Any] | None:
+        """Queries a time-series endpoint, splitting the range into windows in chunked mode."""
+        if not self.chunked:
+            return self.get(endpoint, start=start, end=end, **kwargs)
+
+        from app.chunking import merge_responses, split_range
+
+        windows = split_range(start, end, self.chunk_sizes.get(endpoint, ChunkSize.MONTH))
+        if len(windows) <= 1:
+            return self.get(endpoint, start=start, end=end, **kwargs)
+        with ThreadPoolExecutor(max_workers=min(self._window_workers, len(windows))) as pool:
+            responses = pool.map(
+                lambda window: self._fetch(
+                    endpoint, Priority.BULK, start=window[0], end=window[1], **kwargs
+                ),
+                windows,
+            )
+            return self._result(merge_responses(list(responses)))
+
+    def iter_range(
+        self, endpoint: Endpoints, start: str, end: str, **kwargs: dict[str, str | bool | int]
+    ) -> Iterator[dict[str, Any]]:
+        """Yields the raw responses of the windows of a time range in order, without overlaps.
+
+        The windows are fetched concurrently, but at most `max_workers` of them are held at a time.
+        """
+        from app.chunking import slice_response, split_range
+
+        windows = split_range(start, end, self.chunk_sizes.get(endpoint, ChunkSize.MONTH))
+        workers = self._window_workers
+        last = None
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            pending = deque()
+            for window in [*windows, None]:  # None drains the remaining windows
+                if window is not None:
+                    lower, upper = window
+                    pending.append(
+                        pool.submit(
+                            self._fetch, endpoint, Priority.BULK, start=lower, end=upper, **kwargs
+                        )
+                    )
+                while pending and (window is None or len(pending) >= workers):
+                    response = pending.popleft().result()
+                    if not response or not len(response.get("unix_seconds", [])):
+                        continue
+                    if last is not None:  # drop the boundary shared with the previous window
+                        response = slice_response(response, last + 1, response["unix_seconds"][-1])
+                    if len(response["unix_seconds"]):
+                        last = int(response["unix_seconds"][-1])
+                        yield response
+
+    def aggregate(
+        self,
+        endpoint: Endpoints,
+        start: str,
+        end: str,
+        step: int | timedelta,
+        stats: tuple[str, ...] = ("mean", "min", "max"),
+        weights: str | None = None,
+        energy_scale: float = 1e-3,
+        **kwargs: dict[str, str | bool | int],
+    ) -> dict[str, Any]:
+        """Queries a time-series endpoint and downsamples it into buckets while fetching.
+
+        Only the bucket statistics are kept, so e.g. a month of per-second frequency data is
+        reduced to minute statistics without ever holding the full series.
+
+        Example:
+            api.aggregate(Endpoints.FREQUENCY, "2024-01-01", "2024-02-01", timedelta(minutes=1),
+                          region=Regions.UCTE.value)
+
+        Parameters:
+            endpoint (Endpoints): A time-series endpoint.
+            start (str): Start date of the data range in the formats accepted by the API.
+            end (str): End date of the data range in the same formats as start.
+            step (int | timedelta): The bucket size, in seconds if given as int.
+            stats (tuple[str, ...]): The statistics to compute, see aggregate.STATISTICS.
+            weights (str | None): Name of the series used as weights for 'weighted_mean'.
+            energy_scale (float): Factor turning value-hours into the energy unit, e.g. 1e-3
+                                  for MW to GWh.
+            **kwargs: Further query parameters of the endpoint.
+
+        Returns:
+            dict[str, Any]: 'unix_seconds' of the bucket starts and one '<series>_<statistic>'
+                array per series and statistic.
+        """
+        from app.aggregate import Aggregator
+
+        aggregator = Aggregator(step, stats, energy_scale)
+        for response in self.iter_range(endpoint, start, end, **kwargs):
+            aggregator.update_response(response, weights)
+        return aggregator.result()
 
 
 class EnergyChartsAPI(_BaseEnergyChartsAPI):
-    """A class for interacting with the Energy Charts API."""
+    """A class for interacting with the Energy Charts API.
+
+    The time-series methods (get_public_power, get_total_power, get_frequency, get_cbet,
+    get_cbpf and get_price) support the chunked mode, see _BaseEnergyChartsAPI.
+    """
+
+    def get_many(
+        self, method: Callable[..., dict | None], targets: Iterable[Enum], *args: Any, **kwargs: Any
+    ) -> dict[Enum, dict | None]:
+        """Calls one endpoint method for many countries, zones or regions concurrently.
+
+        At most `max_workers` requests are in flight: in chunked mode, the workers are split
+        between the targets and the windows of each target.
+
+        Parameters:
+            method (Callable): A bound endpoint method of this client, e.g. `api.get_price`.
+            targets (Iterable[Enum]): The values passed as first argument, e.g. BindingZones members.
+            *args, **kwargs: Further arguments passed to every call.
+
+        Returns:
+            dict[Enum, dict | None]: The responses by target, in input order.
+        """
+        targets = list(targets)
+        if not targets:
+            return {}
+        workers = min(self.max_workers, len(targets))
+        window_workers = max(1, self.max_workers // workers)
+
+        def call(target: Enum) -> dict | None:
+            self._fan_out.workers = window_workers
+            try:
+                return method(target, *args, **kwargs)
+            finally:
+                del self._fan_out.workers
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return dict(zip(targets, pool.map(call, targets)))
+
+    def get_panel(
+        self,
+        method: Callable[..., dict | None],
+        targets: Iterable[Enum],
+        *args: Any,
+        layout: str = "wide",
+        **kwargs: Any,
+    ) -> "pd.DataFrame":
+        """Fetches one time-series endpoint for many targets and combines them into one DataFrame.
+
+        Example:
+            prices = api.get_panel(api.get_price, BindingZones, "2024-01-01", "2024-01-31")
+
+        Parameters:
+            method (Callable): A bound time-series method of this client, e.g. `api.get_price`.
+            targets (Iterable[Enum]): The values passed as first argument, e.g. Countries members.
+            *args, **kwargs: Further arguments passed to every call.
+            layout (str): 'wide' or 'long', see parser.make_panel.
+
+        Returns:
+            pd.DataFrame: The combined data of all targets.
+        """
+        from app.parser import make_panel
+
+        return make_panel(self.get_many(method, targets, *args, **kwargs), layout=layout)
 
     def get_public_power(
         self, country: Countries, start: str, end: str, subtype: SubTypes | None = None
@@ -77,7 +469,7 @@ class EnergyChartsAPI(_BaseEnergyChartsAPI):
                     "deprecated": bool
                 }
         """
-        return self.get(
+        return self.get_range(
             Endpoints.PUBLIC_POWER,
             country=country.value,
             start=start,
@@ -144,7 +536,7 @@ class EnergyChartsAPI(_BaseEnergyChartsAPI):
                 "deprecated": bool
             }
         """
-        return self.get(Endpoints.TOTAL_POWER, country=country.value, start=start, end=end)
+        return self.get_range(Endpoints.TOTAL_POWER, country=country.value, start=start, end=end)
 
     def get_installed_power(
         self, country: Countries, time_step: TimeSteps, installation_decommission: bool
@@ -193,7 +585,7 @@ class EnergyChartsAPI(_BaseEnergyChartsAPI):
                 "deprecated": bool
             }
         """
-        return self.get(Endpoints.FREQUENCY, region=region.value, start=start, end=end)
+        return self.get_range(Endpoints.FREQUENCY, region=region.value, start=start, end=end)
 
     def get_cbet(self, country: Countries, start: str, end: str) -> dict | None:
         """
@@ -219,7 +611,7 @@ class EnergyChartsAPI(_BaseEnergyChartsAPI):
                 "deprecated": bool
             }
         """
-        return self.get(Endpoints.CBET, country=country.value, start=start, end=end)
+        return self.get_range(Endpoints.CBET, country=country.value, start=start, end=end)
 
     def get_cbpf(self, country: Countries, start: str, end: str) -> dict | None:
         """
@@ -245,7 +637,7 @@ class EnergyChartsAPI(_BaseEnergyChartsAPI):
                 "deprecated": bool
             }
         """
-        return self.get(Endpoints.CBPF, country=country.value, start=start, end=end)
+        return self.get_range(Endpoints.CBPF, country=country.value, start=start, end=end)
 
     def get_price(self, bzn: BindingZones, start, end) -> dict | None:
         """Returns the day-ahead spot market price for a specified bidding zone in EUR/MWh.
@@ -266,7 +658,7 @@ class EnergyChartsAPI(_BaseEnergyChartsAPI):
                 "deprecated": bool
             }
         """
-        return self.get(Endpoints.PRICE, bzn=bzn.value, start=start, end=end)
+        return self.get_range(Endpoints.PRICE, bzn=bzn.value, start=start, end=end)
 
     def get_signal(self, country: Countries, postal_code: str) -> dict | None:
         """
@@ -0,0 +1,402 @@
+# -*- coding: utf-8 -*-
+"""
+This module provides a local, memory-mapped archive of per-second frequency data.
+
+Classes:
+    ArchiveSlice: A fixed-step run of archived values, usually a view of a month file.
+    FrequencyArchive: Append-only binary files per region and month with minute and hour
+        summaries and a small JSON header index.
+
+Layout of an archive directory:
+    index.json                   header index: dtype, step and the extent of every month file
+    <region>/<yyyy-mm>.bin       one value per second from the start of the month (UTC), NaN
+                                 where no value was received
+    <region>/<yyyy-mm>.minute    (min, max, mean, count) per minute as float32
+    <region>/<yyyy-mm>.hour      (min, max, mean, count) per hour as float32
+
+A second's position in its month file follows from its timestamp, so slicing a time range is an
+offset computation on a memory map, without reading or copying the values. Files only grow; the
+summaries of the touched minutes and hours are recomputed on every write, so plotting a year
+reads 8,784 hour rows instead of 31.6 million seconds.
+"""
+
+import json
+import os
+import threading
+from collections.abc import Iterator
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+from app.api import EnergyChartsAPI
+from app.enums import Endpoints, Regions
+from app.timerange import to_unix
+
+# Version of the file layout, stored in the header index
+VERSION = 1
+
+# Spacing of the archived values in seconds
+STEP = 1
+
+# Summary resolutions: file suffix -> seconds per row
+RESOLUTIONS = {"minute": 60, "hour": 3600}
+
+# Columns of the summary files
+SUMMARY_COLUMNS = ("min", "max", "mean", "count")
+
+_INDEX = "index.json"
+
+
+def _month(second: int) -> str:
+    return str(np.datetime64(int(second), "s").astype("datetime64[M]"))
+
+
+def _month_start(month: str) -> int:
+    return int(np.datetime64(month, "M").astype("datetime64[s]").astype(np.int64))
+
+
+def _next_month(month: str) -> str:
+    return str(np.datetime64(month, "M") + 1)
+
+
+def summarize(values: np.ndarray, width: int) -> np.ndarray:
+    """Returns the (min, max, mean, count) rows of consecutive groups of `width` values.
+
+    NaN values are ignored; groups without values have NaN statistics and a count of 0.
+    """
+    rows = -(-len(values) // width)
+    padded = np.full(rows * width, np.nan, dtype=np.float64)
+    padded[: len(values)] = values
+    groups = padded.reshape(rows, width)
+    valid = ~np.isnan(groups)
+    count = valid.sum(axis=1)
+    summary = np.empty((rows, len(SUMMARY_COLUMNS)), dtype=np.float32)
+    summary[:, 0] = np.fmin.reduce(groups, axis=1)
+    summary[:, 1] = np.fmax.reduce(groups, axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        summary[:, 2] = np.where(valid, groups, 0.0).sum(axis=1) / count
+    summary[:, 3] = count
+    return summary
+
+
+@dataclass
+class ArchiveSlice:
+    """Values at `start`, `start + step`, ... with NaN for missing seconds.
+
+    Attributes:
+        start (int): UNIX timestamp of the first value.
+        step (int): The spacing in seconds.
+        values (np.ndarray): The values; a read-only view of the archive file where possible.
+    """
+
+    start: int
+    step: int
+    values: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    @property
+    def end(self) -> int:
+        """UNIX timestamp after the last value."""
+        return self.start + self.step * len(self.values)
+
+    @property
+    def seconds(self) -> np.ndarray:
+        """The timestamps of the values, materialized on access."""
+        return self.start + self.step * np.arange(len(self.values), dtype=np.int64)
+
+    def to_response(self) -> dict:
+        """Returns the slice in the schema of EnergyChartsAPI.get_frequency, without gaps."""
+        valid = ~np.isnan(self.values)
+        return {"unix_seconds": self.seconds[valid], "data": np.asarray(self.values[valid])}
+
+
+class FrequencyArchive:
+    """An archive of per-second frequency data in memory-mapped month files.
+
+    Example:
+        archive = FrequencyArchive("data/frequency")
+        archive.ingest(EnergyChartsAPI(), Regions.UCTE, "2023-01-01", "2025-01-01")
+        hours = archive.summary(Regions.UCTE, "2024-01-01", "2025-01-01", "hour")
+        seconds = archive.slice(Regions.UCTE, "2024-03-01T12:00Z", "2024-03-01T13:00Z")
+    """
+
+    def __init__(self, root: str | Path, dtype: str = "float32"):
+        """
+        Parameters:
+            root (str | Path): The archive directory, created if missing.
+            dtype (str): The value type of a new archive; an existing archive keeps its own.
+                float32 resolves about 4 µHz at 50 Hz at half the size of float64.
+        """
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._maps: dict[Path, np.memmap] = {}
+        path = self.root / _INDEX
+        if path.exists():
+            with open(path) as file:
+                self.index = json.load(file)
+            if self.index["version"] != VERSION:
+                raise ValueError(f"Unsupported archive version {self.index['version']}")
+        else:
+            self.index = {
+                "version": VERSION,
+                "dtype": np.dtype(dtype).str,
+                "step": STEP,
+                "files": {},
+            }
+            self._save_index()
+        self.dtype = np.dtype(self.index["dtype"])
+
+    def months(self, region: Regions | str) -> list[str]:
+        """Returns the archived months of a region as 'yyyy-mm', in order."""
+        prefix = f"{self._region(region)}/"
+        return sorted(
+            name[len(prefix) :] for name in self.index["files"] if name.startswith(prefix)
+        )
+
+    def extent(self, region: Regions | str) -> tuple[int, int] | None:
+        """Returns the [start, end) UNIX seconds between the first and the last archived value."""
+        region = self._region(region)
+        headers = [h for name, h in self.index["files"].items() if name.startswith(f"{region}/")]
+        headers = [h for h in headers if h["valid"]]
+        if not headers:
+            return None
+        return min(h["first"] for h in headers), max(h["last"] for h in headers) + STEP
+
+    def write(
+        self, region: Regions | str, seconds: np.ndarray | list, values: np.ndarray | list
+    ) -> int:
+        """Writes values at their timestamps, overwriting values already archived there.
+
+        Parameters:
+            region (Regions | str): The region.
+            seconds (np.ndarray | list): UNIX timestamps, rounded down to the archive step.
+            values (np.ndarray | list): The values; None and NaN mark missing seconds.
+
+        Returns:
+            int: The number of values written.
+        """
+        region = self._region(region)
+        seconds = np.asarray(seconds, dtype=np.int64)
+        values = np.asarray(
+            [np.nan if v is None else v for v in values] if isinstance(values, list) else values,
+            dtype=np.float64,
+        )
+        if not len(seconds):
+            return 0
+        months = seconds.astype("datetime64[s]").astype("datetime64[M]")
+        boundaries = np.flatnonzero(np.r_[True, months[1:] != months[:-1], True])
+        with self._lock:
+            for lower, upper in zip(boundaries[:-1], boundaries[1:]):
+                self._write_month(
+                    region, str(months[lower]), seconds[lower:upper], values[lower:upper]
+                )
+            self._save_index()
+        return len(seconds)
+
+    def ingest(
+        self,
+        api: EnergyChartsAPI,
+        region: Regions,
+        start: str,
+        end: str,
+        resume: bool = True,
+    ) -> int:
+        """Fetches the frequency of a region window by window and archives it.
+
+        Only one window of the range is held in memory at a time (see EnergyChartsAPI.iter_range).
+
+        Parameters:
+            api (EnergyChartsAPI): The client.
+            region (Regions): The region.
+            start (str): Start of the range in a format accepted by the API.
+            end (str): End of the range in the same formats as start.
+            resume (bool): If true, starts after the last archived value when that lies inside
+                the range, so an interrupted ingestion continues where it stopped.
+
+        Returns:
+            int: The number of values written.
+        """
+        lower, upper = int(to_unix(start)), int(to_unix(end))
+        extent = self.extent(region)
+        if resume and extent is not None and lower <= extent[1] - STEP < upper:
+            lower = extent[1]
+        written = 0
+        if lower >= upper:
+            return written
+        for response in api.iter_range(
+            Endpoints.FREQUENCY, str(lower), str(upper), region=self._region(region)
+        ):
+            written += self.write(region, response["unix_seconds"], response["data"])
+        return written
+
+    def iter_slices(
+        self, region: Regions | str, start: str | int, end: str | int
+    ) -> Iterator[ArchiveSlice]:
+        """Yields the archived values of [start, end) as zero-copy views, one per month file.
+
+        Months without a file are skipped; the slices are clipped to the archived seconds.
+        """
+        region = self._region(region)
+        lower, upper = int(to_unix(start)), int(to_unix(end))
+        month = _month(lower)
+        while _month_start(month) < upper:
+            path = self._path(region, month, "bin")
+            header = self.index["files"].get(f"{region}/{month}")
+            if header is not None:
+                origin = _month_start(month)
+                first = max(lower - origin, 0) // STEP
+                last = min(-(-(upper - origin) // STEP), header["length"])
+                if first < last:
+                    values = self._map(path, (header["length"],))[first:last]
+                    values.flags.writeable = False
+                    yield ArchiveSlice(origin + first * STEP, STEP, values)
+            month = _next_month(month)
+
+    def slice(self, region: Regions | str, start: str | int, end: str | int) -> ArchiveSlice:
+        """Returns the archived values of [start, end), clipped to the archived seconds.
+
+        The values are a read-only view of the month file when the range lies in one month;
+        ranges across months are copied into one array with NaN for missing seconds.
+        """
+        slices = list(self.iter_slices(region, start, end))
+        if not slices:
+            return ArchiveSlice(int(to_unix(start)), STEP, np.empty(0, dtype=self.dtype))
+        if len(slices) == 1:
+            return slices[0]
+        values = np.full((slices[-1].end - slices[0].start) // STEP, np.nan, dtype=self.dtype)
+        for part in slices:
+            offset = (part.start - slices[0].start) // STEP
+            values[offset : offset + len(part)] = part.values
+        return ArchiveSlice(slices[0].start, STEP, values)
+
+    def summary(
+        self,
+        region: Regions | str,
+        start: str | int,
+        end: str | int,
+        resolution: str = "minute",
+    ) -> dict[str, np.ndarray]:
+        """Returns the precomputed statistics of [start, end) per minute or hour.
+
+        Parameters:
+            region (Regions | str): The region.
+            start (str | int): Start of the range, rounded down to the resolution.
+            end (str | int): End of the range.
+            resolution (str): 'minute' or 'hour'.
+
+        Returns:
+            dict[str, np.ndarray]: 'unix_seconds' of the row starts and the 'min', 'max', 'mean'
+                and 'count' of the values per row, for the archived rows in the range.
+        """
+        if resolution not in RESOLUTIONS:
+            raise ValueError(
+                f"Unsupported resolution {resolution!r}, use one of {list(RESOLUTIONS)}"
+            )
+        width = RESOLUTIONS[resolution]
+        region = self._region(region)
+        lower, upper = int(to_unix(start)), int(to_unix(end))
+        seconds, rows = [], []
+        month = _month(lower)
+        while _month_start(month) < upper:
+            header = self.index["files"].get(f"{region}/{month}")
+            if header is not None:
+                origin = _month_start(month)
+                length = -(-header["length"] * STEP // width)
+                table = self._map(
+                    self._path(region, month, resolution),
+                    (length, len(SUMMARY_COLUMNS)),
+                    np.dtype(np.float32),
+                )
+                first = max(lower - origin, 0) // width
+                last = min(-(-(upper - origin) // width), length)
+                if first < last:
+                    seconds.append(origin + width * np.arange(first, last, dtype=np.int64))
+                    rows.append(table[first:last])  # copied by the concatenation below
+            month = _next_month(month)
+        table = np.concatenate(rows) if rows else np.empty((0, len(SUMMARY_COLUMNS)), np.float32)
+        result = {"unix_seconds": np.concatenate(seconds) if seconds else np.empty(0, np.int64)}
+        result.update((name, table[:, i]) for i, name in enumerate(SUMMARY_COLUMNS))
+        return result
+
+    def _write_month(
+        self, region: str, month: str, seconds: np.ndarray, values: np.ndarray
+    ) -> None:
+        origin = _month_start(month)
+        offsets = (seconds - origin) // STEP
+        name = f"{region}/{month}"
+        header = self.index["files"].get(name, {"length": 0})
+        length = max(header["length"], int(offsets.max()) + 1)
+
+        path = self._path(region, month, "bin")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        raw = self._grow(path, length, np.full(1, np.nan, dtype=self.dtype))
+        raw[offsets] = values
+        raw.flush()
+
+        # Recompute the summaries of the touched rows from the raw values
+        for resolution, width in RESOLUTIONS.items():
+            rows = width // STEP
+            table = self._grow(
+                self._path(region, month, resolution),
+                -(-length // rows),
+                np.array([[np.nan, np.nan, np.nan, 0]], dtype=np.float32),
+            )
+            first, last = int(offsets.min()) // rows, int(offsets.max()) // rows + 1
+            table[first:last] = summarize(raw[first * rows : min(last * rows, length)], rows)
+            table.flush()
+
+        # The first and last valid seconds lie in the first and last minutes with values
+        rows = RESOLUTIONS["minute"] // STEP
+        counts = self._maps[self._path(region, month, "minute")][:, 3]
+        minutes = np.flatnonzero(counts)
+        header = {"length": length, "valid": int(counts.sum()), "first": None, "last": None}
+        if len(minutes):
+            head = raw[minutes[0] * rows : (minutes[0] + 1) * rows]
+            tail = raw[minutes[-1] * rows : (minutes[-1] + 1) * rows]
+            first = minutes[0] * rows + np.flatnonzero(~np.isnan(head))[0]
+            last = minutes[-1] * rows + np.flatnonzero(~np.isnan(tail))[-1]
+            header.update(first=origin + int(first) * STEP, last=origin + int(last) * STEP)
+        self.index["files"][name] = header
+
+    def _grow(self, path: Path, rows: int, fill: np.ndarray) -> np.memmap:
+        """Extends a file to at least `rows` rows of `fill` and maps them writable.
+
+        The current size is taken from the file, so rows written before an interrupted update
+        of the index are not appended twice.
+        """
+        existing = path.stat().st_size // fill.nbytes if path.exists() else 0
+        if rows > existing:
+            with open(path, "ab") as file:
+                file.write(np.repeat(fill, rows - existing, axis=0).tobytes())
+            self._maps.pop(path, None)
+        return self._map(path, (rows, *fill.shape[1:]), fill.dtype, "r+")
+
+    def _map(
+        self, path: Path, shape: tuple, dtype: np.dtype | None = None, mode: str = "r"
+    ) -> np.memmap:
+        """Returns the cached memory map of a file, remapped when its shape or mode changed."""
+        dtype = self.dtype if dtype is None else dtype
+        with self._lock:
+            mapped = self._maps.get(path)
+            if mapped is None or mapped.shape != shape or (mode == "r+" and mapped.mode == "r"):
+                mapped = self._maps[path] = np.memmap(path, dtype=dtype, mode=mode, shape=shape)
+            return mapped
+
+    def _path(self, region: str, month: str, kind: str) -> Path:
+        return self.root / region / f"{month}.{kind}"
+
+    def _save_index(self) -> None:
+        """Replaces the header index atomically, so readers never see a partial file."""
+        path = self.root / _INDEX
+        temporary = path.with_suffix(".tmp")
+        with open(temporary, "w") as file:
+            json.dump(self.index, file, indent=1, sort_keys=True)
+        os.replace(temporary, path)
+
+    @staticmethod
+    def _region(region: Regions | str) -> str:
+        return region.value if isinstance(region, Regions) else region
@@ -0,0 +1,324 @@
+# -*- coding: utf-8 -*-
+"""
+This module provides an asyncio client for accessing the Energy Charts API.
+
+Classes:
+    _AsyncBaseEnergyChartsAPI: A base class for making non-blocking API requests on a pooled aiohttp session.
+    AsyncEnergyChartsAPI: The async twin of EnergyChartsAPI with the same endpoint methods, to be awaited.
+"""
+
+import asyncio
+import json
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterable
+from datetime import timedelta
+from enum import Enum
+from typing import TYPE_CHECKING, Any
+
+import aiohttp
+
+from app import instrumentation
+from app.api import APIRequestError, EnergyChartsAPI, ValidationError
+from app.cache import MemoryCache, SQLiteCache, make_key, ttl_for
+from app.capabilities import CapabilityTable
+from app.enums import ChunkSize, Endpoints
+from app.singleflight import AsyncSingleFlight
+from app.transport import TransportConfig
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+class _AsyncBaseEnergyChartsAPI:
+    # Combined with EnergyChartsAPI (see AsyncEnergyChartsAPI), whose initializer sets up the
+    # state both clients share; this class only swaps the transport for aiohttp
+    BASE_URL = EnergyChartsAPI.BASE_URL
+    DEFAULT_CHUNK_SIZES = EnergyChartsAPI.DEFAULT_CHUNK_SIZES
+
+    # Shadows the lazily created requests session of EnergyChartsAPI
+    session: aiohttp.ClientSession | None = None
+
+    def __init__(
+        self,
+        chunked: bool = False,
+        chunk_sizes: dict[Endpoints, ChunkSize | timedelta] | None = None,
+        limit_per_host: int = 10,
+        cache: MemoryCache | SQLiteCache | None = None,
+        typed: bool = False,
+        coalesce: bool = False,
+        capabilities: CapabilityTable | None = None,
+        transport: TransportConfig | None = None,
+    ):
+        """
+        Parameters:
+            chunked (bool): If true, long time ranges are split into windows that are fetched
+                            concurrently and merged into one response.
+            chunk_sizes (dict[Endpoints, ChunkSize | timedelta] | None): Window sizes per
+                            endpoint, overriding DEFAULT_CHUNK_SIZES.
+            limit_per_host (int): Maximum number of simultaneous connections to the API.
+            cache (MemoryCache | SQLiteCache | None): Optional cache for successful responses.
+            typed (bool): If true, responses are returned as NumPy-backed result objects that
+                            behave like read-only dictionaries, see app.results.
+            coalesce (bool): If true, concurrent calls with the same endpoint and parameters
+                            share one request in flight and its result or exception.
+            capabilities (CapabilityTable | None): Optional capability table validating and
+                            normalizing the parameters before sending, see EnergyChartsAPI.
+            transport (TransportConfig | None): Keep-alive, compression, timeout and
+                            revalidation settings, defaults to TransportConfig(); the pool size
+                            is given by `limit_per_host`.
+        """
+        super().__init__(
+            chunked=chunked,
+            chunk_sizes=chunk_sizes,
+            max_workers=limit_per_host,
+            cache=cache,
+            typed=typed,
+            transport=transport,
+            capabilities=capabilities,
+        )
+        self.limit_per_host = limit_per_host
+        self.session = None
+        self.flights = AsyncSingleFlight() if coalesce else None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self) -> None:
+        """Closes the underlying HTTP session and its connection pool."""
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        # The session is bound to the running event loop, so it is created on first use
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(
+                limit_per_host=self.limit_per_host, force_close=not self.transport.keep_alive
+            )
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                headers={"Accept-Encoding": self.transport.accept_encoding},
+                timeout=aiohttp.ClientTimeout(
+                    sock_connect=self.transport.connect_timeout,
+                    sock_read=self.transport.read_timeout,
+                ),
+            )
+        return self.session
+
+    async def get(
+        self, endpoint: Endpoints, **kwargs: dict[str, str | bool | int]
+    ) -> dict[str, Any] | None:
+        return self._result(await self._fetch(endpoint, **kwargs))
+
+    async def _fetch(
+        self, endpoint: Endpoints, **kwargs: dict[str, str | bool | int]
+    ) -> dict[str, Any] | None:
+        # Skip None values and encode the remaining ones the same way as requests does
+        params = {k: str(v) for k, v in kwargs.items() if v is not None}
+        if self.capabilities is not None:
+            params = self.capabilities.validate(endpoint, params)
+        key = make_key(endpoint, params)
+        if self.cache is not None and (cached := self.cache.get(key)) is not None:
+            return cached
+        if self.flights is not None:
+            return await self.flights.do(key, lambda: self._request(endpoint, key, params))
+        return await self._request(endpoint, key, params)
+
+    async def _send(
+        self, endpoint: Endpoints, params: dict[str, str], headers: dict[str, str]
+    ) -> tuple[aiohttp.ClientResponse, bytes, float, float]:
+        """Sends one request and returns the response, its body, the send time and the TTFB."""
+        url = f"{self.BASE_URL}/{endpoint.value}"
+        sent = time.perf_counter()
+        try:
+            async with self._get_session().get(url, params=params, headers=headers) as response:
+                ttfb = time.perf_counter() - sent
+                body = await response.read()
+        except Exception as error:
+            if (instruments := instrumentation.active()) is not None:
+                instruments.failed_attempt(endpoint, error)
+            raise
+        return response, body, sent, ttfb
+
+    async def _request(
+        self, endpoint: Endpoints, key: str, params: dict[str, str]
+    ) -> dict[str, Any] | None:
+        headers = self.validators.headers(key) if self.transport.conditional else {}
+        data = None
+        if (instruments := instrumentation.active()) is not None:
+            started = instruments.before_request(endpoint, params)
+
+        try:
+            response, body, sent, ttfb = await self._send(endpoint, params, headers)
+            if response.status == 304 and self.validators.data(key) is None:
+                # The validated response has been evicted meanwhile: fetch it unconditionally
+                response, body, sent, ttfb = await self._send(endpoint, params, {})
+        except Exception as error:
+            if instruments is not None:
+                instruments.failed_request(endpoint, params, error, started)
+            raise
+        received = time.perf_counter()
+        wire = int(response.headers.get("Content-Length", len(body)))
+        self.transport_stats.count(response.status, wire, len(body))
+        if self.capabilities is not None:
+            self.capabilities.observe(endpoint, params, response.status)
+
+        match response.status:
+            case 200:
+                data = json.loads(body)
+                if self.transport.conditional:
+                    self.validators.store(key, response, data, len(body))
+            case 304:
+                data = self.validators.data(key)
+            case 422:
+                data = json.loads(body)
+        if instruments is not None:
+            instruments.after_request(
+                endpoint, params, response.status, ttfb, started, received, len(body), False, sent
+            )
+
+        if response.status == 422:
+            raise ValidationError(data)
+        # A 304 without data means that the validated response was evicted again meanwhile
+        if response.status != 200 and data is None:
+            raise APIRequestError(f"Unexpected status code: {response.status}")
+
+        if self.cache is not None:
+            self.cache.set(key, data, ttl_for(endpoint, params))
+        return data
+
+    async def get_range(
+        self, endpoint: Endpoints, start: str, end: str, **kwargs: dict[str, str | bool | int]
+    ) -> dict[str, Any] | None:
+        """Queries a time-series endpoint, splitting the range into windows in chunked mode."""
+        if not self.chunked:
+            return await self.get(endpoint, start=start, end=end, **kwargs)
+
+        from app.chunking import merge_responses, split_range
+
+        windows = split_range(start, end, self.chunk_sizes.get(endpoint, ChunkSize.MONTH))
+        responses = await asyncio.gather(
+            *(self._fetch(endpoint, start=lower, end=upper, **kwargs) for lower, upper in windows)
+        )
+        return self._result(merge_responses(list(responses)))
+
+    async def gather(
+        self,
+        method: Callable[..., Awaitable[dict | None]],
+        targets: Iterable[Enum],
+        *args: Any,
+        return_exceptions: bool = False,
+        **kwargs: Any,
+    ) -> dict[Enum, dict | BaseException | None]:
+        """Fetches one endpoint for many countries, zones or regions at once.
+
+        Parameters:
+            method (Callable): A bound endpoint method of this client, e.g. `api.get_price`.
+            targets (Iterable[Enum]): The values passed as first argument, e.g. BindingZones members.
+            *args, **kwargs: Further arguments passed to every call.
+            return_exceptions (bool): If true, errors are returned per target instead of raised.
+
+        Returns:
+            dict[Enum, dict | BaseException | None]: The responses by target, in input order.
+        """
+        targets = list(targets)
+        results = await asyncio.gather(
+            *(method(target, *args, **kwargs) for target in targets),
+            return_exceptions=return_exceptions,
+        )
+        return dict(zip(targets, results))
+
+    async def get_many(
+        self,
+        method: Callable[..., Awaitable[dict | None]],
+        targets: Iterable[Enum],
+        *args: Any,
+        **kwargs: Any,
+    ) -> dict[Enum, dict | None]:
+        """Awaits one endpoint method for many countries, zones or regions, see gather."""
+        return await self.gather(method, targets, *args, **kwargs)
+
+    async def get_panel(
+        self,
+        method: Callable[..., Awaitable[dict | None]],
+        targets: Iterable[Enum],
+        *args: Any,
+        layout: str = "wide",
+        **kwargs: Any,
+    ) -> "pd.DataFrame":
+        """Fetches one time-series endpoint for many targets into one DataFrame, see
+        EnergyChartsAPI.get_panel."""
+        from app.parser import make_panel
+
+        return make_panel(await self.gather(method, targets, *args, **kwargs), layout=layout)
+
+    async def iter_range(
+        self, endpoint: Endpoints, start: str, end: str, **kwargs: dict[str, str | bool | int]
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Yields the raw responses of the windows of a time range in order, without overlaps.
+
+        The windows are fetched concurrently, but at most `limit_per_host` of them are held at
+        a time; see EnergyChartsAPI.iter_range.
+        """
+        from app.chunking import slice_response, split_range
+
+        windows = split_range(start, end, self.chunk_sizes.get(endpoint, ChunkSize.MONTH))
+        pending: deque[asyncio.Task] = deque()
+        last = None
+        try:
+            for window in [*windows, None]:  # None drains the remaining windows
+                if window is not None:
+                    lower, upper = window
+                    fetch = self._fetch(endpoint, start=lower, end=upper, **kwargs)
+                    pending.append(asyncio.ensure_future(fetch))
+                while pending and (window is None or len(pending) >= self.limit_per_host):
+                    response = await pending.popleft()
+                    if not response or not len(response.get("unix_seconds", [])):
+                        continue
+                    if last is not None:  # drop the boundary shared with the previous window
+                        response = slice_response(response, last + 1, response["unix_seconds"][-1])
+                    if len(response["unix_seconds"]):
+                        last = int(response["unix_seconds"][-1])
+                        yield response
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def aggregate(
+        self,
+        endpoint: Endpoints,
+        start: str,
+        end: str,
+        step: int | timedelta,
+        stats: tuple[str, ...] = ("mean", "min", "max"),
+        weights: str | None = None,
+        energy_scale: float = 1e-3,
+        **kwargs: dict[str, str | bool | int],
+    ) -> dict[str, Any]:
+        """Queries a time-series endpoint and downsamples it into buckets while fetching, see
+        EnergyChartsAPI.aggregate."""
+        from app.aggregate import Aggregator
+
+        aggregator = Aggregator(step, stats, energy_scale)
+        async for response in self.iter_range(endpoint, start, end, **kwargs):
+            aggregator.update_response(response, weights)
+        return aggregator.result()
+
+
+class AsyncEnergyChartsAPI(_AsyncBaseEnergyChartsAPI, EnergyChartsAPI):
+    """An asyncio client for interacting with the Energy Charts API.
+
+    Provides the endpoint methods of EnergyChartsAPI with the same arguments; each returns an
+    awaitable resolving to the documented response, and iter_range an async iterator. Use it as
+    an async context manager or call close() to release the connection pool. There is no
+    request scheduler and no streaming decoder: concurrency is bounded by `limit_per_host` and
+    bodies are decoded once read.
+
+    Example:
+        async with AsyncEnergyChartsAPI() as api:
+            prices = await api.gather(api.get_price, BindingZones, "2024-01-01", "2024-01-02")
+    """
@@ -0,0 +1,236 @@
+# -*- coding: utf-8 -*-
+"""
+This module parses batches of responses of the Energy Charts API on a process pool.
+
+Classes:
+    BatchParser: Decodes raw responses or JSON bodies and builds their DataFrames in worker
+        processes, yielding the DataFrames in the calling process as they complete.
+
+Decoding JSON and building a DataFrame (parser.make_dataframe) is CPU-bound and holds the GIL, so
+it does not speed up with threads. The workers run both steps and write the numeric columns of
+each DataFrame into one block of shared memory: the float64 series as one 2D block, which becomes
+the single float block of the DataFrame, and every other numeric or datetime column as an array
+of its own. Only the name of the block, its layout and the remaining (object) columns are pickled
+back; the calling process copies the block once and wraps it without parsing or stacking. At most
+`max_pending` responses are in flight or waiting to be consumed, which bounds the memory of a
+batch of any size.
+"""
+
+import json
+import os
+import sys
+from collections.abc import Iterable, Iterator, Mapping
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from multiprocessing import resource_tracker, shared_memory
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Alignment of the arrays in a shared block in bytes
+_ALIGNMENT = 8
+
+
+def _create_block(size: int) -> shared_memory.SharedMemory:
+    """Creates a shared block owned by the calling process, which frees it after reading.
+
+    The block is not tracked by the worker, whose resource tracker would otherwise unlink it
+    again (and warn) when the worker exits.
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(create=True, size=size, track=False)
+    block = shared_memory.SharedMemory(create=True, size=size)
+    resource_tracker.unregister(block._name, "shared_memory")
+    return block
+
+
+def _export(item: dict | bytes | None, tz: str | None) -> tuple[str | None, int, list, list]:
+    """Builds the DataFrame of a response in a worker and moves its numeric columns into
+    shared memory.
+
+    Returns:
+        tuple: The name of the shared block (None if there are no numeric columns), the number
+            of rows, the names of the float64 columns stored as a (columns, rows) block at offset
+            0, and (position, name, kind, value) per other column. The kind is 'array' with
+            (dtype, offset, tz) as value, or 'object' with the column itself.
+    """
+    from app.parser import make_dataframe
+
+    response = json.loads(item) if isinstance(item, (bytes, bytearray, memoryview)) else item
+    df = make_dataframe(response, tz)
+    rows = len(df)
+
+    floats, others, arrays, size = [], [], [], 0
+    for position, (name, column) in enumerate(df.items()):
+        dtype = column.dtype
+        if dtype == np.float64:
+            floats.append(position)
+            continue
+        if isinstance(dtype, np.dtype) and dtype.kind in "iufbM":
+            values, zone = column.to_numpy(), None
+        elif getattr(dtype, "tz", None) is not None:  # datetime64[ns, tz]: store the UTC values
+            values, zone = column.dt.tz_convert(None).to_numpy(), str(dtype.tz)
+        else:
+            others.append((position, name, "object", column))
+            continue
+        arrays.append((position, name, values, zone))
+    size = len(floats) * rows * 8
+    for position, name, values, zone in arrays:
+        size = -(-size // _ALIGNMENT) * _ALIGNMENT
+        others.append((position, name, "array", (values.dtype.str, size, zone)))
+        size += values.nbytes
+    others.sort(key=lambda column: column[0])
+    names = [df.columns[position] for position in floats]
+
+    if not size:
+        return None, rows, names, others
+    block = _create_block(size)
+    try:
+        stacked = np.ndarray((len(floats), rows), dtype=np.float64, buffer=block.buf)
+        for i, position in enumerate(floats):
+            stacked[i] = df.iloc[:, position].to_numpy()
+        del stacked
+        values = {position: values for position, _, values, _ in arrays}
+        for position, _, kind, value in others:
+            if kind == "array":
+                dtype, offset, _ = value
+                target = np.ndarray(rows, dtype=dtype, buffer=block.buf, offset=offset)
+                target[:] = values[position]
+                del target
+    except BaseException:
+        block.close()
+        block.unlink()
+        raise
+    block.close()
+    return block.name, rows, names, others
+
+
+def _release(name: str | None) -> None:
+    """Frees a shared block that will not be consumed."""
+    if name is None:
+        return
+    block = shared_memory.SharedMemory(name=name)
+    block.close()
+    block.unlink()
+
+
+class BatchParser:
+    """Parses many responses into DataFrames on a pool of worker processes.
+
+    Example:
+        responses = api.get_many(api.get_total_power, Countries, "2024-01-01", "2024-02-01")
+        with BatchParser(workers=8) as parser:
+            for country, df, error in parser.parse(responses):
+                ...
+
+    Pass raw JSON bodies (bytes): they are sent to the workers as they are and decoded there.
+    Decoded responses are accepted too, but they are pickled to the workers, which usually costs
+    the calling process more than make_dataframe itself; for them, parsing in the calling process
+    is as fast or faster (compare benchmarks/bench_batch.py with and without --decoded).
+    """
+
+    def __init__(
+        self, workers: int | None = None, max_pending: int | None = None, tz: str | None = None
+    ):
+        """
+        Parameters:
+            workers (int | None): The number of worker processes, the number of CPUs if None.
+            max_pending (int | None): Maximum number of responses submitted but not yet
+                consumed, defaults to 2 * workers.
+            tz (str | None): Timezone of the timestamps, see parser.make_dataframe.
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.pool = ProcessPoolExecutor(max_workers=self.workers)
+        self.max_pending = max_pending or 2 * self.workers
+        self.tz = tz
+
+    def __enter__(self) -> "BatchParser":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Shuts the worker processes down."""
+        self.pool.shutdown(cancel_futures=True)
+
+    def parse(
+        self, items: Mapping[Any, dict | bytes | None] | Iterable[dict | bytes | None]
+    ) -> Iterator[tuple[Any, "pd.DataFrame | None", BaseException | None]]:
+        """Parses responses or JSON bodies and yields (key, DataFrame, error) as they complete.
+
+        Items are read from `items` lazily, only when fewer than `max_pending` are in flight
+        or waiting, so a generator of bodies is never held in memory as a whole. Closing the
+        iterator early frees the results that were not consumed.
+
+        Parameters:
+            items (Mapping | Iterable): Responses or bodies by key, e.g. the result of
+                EnergyChartsAPI.get_many, or an iterable of them keyed by position.
+
+        Returns:
+            Iterator[tuple]: The key, the DataFrame (None if it failed) and the error (None if
+                it succeeded), in completion order.
+        """
+        pairs = iter(items.items() if isinstance(items, Mapping) else enumerate(items))
+        pending: dict[Future, Any] = {}
+        exhausted = False
+        try:
+            while pending or not exhausted:
+                while not exhausted and len(pending) < self.max_pending:
+                    if (pair := next(pairs, None)) is None:
+                        exhausted = True
+                    else:
+                        pending[self.pool.submit(_export, pair[1], self.tz)] = pair[0]
+                if not pending:
+                    break
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    key = pending.pop(future)
+                    try:
+                        yield key, self._collect(*future.result()), None
+                    except Exception as error:
+                        yield key, None, error
+        finally:
+            for future in pending:
+                if not future.cancel() and future.exception() is None:
+                    _release(future.result()[0])
+
+    def _collect(self, name: str | None, rows: int, names: list, others: list) -> "pd.DataFrame":
+        """Wraps an exported DataFrame and frees its shared block."""
+        import pandas as pd
+
+        data = bytearray()
+        if name is not None:
+            # One copy out of the block frees it at once, whatever the DataFrame keeps referencing
+            block = shared_memory.SharedMemory(name=name)
+            try:
+                data = bytearray(block.buf)
+            finally:
+                block.close()
+                block.unlink()
+        if names:
+            floats = np.ndarray((len(names), rows), dtype=np.float64, buffer=data)
+            df = pd.DataFrame(floats.T, columns=names, copy=False)
+        else:
+            df = pd.DataFrame(index=pd.RangeIndex(rows))
+        for position, column, kind, value in others:
+            if kind == "array":
+                dtype, offset, zone = value
+                value = np.ndarray(rows, dtype=dtype, buffer=data, offset=offset)
+                if zone is not None:
+                    value = pd.DatetimeIndex(value).tz_localize("UTC").tz_convert(zone)
+            df.insert(position, column, value, allow_duplicates=True)
+        return df
+
+
+def parse_batch(
+    items: Mapping[Any, dict | bytes | None] | Iterable[dict | bytes | None],
+    workers: int | None = None,
+    max_pending: int | None = None,
+    tz: str | None = None,
+) -> Iterator[tuple[Any, "pd.DataFrame | None", BaseException | None]]:
+    """Parses a batch on a temporary BatchParser, see BatchParser.parse."""
+    with BatchParser(workers, max_pending, tz) as parser:
+        yield from parser.parse(items)
@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+"""
+This module provides response caches for the Energy Charts API clients.
+
+Classes:
+    MemoryCache: An in-memory LRU cache bounded by the number of entries.
+    SQLiteCache: An on-disk cache in a SQLite file bounded by the total size of the stored responses.
+
+Entries are keyed on the endpoint and the normalized query parameters. Their lifetime is derived
+from the endpoint: ranges that ended long enough ago never expire, forecasts expire quickly.
+SQLiteCache stores responses as JSON (NumPy arrays of streamed responses as base64 buffers), so
+loading a cache file never executes code from it.
+"""
+
+import base64
+import json
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+from app.enums import Endpoints
+from app.timerange import to_unix
+
+# Lifetime of responses of endpoints that publish forecasts or "from today" values
+ENDPOINT_TTLS = {
+    Endpoints.SIGNAL: timedelta(minutes=15),
+    Endpoints.REN_SHARE_FORECAST: timedelta(minutes=15),
+    Endpoints.PUBLIC_POWER_FORECAST: timedelta(minutes=15),
+    Endpoints.SOLAR_SHARE: timedelta(minutes=15),
+    Endpoints.WIND_ONSHORE_SHARE: timedelta(minutes=15),
+    Endpoints.WIND_OFFSHORE_SHARE: timedelta(minutes=15),
+}
+
+# Lifetime of all other responses that may still change
+DEFAULT_TTL = timedelta(hours=1)
+
+# Ranges that ended longer ago than this are considered final and never expire
+SETTLED_AFTER = timedelta(days=7)
+
+
+def make_key(endpoint: Endpoints, params: dict[str, Any]) -> str:
+    """Builds the cache key of a request from its endpoint and its non-None parameters."""
+    normalized = sorted((k, str(v)) for k, v in params.items() if v is not None)
+    return json.dumps([endpoint.value, normalized], separators=(",", ":"))
+
+
+def ttl_for(endpoint: Endpoints, params: dict[str, Any], now: float | None = None) -> float | None:
+    """Returns the lifetime of a response in seconds, or None if it never expires.
+
+    Parameters:
+        endpoint (Endpoints): The queried endpoint.
+        params (dict[str, Any]): The query parameters.
+        now (float | None): The current UNIX time, defaults to time.time().
+
+    Returns:
+        float | None: The lifetime in seconds, None for immutable responses.
+    """
+    if endpoint in ENDPOINT_TTLS:
+        return ENDPOINT_TTLS[endpoint].total_seconds()
+
+    now = time.time() if now is None else now
+    settled = now - SETTLED_AFTER.total_seconds()
+    if params.get("end") is not None and to_unix(params["end"]) < settled:
+        return None
+    year = params.get("year")
+    if year is not None and int(year) != -1 and int(year) < datetime.fromtimestamp(settled).year:
+        return None
+    return DEFAULT_TTL.total_seconds()
+
+
+# Marker key of NumPy arrays in stored JSON
+_ARRAY = "__ndarray__"
+
+
+def _is_array(value: Any) -> bool:
+    # Without NumPy imported, no response can hold arrays; this keeps the cache free of it
+    numpy = sys.modules.get("numpy")
+    return numpy is not None and isinstance(value, numpy.ndarray)
+
+
+def _encode_array(value: Any) -> dict:
+    if _is_array(value):
+        import numpy as np
+
+        data = np.ascontiguousarray(value)
+        encoded = base64.b64encode(data).decode("ascii")
+        return {_ARRAY: data.dtype.str, "shape": data.shape, "data": encoded}
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _decode_array(value: dict) -> Any:
+    if _ARRAY in value:
+        import numpy as np
+
+        data = np.frombuffer(base64.b64decode(value["data"]), dtype=np.dtype(value[_ARRAY]))
+        return data.reshape(value["shape"]).copy()  # writable, like a decoded response
+    return value
+
+
+def dumps(value: Any) -> bytes:
+    """Serializes a response as JSON; NumPy arrays are stored as typed base64 buffers."""
+    return json.dumps(value, default=_encode_array, separators=(",", ":")).encode()
+
+
+def loads(blob: bytes) -> Any:
+    """Deserializes a response serialized by dumps()."""
+    return json.loads(blob, object_hook=_decode_array)
+
+
+def copy_response(value: Any) -> Any:
+    """Copies the dictionaries, lists and arrays of a response, sharing only immutable values."""
+    if isinstance(value, dict):
+        return {k: copy_response(v) for k, v in value.items()}
+    if isinstance(value, list):
+        if value and (isinstance(value[0], (dict, list)) or _is_array(value[0])):
+            return [copy_response(v) for v in value]
+        return list(value)
+    if _is_array(value):
+        return value.copy()
+    return value
+
+
+class _BaseCache:
+    """A thread-safe cache with hit and miss counters."""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any | None:
+        """Returns the cached value for the key, or None if it is missing or expired."""
+        with self._lock:
+            value = self._get(key)
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return value
+
+    def set(self, key: str, value: Any, ttl: float | None) -> None:
+        """Stores a value that expires after `ttl` seconds, or never if `ttl` is None."""
+        expires = None if ttl is None else time.time() + ttl
+        with self._lock:
+            self._set(key, value, expires)
+
+    def _get(self, key: str) -> Any | None:
+        raise NotImplementedError
+
+    def _set(self, key: str, value: Any, expires: float | None) -> None:
+        raise NotImplementedError
+
+
+class MemoryCache(_BaseCache):
+    """An in-memory LRU cache.
+
+    Responses are copied when stored and when returned (see copy_response), so callers that
+    modify their response do not change the cached one.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        super().__init__()
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float | None, Any]] = OrderedDict()
+
+    def _get(self, key: str) -> Any | None:
+        if key not in self._entries:
+            return None
+        expires, value = self._entries[key]
+        if expires is not None and expires < time.time():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return copy_response(value)
+
+    def _set(self, key: str, value: Any, expires: float | None) -> None:
+        self._entries[key] = (expires, copy_response(value))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+class SQLiteCache(_BaseCache):
+    """An on-disk cache in a SQLite file, evicting the least recently used entries beyond
+    `max_bytes` of stored responses."""
+
+    def __init__(self, path: str | Path, max_bytes: int = 512 * 2**20):
+        super().__init__()
+        self.max_bytes = max_bytes
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key TEXT PRIMARY KEY, value BLOB, size INTEGER, expires REAL, accessed REAL)"
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS accessed ON entries (accessed)")
+
+    def close(self) -> None:
+        """Closes the underlying database connection."""
+        self._connection.close()
+
+    def _get(self, key: str) -> Any | None:
+        row = self._connection.execute(
+            "SELECT value, expires FROM entries WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        value, expires = row
+        if expires is not None and expires < time.time():
+            self._connection.execute("DELETE FROM entries WHERE key = ?", (key,))
+            return None
+        self._connection.execute(
+            "UPDATE entries SET accessed = ? WHERE key = ?", (time.time(), key)
+        )
+        return loads(value)
+
+    def _set(self, key: str, value: Any, expires: float | None) -> None:
+        blob = dumps(value)
+        self._connection.execute(
+            "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)",
+            (key, blob, len(blob), expires, time.time()),
+        )
+        self._evict()
+
+    def _evict(self) -> None:
+        (total,) = self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()
+        if total <= self.max_bytes:
+            return
+        self._connection.execute("DELETE FROM entries WHERE expires < ?", (time.time(),))
+        rows = self._connection.execute("SELECT key, size FROM entries ORDER BY accessed DESC")
+        kept, stale = 0, []
+        for key, size in rows:
+            kept += size
+            if kept > self.max_bytes:
+                stale.append((key,))
+        self._connection.executemany("DELETE FROM entries WHERE key = ?", stale)
@@ -0,0 +1,268 @@
+# -*- coding: utf-8 -*-
+"""
+This module provides a client-side capability table of the Energy Charts API.
+
+Classes:
+    CapabilityTable: The supported values per (endpoint, area, parameter), with local validation
+        and normalization of the query parameters, bulk planning and refresh from observed
+        responses.
+
+The table catches invalid combinations, e.g. SubTypes.SOLARLOG outside Switzerland, before a
+request is sent instead of after a round trip ending in a 422. Entries are keyed on the endpoint
+value, the area (country, bidding zone or region code, or '*' for all areas) and the parameter
+name; lookups are dictionary and set lookups.
+"""
+
+import json
+import threading
+from collections.abc import Iterable
+from datetime import datetime
+from enum import Enum
+from pathlib import Path
+from typing import Any
+
+from app.enums import (
+    BindingZones,
+    Countries,
+    Endpoints,
+    ForecastType,
+    ProductionType,
+    Regions,
+    SubTypes,
+    TimeSteps,
+)
+from app.exceptions import ValidationError
+from app.timerange import format_time, parse_time, to_unix
+
+# Version of the built-in table; bump it whenever _default_entries() changes
+VERSION = 1
+
+# Wildcard area of entries that apply to all areas of an endpoint
+ANY_AREA = "*"
+
+# Query parameter holding the area of each endpoint
+AREA_PARAMETERS = {Endpoints.PRICE: "bzn", Endpoints.FREQUENCY: "region"}
+
+# Query parameters holding times, normalized before sending
+TIME_PARAMETERS = ("start", "end")
+
+_COUNTRIES = frozenset(c.value for c in Countries)
+
+
+def _values(enum: type[Enum]) -> frozenset[str]:
+    return frozenset(member.value for member in enum)
+
+
+def _default_entries() -> dict[tuple[str, str, str], frozenset[str]]:
+    entries = {}
+    for endpoint in Endpoints:
+        parameter = AREA_PARAMETERS.get(endpoint, "country")
+        entries[endpoint.value, ANY_AREA, parameter] = _COUNTRIES
+    entries[Endpoints.PRICE.value, ANY_AREA, "bzn"] = _values(BindingZones)
+    # Regions: currently only available for UCTE
+    entries[Endpoints.FREQUENCY.value, ANY_AREA, "region"] = _values(Regions)
+    # SubTypes.SOLARLOG: only available for Switzerland
+    entries[Endpoints.PUBLIC_POWER.value, ANY_AREA, "subtype"] = frozenset()
+    entries[Endpoints.PUBLIC_POWER.value, Countries.SWITZERLAND.value, "subtype"] = _values(
+        SubTypes
+    )
+    # TimeSteps: currently only available for Germany
+    entries[Endpoints.INSTALLED_POWER.value, ANY_AREA, "time_step"] = frozenset()
+    entries[Endpoints.INSTALLED_POWER.value, Countries.GERMANY.value, "time_step"] = _values(
+        TimeSteps
+    )
+    entries[Endpoints.PUBLIC_POWER_FORECAST.value, ANY_AREA, "production_type"] = _values(
+        ProductionType
+    )
+    entries[Endpoints.PUBLIC_POWER_FORECAST.value, ANY_AREA, "forecast_type"] = _values(
+        ForecastType
+    )
+    return entries
+
+
+def normalize_time(value: str | int | datetime) -> str:
+    """Normalizes a `start`/`end` value into a format accepted by the API.
+
+    UNIX timestamps and daily dates are kept, other timestamps are reformatted, e.g. datetime
+    objects or '2024-01-01T17:00:00.000Z' become '2024-01-01T17:00+00:00'.
+
+    Raises:
+        ValueError: If the value is not in a supported format.
+    """
+    if isinstance(value, int) or str(value).lstrip("-").isdigit():
+        return str(int(value))
+    parsed = parse_time(value)
+    if isinstance(value, str) and len(value) == 10:
+        return parsed.date().isoformat()
+    return format_time(parsed)
+
+
+class CapabilityTable:
+    """The supported parameter values per endpoint and area.
+
+    Attributes:
+        version (int): The version of the table, incremented by every refresh.
+        entries (dict[tuple[str, str, str], frozenset[str]]): Supported values by (endpoint,
+            area, parameter); parameters without an entry accept any value.
+
+    Example:
+        capabilities = CapabilityTable()
+        api = EnergyChartsAPI(capabilities=capabilities)
+        targets, pruned = capabilities.plan(Endpoints.PUBLIC_POWER, Countries, subtype="solarlog")
+    """
+
+    def __init__(
+        self,
+        entries: dict[tuple[str, str, str], Iterable[str]] | None = None,
+        version: int = VERSION,
+    ):
+        """
+        Parameters:
+            entries (dict | None): The supported values, defaults to the built-in table.
+            version (int): The version of the entries.
+        """
+        entries = _default_entries() if entries is None else entries
+        self.entries = {key: frozenset(values) for key, values in entries.items()}
+        self.version = version
+        self._lock = threading.Lock()
+        # Observed (endpoint, area, parameter, value) of successful requests
+        self._successes: set[tuple[str, str, str, str]] = set()
+        # Observed (endpoint, area, {(parameter, value)}) of rejected requests
+        self._rejections: set[tuple[str, str, frozenset]] = set()
+
+    def supported(self, endpoint: Endpoints, area: str, parameter: str) -> frozenset[str] | None:
+        """Returns the supported values of a parameter, None if any value is accepted."""
+        values = self.entries.get((endpoint.value, area, parameter))
+        if values is None:
+            values = self.entries.get((endpoint.value, ANY_AREA, parameter))
+        return values
+
+    def check(self, endpoint: Endpoints, params: dict[str, Any]) -> str | None:
+        """Returns the reason why the parameters are not supported, None if they are."""
+        area_parameter = AREA_PARAMETERS.get(endpoint, "country")
+        area = str(params.get(area_parameter, ANY_AREA))
+        for parameter, value in params.items():
+            if parameter in TIME_PARAMETERS:
+                continue
+            value = value.value if isinstance(value, Enum) else str(value)
+            values = self.supported(endpoint, area, parameter)
+            if values is not None and value not in values:
+                return f"{parameter}={value} is not supported by {endpoint.value} for {area}"
+        return None
+
+    def validate(self, endpoint: Endpoints, params: dict[str, Any]) -> dict[str, Any]:
+        """Validates query parameters and normalizes their `start`/`end` values.
+
+        Parameters:
+            endpoint (Endpoints): The endpoint to query.
+            params (dict[str, Any]): The query parameters without None values.
+
+        Returns:
+            dict[str, Any]: The parameters with normalized times.
+
+        Raises:
+            ValidationError: If a parameter value is not supported or a time is invalid or the
+                start is after the end.
+        """
+        if (reason := self.check(endpoint, params)) is not None:
+            raise ValidationError(reason)
+        normalized = dict(params)
+        for parameter in TIME_PARAMETERS:
+            if parameter in normalized:
+                try:
+                    normalized[parameter] = normalize_time(normalized[parameter])
+                except ValueError as error:
+                    raise ValidationError(f"invalid {parameter}: {error}") from error
+        if "start" in normalized and "end" in normalized:
+            if to_unix(normalized["start"]) > to_unix(normalized["end"]):
+                raise ValidationError(
+                    f"start {normalized['start']} is after end {normalized['end']}"
+                )
+        return normalized
+
+    def plan(
+        self, endpoint: Endpoints, targets: Iterable[Enum | str], **params: Any
+    ) -> tuple[list[Enum | str], dict[Enum | str, str]]:
+        """Splits the targets of a bulk job into supported and unsupported ones.
+
+        Parameters:
+            endpoint (Endpoints): The endpoint to query.
+            targets (Iterable[Enum | str]): The countries, bidding zones or regions.
+            **params: The other query parameters shared by all targets.
+
+        Returns:
+            tuple[list, dict]: The supported targets in input order, and the reason for every
+                pruned target.
+        """
+        area_parameter = AREA_PARAMETERS.get(endpoint, "country")
+        params = {k: v for k, v in params.items() if v is not None}
+        supported, pruned = [], {}
+        for target in targets:
+            area = target.value if isinstance(target, Enum) else target
+            if (reason := self.check(endpoint, {**params, area_parameter: area})) is not None:
+                pruned[target] = reason
+            else:
+                supported.append(target)
+        return supported, pruned
+
+    def observe(self, endpoint: Endpoints, params: dict[str, Any], status: int) -> None:
+        """Records the outcome of a request: 200 as support, 422 as rejection of its values."""
+        if status not in (200, 422):
+            return
+        area = str(params.get(AREA_PARAMETERS.get(endpoint, "country"), ANY_AREA))
+        pairs = frozenset(
+            (parameter, value.value if isinstance(value, Enum) else str(value))
+            for parameter, value in params.items()
+            if parameter not in TIME_PARAMETERS
+        )
+        with self._lock:
+            if status == 200:
+                self._successes.update((endpoint.value, area, *pair) for pair in pairs)
+            else:
+                self._rejections.add((endpoint.value, area, pairs))
+
+    def refreshed(self) -> "CapabilityTable":
+        """Returns a new version of the table updated with the observed responses.
+
+        Values of successful requests are added to the supported values. A rejected request
+        removes a value only if it is the single value of the request that never succeeded for
+        that endpoint and area, so the rejection can be attributed to it. Areas are stored under
+        the wildcard area.
+        """
+        with self._lock:
+            successes, rejections = set(self._successes), set(self._rejections)
+        entries = dict(self.entries)
+
+        def key(endpoint: str, area: str, parameter: str) -> tuple[str, str, str]:
+            is_area = parameter == AREA_PARAMETERS.get(Endpoints(endpoint), "country")
+            return endpoint, ANY_AREA if is_area else area, parameter
+
+        def current(endpoint: str, area: str, parameter: str) -> frozenset[str] | None:
+            _, area, _ = key(endpoint, area, parameter)
+            values = entries.get((endpoint, area, parameter))
+            return entries.get((endpoint, ANY_AREA, parameter)) if values is None else values
+
+        for endpoint, area, parameter, value in successes:
+            if (values := current(endpoint, area, parameter)) is not None and value not in values:
+                entries[key(endpoint, area, parameter)] = values | {value}
+        for endpoint, area, pairs in rejections:
+            unknown = [(p, v) for p, v in pairs if (endpoint, area, p, v) not in successes]
+            if len(unknown) == 1:
+                parameter, value = unknown[0]
+                if (values := current(endpoint, area, parameter)) is not None and value in values:
+                    entries[key(endpoint, area, parameter)] = values - {value}
+        return CapabilityTable(entries, self.version + 1)
+
+    def save(self, path: str | Path) -> None:
+        """Writes the table and its version as JSON."""
+        entries = [[*key, sorted(values)] for key, values in sorted(self.entries.items())]
+        with open(path, "w") as file:
+            json.dump({"version": self.version, "entries": entries}, file)
+
+    @classmethod
+    def load(cls, path: str | Path) -> "CapabilityTable":
+        """Reads a table written by save()."""
+        with open(path) as file:
+            content = json.load(file)
+        entries = {tuple(entry[:3]): entry[3] for entry in content["entries"]}
+        return cls(entries, content["version"])
@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+"""
+This module splits long time ranges into windows and stitches the window responses back
+together into a single response in the documented schema of the Energy Charts API.
+"""
+
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from app.enums import ChunkSize
+from app.timerange import format_time, parse_time
+
+# Keys holding a list of {"name": str, "data": list[float]} entries.
+SERIES_KEYS = ("production_types", "countries")
+
+
+def collect_series(response: dict) -> tuple[list[str], list]:
+    """Collects the names and data lists of all named series in the response."""
+    names, columns = [], []
+    for key in SERIES_KEYS:
+        for entry in response.get(key) or []:
+            if isinstance(entry, dict):
+                names.append(entry.get("name"))
+                data = entry.get("data")
+                columns.append(data if data is not None else [])
+    return names, columns
+
+
+def numeric_columns(response: dict) -> tuple[list[str], list]:
+    """Collects all named series and all numeric lists aligned with 'unix_seconds'."""
+    names, columns = collect_series(response)
+    length = len(response.get("unix_seconds", []))
+    for key, values in response.items():
+        if key in SERIES_KEYS or key == "unix_seconds":
+            continue
+        if isinstance(values, np.ndarray):
+            numeric = values.dtype.kind in "iuf"
+        else:
+            numeric = isinstance(values, list) and all(
+                v is None or isinstance(v, (int, float)) for v in values[:16]
+            )
+        if numeric and len(values) == length:
+            names.append(key)
+            columns.append(values)
+    return names, columns
+
+
+def _add_months(value: datetime, months: int) -> datetime:
+    """Shifts a datetime by whole months, clamping the day to the first of the month."""
+    month = value.month - 1 + months
+    return value.replace(year=value.year + month // 12, month=month % 12 + 1, day=1)
+
+
+def _next_boundary(value: datetime, size: ChunkSize | timedelta) -> datetime:
+    """Returns the start of the window following the window that contains `value`."""
+    match size:
+        case timedelta():
+            return value + size
+        case ChunkSize.DAY:
+            return value.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+        case ChunkSize.WEEK:
+            day = value.replace(hour=0, minute=0, second=0, microsecond=0)
+            return day + timedelta(days=7 - day.weekday())
+        case ChunkSize.MONTH:
+            return _add_months(value.replace(hour=0, minute=0, second=0, microsecond=0), 1)
+        case ChunkSize.YEAR:
+            return value.replace(
+                year=value.year + 1, month=1, day=1, hour=0, minute=0, second=0, microsecond=0
+            )
+    raise ValueError(f"Unsupported chunk size: {size!r}")
+
+
+def split_range(
+    start: str | int | datetime, end: str | int | datetime, size: ChunkSize | timedelta
+) -> list[tuple[str, str]]:
+    """Splits a time range into consecutive windows aligned to calendar boundaries.
+
+    Parameters:
+        start (str | int | datetime): Start of the range in a format accepted by the API.
+        end (str | int | datetime): End of the range in a format accepted by the API.
+        size (ChunkSize | timedelta): The window size.
+
+    Returns:
+        list[tuple[str, str]]: The (start, end) windows as ISO 8601 strings. Adjacent windows
+            share their boundary; the duplicated timestamp is removed by `merge_responses`.
+    """
+    lower, upper = parse_time(start), parse_time(end)
+    if lower.tzinfo is not None and upper.tzinfo is None:
+        upper = upper.replace(tzinfo=lower.tzinfo)
+    elif lower.tzinfo is None and upper.tzinfo is not None:
+        lower = lower.replace(tzinfo=upper.tzinfo)
+
+    windows = []
+    while lower < upper:
+        boundary = min(_next_boundary(lower, size), upper)
+        windows.append((format_time(lower), format_time(boundary)))
+        lower = boundary
+    return windows
+
+
+def _series_data(response: dict, key: str, name: str):
+    """Returns the data of the named entry below `key`, or None if there is no such entry."""
+    for entry in response.get(key) or []:
+        if entry.get("name") == name:
+            return entry.get("data")
+    return None
+
+
+def _pieces(responses: list[dict], lengths: list[int], get) -> tuple[list[np.ndarray], bool] | None:
+    """Collects one column of every response, padding responses that lack the column."""
+    values = [get(r) for r in responses]
+    if all(v is None for v in values):
+        return None
+    as_list = any(isinstance(v, list) for v in values)
+    pieces = []
+    for value, length in zip(values, lengths):
+        if value is None or len(value) != length:
+            pieces.append(np.full(length, None if as_list else np.nan, dtype=object))
+        else:
+            pieces.append(np.array(value, dtype=object) if isinstance(value, list) else value)
+    return pieces, as_list
+
+
+def merge_responses(responses: list[dict | None]) -> dict | None:
+    """Merges several time-series responses into one, ordered by timestamp.
+
+    Timestamps present in more than one response are kept once, taking the values of the
+    last response that contains them. Lists (or NumPy arrays) aligned with 'unix_seconds' are
+    merged accordingly, scalar fields are taken from the last response.
+
+    Parameters:
+        responses (list[dict | None]): The responses to merge. Empty responses are skipped.
+
+    Returns:
+        dict | None: The merged response in the schema of the inputs.
+    """
+    responses = [r for r in responses if r]
+    if len(responses) <= 1:
+        return responses[0] if responses else None
+
+    seconds = [np.asarray(r.get("unix_seconds", []), dtype=np.int64) for r in responses]
+    lengths = [len(s) for s in seconds]
+    stacked = np.concatenate(seconds)
+    # Keep the last occurrence of every timestamp: search the reversed array for first hits
+    _, first_in_reversed = np.unique(stacked[::-1], return_index=True)
+    take = len(stacked) - 1 - first_in_reversed
+
+    def merge_column(get):
+        collected = _pieces(responses, lengths, get)
+        if collected is None:
+            return None
+        pieces, as_list = collected
+        merged = np.concatenate(pieces)[take]
+        return merged.tolist() if as_list else merged.astype(np.float64)
+
+    as_list = any(isinstance(r.get("unix_seconds"), list) for r in responses)
+    merged = {"unix_seconds": stacked[take].tolist() if as_list else stacked[take]}
+    for response in responses:
+        for key, value in response.items():
+            if key in merged or key == "unix_seconds":
+                continue
+            if key in SERIES_KEYS:
+                names = list(
+                    dict.fromkeys(e.get("name") for r in responses for e in r.get(key) or [])
+                )
+                merged[key] = [
+                    {
+                        "name": name,
+                        "data": merge_column(lambda r, k=key, n=name: _series_data(r, k, n)),
+                    }
+                    for name in names
+                ]
+            elif isinstance(value, (list, np.ndarray)) and len(value) == len(
+                response.get("unix_seconds", [])
+            ):
+                merged[key] = merge_column(lambda r, key=key: r.get(key))
+            else:
+                merged[key] = responses[-1].get(key, value)
+    return merged
+
+
+def slice_response(response: dict | None, lower: int, upper: int) -> dict | None:
+    """Returns the part of a time-series response with lower <= unix_seconds <= upper.
+
+    Lists (or NumPy arrays) aligned with 'unix_seconds' are sliced accordingly, all other
+    fields are copied unchanged.
+    """
+    if not response:
+        return response
+    seconds = np.asarray(response.get("unix_seconds", []), dtype=np.int64)
+    begin = np.searchsorted(seconds, lower, side="left")
+    stop = np.searchsorted(seconds, upper, side="right")
+
+    def cut(value):
+        if isinstance(value, (list, np.ndarray)) and len(value) == len(seconds):
+            return value[begin:stop]
+        return value
+
+    sliced = {}
+    for key, value in response.items():
+        if key in SERIES_KEYS and isinstance(value, list):
+            sliced[key] = [{**e, "data": cut(e.get("data"))} for e in value]
+        else:
+            sliced[key] = cut(value)
+    return sliced
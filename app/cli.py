@@ -0,0 +1,250 @@
+# -*- coding: utf-8 -*-
+"""
+This module provides the `energy-charts` command line tool for bulk downloads.
+
+A job such as "get_public_power for all countries from 2015 to 2025" is split into work units of
+one target and one window each. The units are fetched with bounded parallelism and appended to a
+partitioned dataset (see app.export); every completed unit is recorded in a checkpoint file, so
+an interrupted job resumes where it stopped when the same command is run again.
+
+Usage:
+    energy-charts download public_power --targets all --start 2015-01-01 --end 2026-01-01 \\
+        --output data/
+    python -m app.cli download price --targets DE-LU FR --start 2024-01-01 --end 2024-07-01 \\
+        --output data/ --unit week --workers 8
+
+Classes:
+    Unit: One target and one window of a download.
+    Job: The work units of a download and its checkpoint.
+"""
+
+import argparse
+import json
+import sys
+import threading
+import time
+from collections import deque
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from enum import Enum
+from pathlib import Path
+
+from app.api import EnergyChartsAPI
+from app.capabilities import CapabilityTable
+from app.enums import BindingZones, ChunkSize, Countries, Endpoints, Regions
+from app.scheduler import RequestScheduler
+
+# Downloadable methods: name -> (endpoint, enum of the targets, query parameter of the target)
+METHODS = {
+    "public_power": (Endpoints.PUBLIC_POWER, Countries, "country"),
+    "total_power": (Endpoints.TOTAL_POWER, Countries, "country"),
+    "cbet": (Endpoints.CBET, Countries, "country"),
+    "cbpf": (Endpoints.CBPF, Countries, "country"),
+    "price": (Endpoints.PRICE, BindingZones, "bzn"),
+    "frequency": (Endpoints.FREQUENCY, Regions, "region"),
+}
+
+# Name of the checkpoint file in the output directory
+CHECKPOINT = ".checkpoint.jsonl"
+
+
+@dataclass(frozen=True)
+class Unit:
+    """One target and one window of a job."""
+
+    target: Enum
+    start: str
+    end: str
+
+    @property
+    def id(self) -> str:
+        return f"{self.target.value}/{self.start}/{self.end}"
+
+
+class Job:
+    """The work units of a download and the checkpoint of the completed ones.
+
+    The checkpoint is an append-only JSON lines file; a unit is recorded only after its data has
+    been written. Each unit writes files named after the unit, so a unit interrupted between
+    writing and recording overwrites its own files when it is fetched again.
+    """
+
+    def __init__(self, units: list[Unit], checkpoint: str | Path):
+        self.units = units
+        self.checkpoint = Path(checkpoint)
+        self.completed: dict[str, int] = {}
+        if self.checkpoint.exists():
+            with open(self.checkpoint) as file:
+                for line in file:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self.completed[entry["unit"]] = entry["rows"]
+        self._lock = threading.Lock()
+
+    @property
+    def pending(self) -> list[Unit]:
+        return [unit for unit in self.units if unit.id not in self.completed]
+
+    def complete(self, unit: Unit, rows: int) -> None:
+        """Records a completed unit; the line is flushed before returning."""
+        with self._lock, open(self.checkpoint, "a") as file:
+            file.write(json.dumps({"unit": unit.id, "rows": rows, "time": time.time()}) + "\n")
+            self.completed[unit.id] = rows
+
+
+def make_units(targets: list[Enum], start: str, end: str, unit: ChunkSize) -> list[Unit]:
+    """Splits a job into units of one target and one calendar-aligned window each."""
+    from app.chunking import split_range
+
+    windows = split_range(start, end, unit)
+    return [Unit(target, lower, upper) for target in targets for lower, upper in windows]
+
+
+def run_units(
+    api: EnergyChartsAPI, method: str, units: list[Unit], workers: int
+) -> Iterator[tuple[Unit, dict | None, BaseException | None]]:
+    """Fetches the units with at most `2 * workers` units in flight and yields (unit, response,
+    error) in submission order.
+
+    Windows share their boundaries, so the responses are restricted to [start, end); naive
+    window bounds are UTC.
+    """
+    from app.chunking import slice_response
+    from app.timerange import to_unix
+
+    endpoint, _, parameter = METHODS[method]
+
+    def fetch(unit: Unit) -> dict | None:
+        # The window is sent as UNIX seconds, so the API and the slice use the same bounds
+        lower, upper = int(to_unix(unit.start)), int(to_unix(unit.end))
+        response = api.get(
+            endpoint, start=str(lower), end=str(upper), **{parameter: unit.target.value}
+        )
+        return slice_response(response, lower, upper - 1)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for unit in [*units, None]:  # None drains the remaining units
+            if unit is not None:
+                pending.append((unit, pool.submit(fetch, unit)))
+            while pending and (unit is None or len(pending) >= 2 * workers):
+                done, future = pending.popleft()
+                try:
+                    yield done, future.result(), None
+                except Exception as error:
+                    yield done, None, error
+
+
+def _target(targets_enum: type[Enum], text: str) -> Enum:
+    """Resolves a target given by its value or member name, ignoring case."""
+    for member in targets_enum:
+        if text.lower() in (member.value.lower(), member.name.lower()):
+            return member
+    raise SystemExit(f"Unknown {targets_enum.__name__} member: {text}")
+
+
+def _duration(seconds: float) -> str:
+    seconds = int(seconds)
+    return f"{seconds // 3600:d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+
+
+def download(args: argparse.Namespace) -> int:
+    """Runs a download job and returns the exit code: 1 if any unit failed."""
+    from app.export import write_dataset
+
+    endpoint, targets_enum, _ = METHODS[args.method]
+    if args.targets == ["all"]:
+        targets = [t for t in targets_enum if t not in (Countries.EUROPEAN, Countries.ALL_EUROPE)]
+    else:
+        targets = [_target(targets_enum, value) for value in args.targets]
+
+    targets, pruned = CapabilityTable().plan(endpoint, targets)
+    for target, reason in pruned.items():
+        print(f"skipped {target.value}: {reason}", file=sys.stderr)
+
+    output = Path(args.output)
+    output.mkdir(parents=True, exist_ok=True)
+    units = make_units(targets, args.start, args.end, ChunkSize[args.unit.upper()])
+    job = Job(units, args.checkpoint or output / CHECKPOINT)
+    pending = job.pending
+    print(
+        f"{len(units)} units, {len(units) - len(pending)} already completed, {len(pending)} to fetch",
+        file=sys.stderr,
+    )
+
+    # Retry throttled and failed requests before giving up on a unit
+    scheduler = RequestScheduler(rate=args.rate, max_concurrency=args.workers)
+    api = EnergyChartsAPI(max_workers=args.workers, scheduler=scheduler)
+    started = time.perf_counter()
+    done, rows, failed = 0, 0, 0
+    for unit, response, error in run_units(api, args.method, pending, args.workers):
+        if error is None and response and len(response.get("unix_seconds") or []):
+            try:
+                write_dataset(
+                    response,
+                    output,
+                    endpoint,
+                    unit.target,
+                    args.float32,
+                    file_format=args.format,
+                    part=unit.id.replace("/", "_").replace(":", ""),
+                )
+            except Exception as exception:
+                error = exception
+        if error is not None:
+            failed += 1
+            print(f"failed {unit.id}: {error}", file=sys.stderr)
+        else:
+            count = len(response.get("unix_seconds") or []) if response else 0
+            job.complete(unit, count)
+            rows += count
+
+        done += 1
+        elapsed = time.perf_counter() - started
+        rate = done / elapsed
+        print(
+            f"[{done}/{len(pending)}] {rate:.2f} units/s, {rows / elapsed:,.0f} rows/s, "
+            f"elapsed {_duration(elapsed)}, ETA {_duration((len(pending) - done) / rate)}",
+            file=sys.stderr,
+        )
+
+    if failed:
+        print(f"{failed} units failed; run the same command again to retry them", file=sys.stderr)
+    return 1 if failed else 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="energy-charts", description="Energy Charts API tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    command = commands.add_parser("download", help="download a time series into a dataset")
+    command.add_argument("method", choices=METHODS)
+    command.add_argument(
+        "--targets",
+        nargs="+",
+        default=["all"],
+        help="country, bidding zone or region codes, or 'all' (default)",
+    )
+    command.add_argument("--start", required=True, help="start date, e.g. 2015-01-01")
+    command.add_argument("--end", required=True, help="end date (exclusive), e.g. 2026-01-01")
+    command.add_argument("--output", required=True, help="root directory of the dataset")
+    command.add_argument("--format", choices=("parquet", "ipc"), default="parquet")
+    command.add_argument("--float32", action="store_true", help="store values as float32")
+    command.add_argument(
+        "--unit",
+        choices=[size.name.lower() for size in ChunkSize],
+        default="month",
+        help="window size of a work unit",
+    )
+    command.add_argument("--workers", type=int, default=4, help="concurrent requests")
+    command.add_argument("--rate", type=float, default=5.0, help="requests per second")
+    command.add_argument("--checkpoint", help=f"checkpoint file, defaults to <output>/{CHECKPOINT}")
+    command.set_defaults(run=download)
+
+    args = parser.parse_args(argv)
+    return args.run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -140,3 +140,12 @@ class BindingZones(Enum):
     POLAND = "PL"
     SWEDEN_4 = "SE4"
     SLOVENIA = "SI"
+
+
+class ChunkSize(Enum):
+    """Available window sizes for splitting long time ranges into several requests."""
+
+    DAY = "day"
+    WEEK = "week"
+    MONTH = "month"
+    YEAR = "year"
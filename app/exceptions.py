@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+"""
+This module provides the exceptions of the Energy Charts API clients.
+
+Classes:
+    ValidationError: Raised for invalid query parameters, by the API or by a capability table.
+    APIRequestError: Raised for unexpected API errors.
+
+They are defined apart from the clients so that modules the clients import, e.g. app.capabilities,
+can raise them; app.api re-exports both.
+"""
+
+
+class ValidationError(Exception):
+    """Raised for validation errors when the API returns a 422 status code, or when a
+    CapabilityTable rejects the query parameters before the request is sent."""
+
+
+class APIRequestError(Exception):
+    """Raised for unexpected API errors or non-200/422 status codes."""
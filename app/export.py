@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+"""
+This module writes parsed API responses to partitioned Parquet or Arrow IPC datasets and reads
+them back lazily.
+
+Datasets use hive-style partitions `endpoint=<endpoint>/area=<country, zone or region>/month=<YYYY-MM>`.
+Every write adds new files to the affected partitions, so appending a new window never rewrites
+existing data. Every file name starts with a sequence number that increases with each write to
+its partition. Rows of overlapping windows written in separate parts are kept on disk and dropped
+by read_dataset, which keeps the row of the highest sequence number per area and timestamp.
+Requires the optional dependency `pyarrow`.
+"""
+
+import re
+import threading
+import uuid
+from collections.abc import Mapping
+from enum import Enum
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+
+from app.enums import Endpoints
+from app.parser import make_dataframe
+from app.timerange import to_unix
+
+PARTITIONING = ds.partitioning(
+    pa.schema([("endpoint", pa.string()), ("area", pa.string()), ("month", pa.string())]),
+    flavor="hive",
+)
+
+# File extensions of the supported dataset formats
+FORMATS = {"parquet": "parquet", "ipc": "arrow"}
+
+# File names are part-<sequence>-<part>.<extension>
+_FILE_NAME = re.compile(r"part-(\d+)-(.+)\.\w+$")
+
+# Serialises the choice of sequence numbers between threads
+_lock = threading.Lock()
+
+
+def _check_format(file_format: str) -> None:
+    if file_format not in FORMATS:
+        raise ValueError(
+            f"Unsupported dataset format {file_format!r}, expected one of: {', '.join(FORMATS)}"
+        )
+
+
+def _sequence(path: str | Path) -> int:
+    """Returns the write sequence number of a file, -1 for files named without one."""
+    match = _FILE_NAME.match(Path(path).name)
+    return int(match.group(1)) if match else -1
+
+
+def _write_file(table: pa.Table, directory: Path, part: str, file_format: str) -> Path:
+    """Writes a table to a partition under the next sequence number and replaces earlier
+    files of the same part."""
+    with _lock:
+        existing = [p for p in directory.iterdir() if _FILE_NAME.match(p.name)]
+        sequence = max((_sequence(p) for p in existing), default=0) + 1
+        path = directory / f"part-{sequence:012d}-{part}.{FORMATS[file_format]}"
+        if file_format == "parquet":
+            pq.write_table(table, path)
+        else:
+            feather.write_feather(table, path)
+    for previous in existing:
+        if _FILE_NAME.match(previous.name).group(2) == part:
+            previous.unlink(missing_ok=True)
+    return path
+
+
+def write_dataset(
+    data: Mapping | pd.DataFrame,
+    root: str | Path,
+    endpoint: Endpoints,
+    area: Enum | str,
+    float32: bool = False,
+    file_format: str = "parquet",
+    part: str | None = None,
+) -> list[Path]:
+    """Appends a response to a partitioned dataset.
+
+    Parameters:
+        data (Mapping | pd.DataFrame): An API response with 'unix_seconds' (a dictionary or a
+            typed result) or its DataFrame.
+        root (str | Path): The root directory of the dataset.
+        endpoint (Endpoints): The endpoint the response was fetched from.
+        area (Enum | str): The country, bidding zone or region of the response.
+        float32 (bool): If true, float64 columns are down-cast to float32 to halve their size.
+        file_format (str): Either 'parquet' or 'ipc' (Arrow IPC / Feather V2).
+        part (str | None): Name of the written files, defaults to a random one. Writing the same
+            part again replaces its files instead of adding duplicates.
+
+    Returns:
+        list[Path]: The written files, one per month contained in the data.
+
+    Raises:
+        ValueError: If the format is not supported or the data has no timestamps.
+    """
+    _check_format(file_format)
+    df = make_dataframe(data) if isinstance(data, Mapping) else data
+    if "timestamp" not in df.columns:
+        raise ValueError("Only time-series responses with 'unix_seconds' can be exported.")
+    if float32:
+        df = df.astype({c: "float32" for c in df.columns if df[c].dtype == "float64"})
+
+    area = area.value if isinstance(area, Enum) else area
+    part = part or uuid.uuid4().hex
+    written = []
+    for month, group in df.groupby(df["timestamp"].dt.strftime("%Y-%m"), sort=True):
+        directory = Path(root) / f"endpoint={endpoint.value}" / f"area={area}" / f"month={month}"
+        directory.mkdir(parents=True, exist_ok=True)
+        table = pa.Table.from_pandas(group, preserve_index=False)
+        written.append(_write_file(table, directory, part, file_format))
+    return written
+
+
+def open_dataset(root: str | Path, file_format: str = "parquet") -> ds.Dataset:
+    """Opens a dataset written by write_dataset without reading any data."""
+    _check_format(file_format)
+    return ds.dataset(root, format=file_format, partitioning=PARTITIONING)
+
+
+def read_dataset(
+    root: str | Path,
+    endpoint: Endpoints,
+    area: Enum | str | None = None,
+    start: str | None = None,
+    end: str | None = None,
+    columns: list[str] | None = None,
+    file_format: str = "parquet",
+) -> pd.DataFrame:
+    """Reads a filtered part of a dataset, loading only the matching partitions and columns.
+
+    Parameters:
+        root (str | Path): The root directory of the dataset.
+        endpoint (Endpoints): The endpoint to read.
+        area (Enum | str | None): The country, bidding zone or region, or None for all areas.
+        start (str | None): Start of the time range (inclusive) in a format accepted by the API.
+        end (str | None): End of the time range (exclusive) in the same formats as start.
+        columns (list[str] | None): The data columns to read, or None for all columns.
+        file_format (str): Either 'parquet' or 'ipc' (Arrow IPC / Feather V2).
+
+    Returns:
+        pd.DataFrame: The matching rows with the timestamp, the area and the requested columns,
+            one per area and timestamp (the most recently written one if parts overlap).
+    """
+    expression = ds.field("endpoint") == endpoint.value
+    if area is not None:
+        expression &= ds.field("area") == (area.value if isinstance(area, Enum) else area)
+    if start is not None:
+        lower = pd.Timestamp(to_unix(start), unit="s")
+        expression &= (ds.field("month") >= lower.strftime("%Y-%m")) & (
+            ds.field("timestamp") >= lower
+        )
+    if end is not None:
+        upper = pd.Timestamp(to_unix(end), unit="s")
+        expression &= (ds.field("month") <= upper.strftime("%Y-%m")) & (
+            ds.field("timestamp") < upper
+        )
+
+    dataset = open_dataset(root, file_format)
+    # Oldest writes first, so that the last row per area and timestamp is the newest one
+    fragments = sorted(dataset.get_fragments(filter=expression), key=lambda f: _sequence(f.path))
+    if not fragments:
+        return pd.DataFrame(columns=["timestamp", "area", *(columns or [])])
+    # Partitions written at different times may hold different columns
+    schema = pa.unify_schemas(
+        [dataset.schema, *(f.physical_schema for f in fragments)], promote_options="permissive"
+    )
+    dataset = ds.dataset(
+        [f.path for f in fragments],
+        schema=schema,
+        format=file_format,
+        partitioning=PARTITIONING,
+        partition_base_dir=str(root),
+    )
+    selected = None if columns is None else ["timestamp", "area", *columns]
+    df = dataset.to_table(columns=selected, filter=expression).to_pandas()
+    df = df.drop_duplicates(["area", "timestamp"], keep="last")
+    return df.sort_values("timestamp", kind="stable", ignore_index=True)
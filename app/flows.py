@@ -0,0 +1,267 @@
+# -*- coding: utf-8 -*-
+"""
+This module provides a Europe-wide view of the cross-border electricity flows.
+
+Classes:
+    FlowNetwork: The flows between all countries as a dense (time, from, to) tensor, combining
+        the cbet or cbpf responses of every country and reconciling both sides of each border.
+"""
+
+from collections.abc import Iterable
+
+import numpy as np
+
+from app.api import EnergyChartsAPI
+from app.enums import Countries, Endpoints
+from app.timerange import to_unix
+
+# Countries that are aggregates rather than members of the network
+AGGREGATES = {Countries.EUROPEAN, Countries.ALL_EUROPE}
+
+# Neighbour entries that are not countries
+_SKIPPED_NAMES = {"sum", "total"}
+
+_CODES = {
+    **{member.name.lower().replace("_", " "): member.value for member in Countries},
+    **{member.value: member.value for member in Countries},
+}
+
+
+def country_code(name: str) -> str:
+    """Returns the country code of a neighbour name such as 'Czech Republic', or the
+    lower-cased name if it is not a known country."""
+    name = name.strip().lower()
+    return _CODES.get(name, _CODES.get(name.replace("-", " "), name))
+
+
+class FlowNetwork:
+    """The cross-border flows between countries.
+
+    Attributes:
+        index (list[str]): The country codes along the 'from' and 'to' axes.
+        unix_seconds (np.ndarray): The timestamps along the time axis.
+        reported (np.ndarray): (time, from, to) net flow in GW from `from` to `to` as reported
+            by the receiving country `to`; NaN where it did not report the border.
+        flows (np.ndarray): (time, from, to) reconciled net flow, the mean of both sides of each
+            border. It is antisymmetric: flows[t, i, j] == -flows[t, j, i].
+
+    Example:
+        network = FlowNetwork.fetch(api, Endpoints.CBPF, "2024-01-01", "2024-01-08")
+        network.net_position()
+        network.top_corridors(5, start="2024-01-03", end="2024-01-04")
+    """
+
+    def __init__(
+        self,
+        index: list[str],
+        unix_seconds: np.ndarray,
+        reported: np.ndarray,
+        flows: np.ndarray | None = None,
+    ):
+        """
+        Parameters:
+            index (list[str]): The country codes along the 'from' and 'to' axes.
+            unix_seconds (np.ndarray): The timestamps along the time axis.
+            reported (np.ndarray): The flows as reported by the receiving countries.
+            flows (np.ndarray | None): The reconciled flows of `reported` if already known,
+                otherwise they are computed.
+        """
+        self.index = index
+        self.unix_seconds = unix_seconds
+        self.reported = reported
+        if flows is None:
+            other_side = -reported.swapaxes(1, 2)
+            both = ~np.isnan(reported) & ~np.isnan(other_side)
+            flows = np.where(
+                both,
+                (reported + other_side) / 2,
+                np.where(np.isnan(reported), other_side, reported),
+            )
+        self.flows = flows
+        self._positions = {code: i for i, code in enumerate(index)}
+        self._results: dict[tuple, object] = {}
+
+    @classmethod
+    def fetch(
+        cls,
+        api: EnergyChartsAPI,
+        endpoint: Endpoints,
+        start: str,
+        end: str,
+        countries: Iterable[Countries] | None = None,
+    ) -> "FlowNetwork":
+        """Fetches the flows of all countries concurrently and builds the network.
+
+        Parameters:
+            api (EnergyChartsAPI): The client; its max_workers bounds the concurrency.
+            endpoint (Endpoints): Endpoints.CBET (trading) or Endpoints.CBPF (physical flows).
+            start (str): Start of the data range, see EnergyChartsAPI.get_cbet.
+            end (str): End of the data range in the same formats as start.
+            countries (Iterable[Countries] | None): The reporting countries, defaults to all
+                countries except the aggregates.
+
+        Returns:
+            FlowNetwork: The network.
+        """
+        methods = {Endpoints.CBET: api.get_cbet, Endpoints.CBPF: api.get_cbpf}
+        if endpoint not in methods:
+            raise ValueError(f"Unsupported endpoint: {endpoint.value}")
+        countries = [c for c in (countries or Countries) if c not in AGGREGATES]
+        return cls.from_responses(api.get_many(methods[endpoint], countries, start, end))
+
+    @classmethod
+    def from_responses(cls, responses: dict[Countries | str, dict | None]) -> "FlowNetwork":
+        """Builds the network from cbet or cbpf responses by reporting country.
+
+        Each border is usually reported by both countries; every pair of entries ends up in the
+        same cell of `reported` and its transpose, so duplicated edges are reconciled instead of
+        being counted twice.
+        """
+        entries = []  # (reporter, neighbour, seconds, values)
+        for country, response in responses.items():
+            if not response or response.get("unix_seconds") is None:
+                continue
+            reporter = getattr(country, "value", country)
+            seconds = np.asarray(response["unix_seconds"], dtype=np.int64)
+            if not len(seconds):
+                continue
+            for entry in response.get("countries") or []:
+                neighbour = country_code(entry.get("name") or "")
+                if (
+                    neighbour in _SKIPPED_NAMES
+                    or neighbour == reporter
+                    or entry.get("data") is None
+                ):
+                    continue
+                values = np.asarray(
+                    [np.nan if v is None else v for v in entry["data"]], dtype=np.float64
+                )
+                entries.append(
+                    (reporter, neighbour, seconds[: len(values)], values[: len(seconds)])
+                )
+
+        index = sorted(
+            {code for reporter, neighbour, _, _ in entries for code in (reporter, neighbour)}
+        )
+        positions = {code: i for i, code in enumerate(index)}
+        grid = np.unique(np.concatenate([s for _, _, s, _ in entries] or [np.empty(0, np.int64)]))
+        reported = np.full((len(grid), len(index), len(index)), np.nan)
+        for reporter, neighbour, seconds, values in entries:
+            # Positive values are imports of the reporter, i.e. flows from the neighbour to it
+            rows = np.searchsorted(grid, seconds)
+            reported[rows, positions[neighbour], positions[reporter]] = values
+        return cls(index, grid, reported)
+
+    def _rows(self, start: str | int | None, end: str | int | None) -> slice:
+        lower = 0 if start is None else np.searchsorted(self.unix_seconds, to_unix(start))
+        upper = (
+            len(self.unix_seconds)
+            if end is None
+            else np.searchsorted(self.unix_seconds, to_unix(end), side="right")
+        )
+        return slice(int(lower), int(upper))
+
+    def _cached(self, name: str, start, end, compute, *args):
+        rows = self._rows(start, end)
+        key = (name, rows.start, rows.stop, *args)
+        if key not in self._results:
+            self._results[key] = compute(rows, *args)
+        return self._results[key]
+
+    def window(self, start: str | int | None = None, end: str | int | None = None) -> "FlowNetwork":
+        """Returns the network restricted to [start, end]; the arrays are views, not copies."""
+        rows = self._rows(start, end)
+        return FlowNetwork(
+            self.index, self.unix_seconds[rows], self.reported[rows], self.flows[rows]
+        )
+
+    def flow(self, source: Countries | str, target: Countries | str) -> np.ndarray:
+        """Returns the net flow time series from `source` to `target` in GW."""
+        i = self._positions[getattr(source, "value", source)]
+        j = self._positions[getattr(target, "value", target)]
+        return self.flows[:, i, j]
+
+    def net_position(
+        self, start: str | int | None = None, end: str | int | None = None
+    ) -> np.ndarray:
+        """Returns the (time, country) net export position in GW: exports minus imports.
+
+        Parameters:
+            start (str | int | None): Start of the window, defaults to the first timestamp.
+            end (str | int | None): End of the window (inclusive), defaults to the last timestamp.
+
+        Returns:
+            np.ndarray: The net positions, with columns in the order of `index`.
+        """
+        return self._cached(
+            "net_position", start, end, lambda rows: np.nansum(self.flows[rows], axis=2)
+        )
+
+    def top_corridors(
+        self, n: int = 10, start: str | int | None = None, end: str | int | None = None
+    ) -> list[tuple[str, str, float]]:
+        """Returns the corridors with the largest mean net flow in the window.
+
+        Returns:
+            list[tuple[str, str, float]]: (from, to, mean flow in GW), the flow direction being
+                the dominant one, sorted by decreasing flow.
+        """
+
+        def compute(rows, n):
+            flows = self.flows[rows]
+            if not len(flows):
+                return []
+            counts = (~np.isnan(flows)).sum(axis=0)
+            means = np.where(counts > 0, np.nansum(flows, axis=0) / np.maximum(counts, 1), np.nan)
+            sources, targets = np.nonzero(means > 0)
+            order = np.argsort(-means[sources, targets])[:n]
+            return [
+                (
+                    self.index[sources[k]],
+                    self.index[targets[k]],
+                    float(means[sources[k], targets[k]]),
+                )
+                for k in order
+            ]
+
+        return self._cached("top_corridors", start, end, compute, n)
+
+    def consistency(
+        self, tolerance: float = 0.0, start: str | int | None = None, end: str | int | None = None
+    ) -> list[dict]:
+        """Compares both sides of each border reported by both countries.
+
+        Parameters:
+            tolerance (float): The absolute difference in GW under which both sides agree.
+            start (str | int | None): Start of the window.
+            end (str | int | None): End of the window (inclusive).
+
+        Returns:
+            list[dict]: Per border ('from', 'to'): the number of timestamps reported by both
+                sides ('count'), the mean and maximum absolute difference in GW and the number of
+                timestamps exceeding the tolerance ('violations'), by decreasing maximum.
+        """
+
+        def compute(rows, tolerance):
+            reported = self.reported[rows]
+            difference = np.abs(reported + reported.swapaxes(1, 2))
+            counts = (~np.isnan(difference)).sum(axis=0)
+            sources, targets = np.nonzero(np.triu(counts > 0, k=1))
+            pairs = difference[:, sources, targets]
+            maxima = np.nanmax(pairs, axis=0, initial=0.0)
+            means = np.nansum(pairs, axis=0) / counts[sources, targets]
+            violations = (pairs > tolerance).sum(axis=0)
+            order = np.argsort(-maxima)
+            return [
+                {
+                    "from": self.index[sources[k]],
+                    "to": self.index[targets[k]],
+                    "count": int(counts[sources[k], targets[k]]),
+                    "mean_difference": float(means[k]),
+                    "max_difference": float(maxima[k]),
+                    "violations": int(violations[k]),
+                }
+                for k in order
+            ]
+
+        return self._cached("consistency", start, end, compute, tolerance)
@@ -0,0 +1,264 @@
+# -*- coding: utf-8 -*-
+"""
+This module provides opt-in instrumentation of the Energy Charts API client and the parser.
+
+Classes:
+    Instrumentation: Collects timings, sizes and hook calls of requests and parsing.
+
+Functions:
+    enable: Activates an Instrumentation instance for all clients and make_dataframe calls.
+    disable: Deactivates the instrumentation.
+    active: Returns the active Instrumentation, or None.
+
+While no instrumentation is active, the client and the parser only perform a single lookup of a
+module attribute per call.
+
+Recorded phases per endpoint:
+    ttfb: time until the response headers arrived, including DNS lookup, connect and TLS
+          (requests does not expose these separately)
+    download: time to read the response body of the final attempt
+    decode: time to decode the JSON body (includes reading the body in streaming mode)
+    wait: time before the final attempt was sent: scheduler queueing, rate limiting, failed
+          attempts and their backoff
+    backoff: time slept between retries (part of wait)
+    total: time of the whole request including retries
+    parse: time of make_dataframe (recorded without endpoint)
+
+Attempts that raise instead of returning a response, e.g. on connection errors or timeouts, are
+counted per endpoint and error type in `failures`. A request that raises after all its attempts
+records its backoff and total phases and calls the post-request hooks with its error type.
+"""
+
+import threading
+import time
+from collections import defaultdict, deque
+from collections.abc import Callable
+from contextlib import contextmanager
+from typing import Any
+
+from app.enums import Endpoints
+
+_active: "Instrumentation | None" = None
+
+
+def enable(instrumentation: "Instrumentation | None" = None) -> "Instrumentation":
+    """Activates the given (or a new) Instrumentation and returns it."""
+    global _active
+    _active = instrumentation or Instrumentation()
+    return _active
+
+
+def disable() -> None:
+    """Deactivates the instrumentation."""
+    global _active
+    _active = None
+
+
+def active() -> "Instrumentation | None":
+    """Returns the active Instrumentation, or None if instrumentation is disabled."""
+    return _active
+
+
+class Instrumentation:
+    """Collects per-endpoint timings and sizes and calls pre/post-request hooks.
+
+    Example:
+        stats = instrumentation.enable()
+        stats.add_post_request_hook(lambda endpoint, params, record: print(endpoint, record))
+        df = make_dataframe(api.get_total_power(Countries.GERMANY, "2024-01-01", "2024-01-02"))
+        print(stats.summary()[Endpoints.TOTAL_POWER.value]["total"]["p95"])
+    """
+
+    def __init__(self, max_samples: int = 10_000, tracer: Any = None):
+        """
+        Parameters:
+            max_samples (int): Number of samples kept per endpoint and phase for percentiles.
+            tracer (Any): Optional OpenTelemetry tracer; every request and parse is then
+                          also exported as a span with its phases as attributes.
+        """
+        self.max_samples = max_samples
+        self.tracer = tracer
+        self.pre_request_hooks: list[Callable[[Endpoints, dict], None]] = []
+        self.post_request_hooks: list[Callable[[Endpoints, dict, dict], None]] = []
+        self.counters: defaultdict[tuple[str, str], float] = defaultdict(float)
+        # Failed attempts by (endpoint, error type)
+        self.failures: defaultdict[tuple[str, str], int] = defaultdict(int)
+        self._samples: defaultdict[tuple[str, str], deque] = defaultdict(
+            lambda: deque(maxlen=self.max_samples)
+        )
+        self._lock = threading.Lock()
+
+    def add_pre_request_hook(self, hook: Callable[[Endpoints, dict], None]) -> None:
+        """Registers a callable(endpoint, params) called before every request."""
+        self.pre_request_hooks.append(hook)
+
+    def add_post_request_hook(self, hook: Callable[[Endpoints, dict, dict], None]) -> None:
+        """Registers a callable(endpoint, params, record) called after every request. The record
+        holds the status code, the phase durations in seconds and the body size in bytes; for a
+        request that raised, the status code is None and 'error' holds the error type."""
+        self.post_request_hooks.append(hook)
+
+    def record(self, endpoint: Endpoints | None, phase: str, seconds: float) -> None:
+        """Adds a duration sample for an endpoint and phase."""
+        name = endpoint.value if endpoint is not None else ""
+        with self._lock:
+            self._samples[name, phase].append(seconds)
+
+    def count(self, endpoint: Endpoints | None, counter: str, value: float = 1) -> None:
+        """Increments a counter for an endpoint."""
+        name = endpoint.value if endpoint is not None else ""
+        with self._lock:
+            self.counters[name, counter] += value
+
+    def before_request(self, endpoint: Endpoints, params: dict) -> float:
+        """Calls the pre-request hooks and returns the start time of the request."""
+        for hook in self.pre_request_hooks:
+            hook(endpoint, params)
+        return time.perf_counter()
+
+    def after_request(
+        self,
+        endpoint: Endpoints,
+        params: dict,
+        status_code: int,
+        ttfb: float,
+        started: float,
+        received: float,
+        size: int,
+        streamed: bool,
+        sent: float | None = None,
+        backoff: float = 0.0,
+    ) -> None:
+        """Records the phases of a finished request and calls the post-request hooks.
+
+        Parameters:
+            endpoint (Endpoints): The queried endpoint.
+            params (dict): The query parameters.
+            status_code (int): The status code of the final response.
+            ttfb (float): Seconds until the response headers of the final attempt arrived.
+            started (float): perf_counter() before sending.
+            received (float): perf_counter() after the response object was returned.
+            size (int): Size of the decoded body in bytes.
+            streamed (bool): True if the body was read while decoding.
+            sent (float | None): perf_counter() before sending the final attempt, defaults to
+                `started`.
+            backoff (float): Seconds slept between retries.
+        """
+        finished = time.perf_counter()
+        sent = started if sent is None else sent
+        phases = {
+            "ttfb": ttfb,
+            "download": 0.0 if streamed else max(0.0, received - sent - ttfb),
+            "decode": finished - received,
+            "wait": sent - started,
+            "backoff": backoff,
+            "total": finished - started,
+        }
+        for phase, seconds in phases.items():
+            self.record(endpoint, phase, seconds)
+        self.count(endpoint, "requests")
+        self.count(endpoint, "response_bytes", size)
+        if status_code != 200:
+            self.count(endpoint, "errors" if status_code != 304 else "not_modified")
+
+        record = {"status_code": status_code, "bytes": size, **phases}
+        self._export_span(f"GET /{endpoint.value}", started, finished, {**params, **record})
+        for hook in self.post_request_hooks:
+            hook(endpoint, params, record)
+
+    def failed_attempt(self, endpoint: Endpoints, error: BaseException) -> None:
+        """Counts an attempt that raised instead of returning a response, by error type."""
+        with self._lock:
+            self.failures[endpoint.value, type(error).__name__] += 1
+
+    def failed_request(
+        self,
+        endpoint: Endpoints,
+        params: dict,
+        error: BaseException,
+        started: float,
+        backoff: float = 0.0,
+    ) -> None:
+        """Records a request that raised after all its attempts and calls the post-request hooks.
+
+        Parameters:
+            endpoint (Endpoints): The queried endpoint.
+            params (dict): The query parameters.
+            error (BaseException): The error raised by the last attempt.
+            started (float): perf_counter() before sending.
+            backoff (float): Seconds slept between retries.
+        """
+        finished = time.perf_counter()
+        phases = {"backoff": backoff, "total": finished - started}
+        for phase, seconds in phases.items():
+            self.record(endpoint, phase, seconds)
+        self.count(endpoint, "requests")
+        self.count(endpoint, "errors")
+
+        record = {"status_code": None, "error": type(error).__name__, "bytes": 0, **phases}
+        self._export_span(f"GET /{endpoint.value}", started, finished, {**params, **record})
+        for hook in self.post_request_hooks:
+            hook(endpoint, params, record)
+
+    @contextmanager
+    def span(self, phase: str, endpoint: Endpoints | None = None, **attributes: Any):
+        """Times the enclosed block as a phase; attributes may be added to the yielded dict."""
+        started = time.perf_counter()
+        try:
+            yield attributes
+        finally:
+            finished = time.perf_counter()
+            self.record(endpoint, phase, finished - started)
+            for name, value in attributes.items():
+                if isinstance(value, (int, float)):
+                    self.count(endpoint, name, value)
+            self._export_span(phase, started, finished, attributes)
+
+    def _export_span(self, name: str, started: float, finished: float, attributes: dict) -> None:
+        if self.tracer is None:
+            return
+        offset = time.time_ns() - time.perf_counter_ns()
+        span = self.tracer.start_span(
+            f"energy_charts.{name}",
+            start_time=int(started * 1e9) + offset,
+            attributes={k: v for k, v in attributes.items() if isinstance(v, (str, int, float))},
+        )
+        span.end(end_time=int(finished * 1e9) + offset)
+
+    def summary(self) -> dict[str, dict[str, dict[str, float]]]:
+        """Returns count, mean, p50 and p95 in seconds per endpoint value and phase."""
+        import numpy as np
+
+        with self._lock:
+            samples = {key: np.array(values) for key, values in self._samples.items()}
+        summary: defaultdict[str, dict] = defaultdict(dict)
+        for (endpoint, phase), values in samples.items():
+            summary[endpoint][phase] = {
+                "count": len(values),
+                "mean": float(values.mean()),
+                "p50": float(np.percentile(values, 50)),
+                "p95": float(np.percentile(values, 95)),
+            }
+        return dict(summary)
+
+    def prometheus(self, prefix: str = "energy_charts") -> str:
+        """Returns the counters and phase quantiles in the Prometheus text exposition format."""
+        lines = [f"# TYPE {prefix}_phase_seconds summary"]
+        for endpoint, phases in sorted(self.summary().items()):
+            for phase, stats in sorted(phases.items()):
+                labels = f'endpoint="{endpoint}",phase="{phase}"'
+                for quantile in ("p50", "p95"):
+                    q = int(quantile[1:]) / 100
+                    lines.append(
+                        f'{prefix}_phase_seconds{{{labels},quantile="{q}"}} {stats[quantile]}'
+                    )
+                lines.append(f"{prefix}_phase_seconds_count{{{labels}}} {stats['count']}")
+        with self._lock:
+            counters = sorted(self.counters.items())
+            failures = sorted(self.failures.items())
+        for (endpoint, counter), value in counters:
+            lines.append(f'{prefix}_{counter}_total{{endpoint="{endpoint}"}} {value}')
+        for (endpoint, error), value in failures:
+            labels = f'endpoint="{endpoint}",error="{error}"'
+            lines.append(f"{prefix}_failed_attempts_total{{{labels}}} {value}")
+        return "\n".join(lines) + "\n"
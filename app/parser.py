@@ -1,63 +1,158 @@
-import pandas as pd
+from typing import TYPE_CHECKING
 
+import numpy as np
 
-def make_dataframe(response: dict) -> pd.DataFrame:
+from app import instrumentation
+from app.chunking import SERIES_KEYS, collect_series, numeric_columns
+from app.timeaxis import axis_from_labels, axis_from_seconds
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+def _fit(values, length: int) -> np.ndarray:
+    """Pads a series with NaN or truncates it so that it matches the given length."""
+    values = np.asarray(values, dtype=np.float64)
+    if len(values) >= length:
+        return values[:length]
+    padded = np.full(length, np.nan)
+    padded[: len(values)] = values
+    return padded
+
+
+def make_dataframe(response: dict, tz: str | None = None) -> "pd.DataFrame":
     """
     Converts an API response dictionary into a pandas DataFrame.
-    Merges data from 'production_types' and 'countries' keys by timestamp.
+    Aligns data from 'production_types' and 'countries' keys by timestamp.
+
+    All named series are stacked into a single float64 block in one pass. Series whose
+    length differs from 'unix_seconds' are padded with NaN (or truncated) to fit.
+    'days' and 'time' labels are parsed into dates; timestamps and dates come from the
+    shared axes of app.timeaxis.
 
     Parameters:
         response (dict): The API response to parse.
+        tz (str | None): Timezone of the timestamps, e.g. 'UTC' or 'Europe/Berlin'. None keeps
+                         naive UTC timestamps and naive dates.
 
     Returns:
         pd.DataFrame: A DataFrame with aligned data and timestamps.
     """
+    if (instruments := instrumentation.active()) is None:
+        return _make_dataframe(response, tz)
+    with instruments.span("parse") as attributes:
+        df = _make_dataframe(response, tz)
+        attributes.update(rows=len(df), columns=df.shape[1])
+    return df
+
+
+def _make_dataframe(response: dict, tz: str | None) -> "pd.DataFrame":
+    import pandas as pd
+
     if not response:
         raise ValueError("The response is empty or invalid.")
 
-    # Convert 'unix_seconds' to timestamps
-    timestamps = (
-        pd.to_datetime(response.get("unix_seconds", []), unit="s")
-        if "unix_seconds" in response
-        else None
-    )
+    names, series = collect_series(response)
+    other_columns = {k: v for k, v in response.items() if k not in {*SERIES_KEYS, "unix_seconds"}}
+
+    # Determine the row count: the timestamps if present, otherwise the longest list
+    if "unix_seconds" in response:
+        seconds = np.asarray(
+            response["unix_seconds"] if response["unix_seconds"] is not None else [], dtype=np.int64
+        )
+        length = len(seconds)
+    else:
+        seconds = None
+        lengths = [len(s) for s in series]
+        lengths += [len(v) for v in other_columns.values() if isinstance(v, (list, np.ndarray))]
+        length = max(lengths, default=0)
+
+    # Stack all named series into one float64 block, aligning only when lengths differ
+    if series and all(len(s) == length for s in series):
+        block = np.array(series, dtype=np.float64).reshape(len(series), length).T
+    else:
+        block = np.empty((length, len(series)), dtype=np.float64)
+        for i, values in enumerate(series):
+            block[:, i] = _fit(values, length)
+
+    df = pd.DataFrame(block, columns=names)
 
-    # Initialize a DataFrame with timestamps
-    df = pd.DataFrame({"timestamp": timestamps}) if timestamps is not None else pd.DataFrame()
-
-    # Handle 'production_types'
-    if "production_types" in response:
-        for entry in response["production_types"]:
-            if isinstance(entry, dict):
-                name = entry.get("name")  # Use 'name' as column name
-                data = entry.get("data", [])
-                temp_df = pd.DataFrame({"timestamp": timestamps, name: data})
-                df = pd.merge(df, temp_df, on="timestamp", how="outer")
-
-    # Handle 'countries'
-    if "countries" in response:
-        for entry in response["countries"]:
-            if isinstance(entry, dict):
-                name = entry.get("name")  # Use 'name' as column name
-                data = entry.get("data", [])
-                temp_df = pd.DataFrame({"timestamp": timestamps, name: data})
-                df = pd.merge(df, temp_df, on="timestamp", how="outer")
+    if seconds is not None:
+        df.insert(0, "timestamp", axis_from_seconds(seconds).index(tz))
 
     # Add other fields
-    other_columns = {
-        k: v
-        for k, v in response.items()
-        if k not in {"production_types", "countries", "unix_seconds"}
-    }
     for key, values in other_columns.items():
-        if isinstance(values, list):  # Align lists with timestamps
-            temp_df = pd.DataFrame({"timestamp": timestamps, key: values})
-            df = pd.merge(df, temp_df, on="timestamp", how="outer")
+        if key in ("days", "time") and isinstance(values, list) and len(values) == length:
+            try:
+                values = axis_from_labels(values).index(tz, name=key)
+            except ValueError:  # labels in another format are kept as strings
+                pass
+        if isinstance(values, (list, np.ndarray, pd.Index)):  # Align lists with timestamps
+            df[key] = values if len(values) == length else pd.Series(values).reindex(df.index)
         else:  # Add scalar values directly
             df[key] = values
 
     # Ensure the DataFrame is sorted by timestamp
-    if "timestamp" in df.columns:
-        df = df.sort_values(by="timestamp")
+    if seconds is not None and not (np.diff(seconds) >= 0).all():
+        df = df.sort_values(by="timestamp", kind="stable", ignore_index=True)
 
     return df
+
+
+def make_panel(responses: dict, layout: str = "wide", tz: str | None = None) -> "pd.DataFrame":
+    """
+    Combines the time-series responses of several countries or zones into one DataFrame.
+
+    All values are written into one float64 block on the union of the timestamp grids, so
+    entities with different resolutions (e.g. hourly and 15-minute prices) are aligned without
+    merging; timestamps missing for an entity are NaN. Series whose length differs from
+    'unix_seconds' are padded with NaN (or truncated) to fit, as in make_dataframe.
+
+    Parameters:
+        responses (dict): The responses by country, bidding zone or region (enum or str).
+        layout (str): 'wide' for a timestamp index with (area, series) MultiIndex columns,
+                      'long' for a tidy frame with timestamp, area, series and value columns
+                      without missing values.
+        tz (str | None): Timezone of the timestamps, None for naive UTC timestamps.
+
+    Returns:
+        pd.DataFrame: The combined data.
+    """
+    if layout not in ("wide", "long"):
+        raise ValueError(f"Unsupported layout: {layout!r}")
+    import pandas as pd
+
+    entities = []
+    for area, response in responses.items():
+        if not response or "unix_seconds" not in response:
+            continue
+        seconds = np.asarray(response["unix_seconds"], dtype=np.int64)
+        names, columns = numeric_columns(response)
+        entities.append((getattr(area, "value", area), seconds, names, columns))
+
+    grid = np.unique(np.concatenate([s for _, s, _, _ in entities] or [np.empty(0, np.int64)]))
+    labels = [(area, name) for area, _, names, _ in entities for name in names]
+    block = np.full((len(grid), len(labels)), np.nan)
+    column = 0
+    for _, seconds, _, columns in entities:
+        rows = np.searchsorted(grid, seconds)
+        for values in columns:
+            block[rows, column] = _fit(values, len(seconds))
+            column += 1
+
+    timestamps = axis_from_seconds(grid).index(tz)
+    if layout == "wide":
+        columns = pd.MultiIndex.from_tuples(labels, names=["area", "series"])
+        return pd.DataFrame(block, index=timestamps, columns=columns)
+
+    rows, cols = np.nonzero(~np.isnan(block))
+    areas = pd.Categorical([area for area, _ in labels])
+    series = pd.Categorical([name for _, name in labels])
+    return pd.DataFrame(
+        {
+            "timestamp": timestamps[rows],
+            "area": areas.take(cols),
+            "series": series.take(cols),
+            "value": block[rows, cols],
+        }
+    )
@@ -0,0 +1,272 @@
+# -*- coding: utf-8 -*-
+"""
+This module provides a background poller that shares live feeds of the Energy Charts API.
+
+Classes:
+    Subscription: A consumer of a feed, receiving changes through a callback or an asyncio queue.
+    LiveFeedPoller: Polls every distinct (endpoint, params) feed once per interval and pushes
+        only the changed timestamps to all of its subscribers.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from datetime import timedelta
+from enum import Enum
+from typing import Any
+
+import numpy as np
+
+from app.api import EnergyChartsAPI
+from app.cache import DEFAULT_TTL, ENDPOINT_TTLS, make_key
+from app.chunking import SERIES_KEYS, numeric_columns
+from app.enums import Endpoints
+
+logger = logging.getLogger(__name__)
+
+
+def _matrix(response: dict) -> tuple[np.ndarray, list[str], np.ndarray]:
+    """Returns the timestamps, the names and a (time, series) float64 matrix of a response."""
+    seconds = np.asarray(response.get("unix_seconds", []), dtype=np.int64)
+    names, columns = numeric_columns(response)
+    values = np.full((len(seconds), len(names)), np.nan)
+    for i, column in enumerate(columns):
+        values[:, i] = np.asarray(column, dtype=np.float64)
+    return seconds, names, values
+
+
+def diff_responses(previous: dict | None, current: dict) -> dict | None:
+    """Returns the part of `current` whose timestamps are new or have changed values.
+
+    Parameters:
+        previous (dict | None): The previous response of the feed, None for the first poll.
+        current (dict): The new response.
+
+    Returns:
+        dict | None: `current` restricted to the changed timestamps, None if nothing changed.
+    """
+    seconds, names, values = _matrix(current)
+    changed = np.ones(len(seconds), dtype=bool)
+    if previous:
+        old_seconds, old_names, old_values = _matrix(previous)
+        if old_names == names and len(old_seconds):
+            positions = np.clip(np.searchsorted(old_seconds, seconds), 0, len(old_seconds) - 1)
+            known = old_seconds[positions] == seconds
+            old = old_values[positions]
+            same = (old == values) | (np.isnan(old) & np.isnan(values))
+            changed = ~known | ~same.all(axis=1)
+    if not changed.any():
+        return None
+
+    def take(column):
+        column = np.asarray(column)[changed]
+        return column if isinstance(current.get("unix_seconds"), np.ndarray) else column.tolist()
+
+    result = {}
+    for key, value in current.items():
+        if key in SERIES_KEYS:
+            result[key] = [{**e, "data": take(e.get("data"))} for e in value]
+        elif isinstance(value, (list, np.ndarray)) and len(value) == len(seconds):
+            result[key] = take(value)
+        else:
+            result[key] = value
+    return result
+
+
+@dataclass(eq=False)
+class Subscription:
+    """A consumer of a feed.
+
+    Attributes:
+        key (str): The feed key, see cache.make_key.
+        callback (Callable[[dict], None] | None): Called with every change in the poller thread.
+        queue (asyncio.Queue | None): Receives every change on the event loop `loop`.
+        loop (asyncio.AbstractEventLoop | None): The loop owning `queue`.
+    """
+
+    key: str
+    callback: Callable[[dict], None] | None = None
+    queue: asyncio.Queue | None = None
+    loop: asyncio.AbstractEventLoop | None = None
+    poller: "LiveFeedPoller | None" = field(default=None, repr=False)
+
+    def deliver(self, changes: dict) -> None:
+        if self.callback is not None:
+            try:
+                self.callback(changes)
+            except Exception:
+                logger.exception("Subscriber callback of %s failed", self.key)
+        if self.queue is not None:
+            try:
+                self.loop.call_soon_threadsafe(self.queue.put_nowait, changes)
+            except RuntimeError:  # the event loop of the subscriber is closed
+                logger.warning("Dropping subscription to %s: its event loop is closed", self.key)
+                self.cancel()
+
+    def cancel(self) -> None:
+        """Stops the delivery of changes to this subscription."""
+        if self.poller is not None:
+            self.poller.unsubscribe(self)
+
+
+@dataclass(eq=False)
+class _Feed:
+    endpoint: Endpoints
+    params: dict[str, Any]
+    interval: float
+    subscribers: list[Subscription] = field(default_factory=list)
+    latest: dict | None = None
+    # Identifies the schedule entries of this feed; entries of a removed feed with the same key
+    # are skipped
+    generation: int = 0
+
+
+class LiveFeedPoller:
+    """Polls each distinct (endpoint, params) feed once per interval in a background thread.
+
+    The number of upstream requests depends only on the number of distinct feeds, not on the
+    number of subscribers. Each poll is compared with the previous one, and only new or changed
+    timestamps are pushed to the subscribers. New subscribers first receive the latest response.
+
+    Example:
+        with LiveFeedPoller(EnergyChartsAPI()) as poller:
+            poller.subscribe(Endpoints.SIGNAL, print, country=Countries.GERMANY)
+    """
+
+    def __init__(
+        self,
+        api: EnergyChartsAPI,
+        intervals: dict[Endpoints, timedelta] | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Parameters:
+            api (EnergyChartsAPI): The client used for polling.
+            intervals (dict[Endpoints, timedelta] | None): Poll intervals per endpoint,
+                overriding the cache lifetimes in cache.ENDPOINT_TTLS.
+            clock (Callable[[], float]): Monotonic clock in seconds the polls are scheduled by.
+        """
+        self.api = api
+        self._clock = clock
+        self.intervals = {**ENDPOINT_TTLS, **(intervals or {})}
+        self.requests = 0
+        self._feeds: dict[str, _Feed] = {}
+        self._schedule: list[tuple[float, str, int]] = []
+        self._generations = itertools.count()
+        self._condition = threading.Condition()
+        self._thread: threading.Thread | None = None
+        self._stopped = False
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def start(self) -> None:
+        """Starts the background thread."""
+        with self._condition:
+            self._stopped = False
+        self._thread = threading.Thread(target=self._run, name="LiveFeedPoller", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stops the background thread after the current poll."""
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+
+    def subscribe(
+        self,
+        endpoint: Endpoints,
+        callback: Callable[[dict], None] | None = None,
+        queue: asyncio.Queue | None = None,
+        **params: Enum | str | int | None,
+    ) -> Subscription:
+        """Subscribes to the feed of an endpoint and its parameters.
+
+        Parameters:
+            endpoint (Endpoints): The endpoint, e.g. Endpoints.SIGNAL.
+            callback (Callable[[dict], None] | None): Called with every change.
+            queue (asyncio.Queue | None): Receives every change; must be created on the running
+                event loop of the caller.
+            **params: The query parameters, enums are passed by value.
+
+        Returns:
+            Subscription: The subscription, which can be cancelled.
+        """
+        params = {k: v.value if isinstance(v, Enum) else v for k, v in params.items()}
+        key = make_key(endpoint, params)
+        loop = asyncio.get_running_loop() if queue is not None else None
+        subscription = Subscription(key, callback, queue, loop, self)
+        with self._condition:
+            feed = self._feeds.get(key)
+            if feed is None:
+                interval = self.intervals.get(endpoint, DEFAULT_TTL).total_seconds()
+                feed = self._feeds[key] = _Feed(
+                    endpoint, params, interval, generation=next(self._generations)
+                )
+                heapq.heappush(self._schedule, (self._clock(), key, feed.generation))
+                self._condition.notify_all()
+            feed.subscribers.append(subscription)
+            latest = feed.latest
+        if latest is not None:
+            subscription.deliver(latest)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """Removes a subscription; feeds without subscribers are no longer polled."""
+        with self._condition:
+            feed = self._feeds.get(subscription.key)
+            if feed is not None and subscription in feed.subscribers:
+                feed.subscribers.remove(subscription)
+                if not feed.subscribers:
+                    del self._feeds[subscription.key]
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._stopped and (feed := self._pop_due()) is None:
+                    timeout = self._schedule[0][0] - self._clock() if self._schedule else None
+                    self._condition.wait(timeout)
+                if self._stopped:
+                    return
+            self._poll(feed)
+
+    def _pop_due(self) -> _Feed | None:
+        """Returns the next feed due for a poll and schedules its following poll one interval
+        later, or None if no feed is due. Must be called with the condition held."""
+        while self._schedule and self._schedule[0][0] <= self._clock():
+            _, key, generation = heapq.heappop(self._schedule)
+            feed = self._feeds.get(key)
+            if feed is None or feed.generation != generation:  # unsubscribed meanwhile
+                continue
+            heapq.heappush(self._schedule, (self._clock() + feed.interval, key, generation))
+            return feed
+        return None
+
+    def _poll(self, feed: _Feed) -> None:
+        try:
+            response = self.api.get(feed.endpoint, **feed.params)
+        except Exception:
+            logger.exception("Polling %s failed", feed.endpoint.value)
+            return
+        finally:
+            self.requests += 1
+        changes = diff_responses(feed.latest, response) if response else None
+        if response:
+            feed.latest = response
+        if changes is None:
+            return
+        with self._condition:
+            subscribers = list(feed.subscribers)
+        for subscription in subscribers:
+            subscription.deliver(changes)
@@ -0,0 +1,217 @@
+# -*- coding: utf-8 -*-
+"""
+This module provides compact, NumPy-backed result classes for the responses of the Energy Charts API.
+
+Classes:
+    TimeSeriesResult: Responses with 'unix_seconds' and top-level value lists, e.g. price or frequency.
+    MultiSeriesResult: Responses with 'unix_seconds' and named 'production_types' or 'countries' series.
+    DailyAverageResult: Responses of the '*_daily_avg' endpoints with 'days'.
+    InstalledPowerResult: Responses of the installed power endpoint with 'time'.
+
+All values are stored in one float64 block with one row per series; timestamps are stored as
+int64. The results are read-only mappings in the documented response schema, so code written
+for the plain dictionaries keeps working, while to_numpy() and to_pandas() return views.
+"""
+
+from collections.abc import Iterator, Mapping
+from typing import Any
+
+import numpy as np
+
+from app.chunking import SERIES_KEYS
+from app.timeaxis import axis_from_labels, axis_from_seconds
+
+
+def _stack(columns: list, length: int) -> np.ndarray:
+    """Stacks value lists into a float64 block with one row per series, padding with NaN."""
+    block = np.full((len(columns), length), np.nan)
+    for row, values in zip(block, columns):
+        values = np.asarray(values if values is not None else [], dtype=np.float64)[:length]
+        row[: len(values)] = values
+    return block
+
+
+class _BaseResult(Mapping):
+    __slots__ = ("index", "names", "block", "meta")
+
+    def __init__(self, index: Any, names: list[str], block: np.ndarray, meta: dict[str, Any]):
+        """
+        Parameters:
+            index (Any): The timestamps or labels, one per column of `block`.
+            names (list[str]): The series names, one per row of `block`.
+            block (np.ndarray): The values with shape (len(names), len(index)).
+            meta (dict[str, Any]): All scalar fields of the response, e.g. 'deprecated'.
+        """
+        self.index = index
+        self.names = names
+        self.block = block
+        self.meta = meta
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(names={self.names}, length={self.block.shape[1]})"
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def to_numpy(self) -> np.ndarray:
+        """Returns the values as a (time, series) view without copying."""
+        return self.block.T
+
+    def to_pandas(self, tz: str | None = None):
+        """Returns the values as a DataFrame sharing memory with this result.
+
+        Parameters:
+            tz (str | None): Timezone of the index, e.g. 'UTC' or 'Europe/Berlin'; None for
+                naive UTC timestamps (naive dates for daily averages).
+        """
+        import pandas as pd
+
+        return pd.DataFrame(
+            self.block.T, index=self._pandas_index(tz), columns=self.names, copy=False
+        )
+
+    def _pandas_index(self, tz: str | None):
+        raise NotImplementedError
+
+
+class TimeSeriesResult(_BaseResult):
+    """A response with 'unix_seconds' and value lists such as 'data', 'price' or 'share'."""
+
+    __slots__ = ()
+
+    def _pandas_index(self, tz: str | None):
+        return axis_from_seconds(self.index).index(tz)
+
+    def __getitem__(self, key: str) -> Any:
+        if key == "unix_seconds":
+            return self.index
+        if key in self.names:
+            return self.block[self.names.index(key)]
+        return self.meta[key]
+
+    def __iter__(self) -> Iterator[str]:
+        yield "unix_seconds"
+        yield from self.names
+        yield from self.meta
+
+
+class MultiSeriesResult(TimeSeriesResult):
+    """A response with 'unix_seconds' and named series below 'production_types' or 'countries'."""
+
+    __slots__ = ("key",)
+
+    def __init__(self, index, names, block, meta, key: str = "production_types"):
+        super().__init__(index, names, block, meta)
+        self.key = key
+
+    def __getitem__(self, key: str) -> Any:
+        if key == "unix_seconds":
+            return self.index
+        if key == self.key:
+            return [{"name": n, "data": row} for n, row in zip(self.names, self.block)]
+        return self.meta[key]
+
+    def __iter__(self) -> Iterator[str]:
+        yield "unix_seconds"
+        yield self.key
+        yield from self.meta
+
+
+class DailyAverageResult(_BaseResult):
+    """A response of a '*_daily_avg' endpoint with 'days' ("dd.mm.yyyy") and 'data'."""
+
+    __slots__ = ()
+
+    def _pandas_index(self, tz: str | None):
+        return axis_from_labels(self.index).index(tz, name="day")
+
+    def __getitem__(self, key: str) -> Any:
+        if key == "days":
+            return self.index
+        if key == "data":
+            return self.block[0]
+        return self.meta[key]
+
+    def __iter__(self) -> Iterator[str]:
+        yield "days"
+        yield "data"
+        yield from self.meta
+
+
+class InstalledPowerResult(_BaseResult):
+    """A response of the installed power endpoint with 'time' labels and 'production_types'."""
+
+    __slots__ = ()
+
+    def _pandas_index(self, tz: str | None):
+        try:
+            return axis_from_labels(self.index).index(tz, name="time")
+        except ValueError:  # labels in another format are kept as they are
+            import pandas as pd
+
+            return pd.Index(self.index, name="time")
+
+    def __getitem__(self, key: str) -> Any:
+        if key == "time":
+            return self.index
+        if key == "production_types":
+            return [{"name": n, "data": row} for n, row in zip(self.names, self.block)]
+        return self.meta[key]
+
+    def __iter__(self) -> Iterator[str]:
+        yield "time"
+        yield "production_types"
+        yield from self.meta
+
+
+def _is_array(value: Any) -> bool:
+    return isinstance(value, (list, np.ndarray))
+
+
+def wrap_response(response: dict | None) -> _BaseResult | dict | None:
+    """Converts a response into the result class of its schema family.
+
+    Parameters:
+        response (dict | None): A response as returned by the API.
+
+    Returns:
+        _BaseResult | dict | None: The typed result, or the response itself if its schema is
+            not recognized.
+    """
+    if not isinstance(response, dict):
+        return response
+
+    def lists(keys):
+        return {
+            k: v for k, v in response.items() if k not in keys and isinstance(v, (list, np.ndarray))
+        }
+
+    def scalars(keys):
+        return {k: v for k, v in response.items() if k not in keys and k not in lists(keys)}
+
+    series_key = next((k for k in SERIES_KEYS if k in response), None)
+    if "unix_seconds" in response:
+        # Results on the same grid share one read-only timestamp array
+        index = axis_from_seconds(response["unix_seconds"]).seconds
+        if series_key is not None:
+            entries = response[series_key]
+            names = [e.get("name") for e in entries]
+            block = _stack([e.get("data") for e in entries], len(index))
+            meta = scalars({"unix_seconds", series_key})
+            return MultiSeriesResult(index, names, block, meta, key=series_key)
+        columns = {k: v for k, v in response.items() if _is_array(v) and len(v) == len(index)}
+        del columns["unix_seconds"]
+        block = _stack(list(columns.values()), len(index))
+        return TimeSeriesResult(index, list(columns), block, scalars({"unix_seconds"}))
+    if "days" in response:
+        block = _stack([response.get("data", [])], len(response["days"]))
+        return DailyAverageResult(
+            list(response["days"]), ["data"], block, scalars({"days", "data"})
+        )
+    if "time" in response and series_key == "production_types":
+        entries = response[series_key]
+        names = [e.get("name") for e in entries]
+        block = _stack([e.get("data") for e in entries], len(response["time"]))
+        meta = scalars({"time", series_key})
+        return InstalledPowerResult(list(response["time"]), names, block, meta)
+    return response
@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+"""
+This module provides a rate-limit-aware request scheduler for the Energy Charts API client.
+
+Classes:
+    Priority: The request lanes; lower values are served first.
+    TokenBucket: A thread-safe token bucket that adapts its rate to 429 responses.
+    RequestScheduler: Runs requests with a rate limit, bounded concurrency, priority lanes and retries.
+"""
+
+import random
+import threading
+import time
+from collections.abc import Callable
+from contextlib import contextmanager
+from enum import IntEnum
+from typing import TYPE_CHECKING
+
+from app.enums import Endpoints
+
+if TYPE_CHECKING:
+    import requests
+
+
+class Priority(IntEnum):
+    """Available request lanes of the scheduler."""
+
+    INTERACTIVE = 0
+    BULK = 1
+
+
+# Endpoints that are usually queried by interactive callers
+INTERACTIVE_ENDPOINTS = {
+    Endpoints.SIGNAL,
+    Endpoints.REN_SHARE_FORECAST,
+    Endpoints.SOLAR_SHARE,
+    Endpoints.WIND_ONSHORE_SHARE,
+    Endpoints.WIND_OFFSHORE_SHARE,
+}
+
+# Status codes worth retrying
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """A token bucket that halves its rate on throttling and recovers additively on success."""
+
+    def __init__(self, rate: float, capacity: float, min_rate: float | None = None):
+        self.max_rate = rate
+        self.min_rate = rate / 16 if min_rate is None else min_rate
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Blocks until a token is available and takes it."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def throttled(self) -> None:
+        """Halves the rate after the server signalled overload."""
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+            self._tokens = min(self._tokens, 0)
+
+    def succeeded(self) -> None:
+        """Raises the rate by a twentieth of the maximum rate after a successful request."""
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+
+
+class RequestScheduler:
+    """Runs requests with a token-bucket rate limit, bounded concurrency and retries.
+
+    Requests waiting in a lower-numbered Priority lane always get the next free slot, so
+    interactive calls are not stuck behind a bulk backfill. Failed attempts (connection errors,
+    timeouts and RETRY_STATUS_CODES) are retried with exponential backoff and full jitter,
+    honouring the Retry-After header.
+
+    Example:
+        api = EnergyChartsAPI(chunked=True, scheduler=RequestScheduler(rate=5, max_concurrency=8))
+    """
+
+    def __init__(
+        self,
+        rate: float = 5.0,
+        burst: int = 10,
+        max_concurrency: int = 8,
+        max_retries: int = 5,
+        backoff_base: float = 0.5,
+        backoff_max: float = 60.0,
+    ):
+        """
+        Parameters:
+            rate (float): Maximum sustained number of requests per second.
+            burst (int): Number of requests that may be sent at once after an idle period.
+            max_concurrency (int): Maximum number of requests in flight.
+            max_retries (int): Maximum number of retries per request.
+            backoff_base (float): Backoff of the first retry in seconds, doubled for every retry.
+            backoff_max (float): Upper bound of the backoff in seconds.
+        """
+        self.bucket = TokenBucket(rate, burst)
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retries = 0
+        self._active = 0
+        self._waiting = {priority: 0 for priority in Priority}
+        self._condition = threading.Condition()
+
+    @contextmanager
+    def _slot(self, priority: Priority):
+        """Holds one of the concurrency slots, serving waiting lanes in priority order."""
+        with self._condition:
+            self._waiting[priority] += 1
+            while self._active >= self.max_concurrency or any(
+                self._waiting[p] for p in Priority if p < priority
+            ):
+                self._condition.wait()
+            self._waiting[priority] -= 1
+            self._active += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._active -= 1
+                self._condition.notify_all()
+
+    def _backoff(self, attempt: int, response: "requests.Response | None") -> float:
+        """Returns the delay before the next attempt in seconds."""
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2**attempt))
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after:
+            try:
+                wait = float(retry_after)
+            except ValueError:
+                from email.utils import parsedate_to_datetime
+
+                try:
+                    wait = parsedate_to_datetime(retry_after).timestamp() - time.time()
+                except (TypeError, ValueError):  # malformed header: keep the computed delay
+                    return delay
+            delay = max(delay, min(wait, self.backoff_max))
+        return delay
+
+    def run(
+        self,
+        send: Callable[[], "requests.Response"],
+        priority: Priority = Priority.BULK,
+        on_backoff: Callable[[float], None] | None = None,
+    ) -> "requests.Response":
+        """Sends a request, retrying it on throttling, server errors and connection errors.
+
+        Parameters:
+            send (Callable[[], requests.Response]): Sends the request once.
+            priority (Priority): The lane of the request.
+            on_backoff (Callable[[float], None] | None): Called with the delay in seconds before
+                sleeping ahead of every retry.
+
+        Returns:
+            requests.Response: The first response that is not retried, or the last response
+                if all retries failed. The last connection error is raised in that case.
+        """
+        import requests
+
+        for attempt in range(self.max_retries + 1):
+            response, error = None, None
+            with self._slot(priority):
+                self.bucket.acquire()
+                try:
+                    response = send()
+                except (requests.ConnectionError, requests.Timeout) as exception:
+                    error = exception
+
+            if response is not None and response.status_code not in RETRY_STATUS_CODES:
+                self.bucket.succeeded()
+                return response
+            if response is not None and response.status_code == 429:
+                self.bucket.throttled()
+            if attempt == self.max_retries:
+                break
+            with self._condition:
+                self.retries += 1
+            delay = self._backoff(attempt, response)
+            if response is not None:
+                response.close()  # returns the connection of a streamed response to the pool
+            if on_backoff is not None:
+                on_backoff(delay)
+            time.sleep(delay)
+
+        if error is not None:
+            raise error
+        return response
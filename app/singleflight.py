@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""
+This module coalesces concurrent identical requests of the Energy Charts API clients.
+
+Classes:
+    SingleFlight: Runs at most one call per key at a time across threads; concurrent callers
+        with the same key wait for it and share its result or exception.
+    AsyncSingleFlight: The same for coroutines on one event loop.
+
+Keys are the cache keys of app.cache.make_key, i.e. the endpoint and the normalized parameters.
+"""
+
+import asyncio
+import threading
+from collections.abc import Awaitable, Callable
+from concurrent.futures import Future
+from typing import Any
+
+
+class _Counters:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.executed = 0
+        self.suppressed = 0
+
+    @property
+    def calls(self) -> int:
+        """Number of calls, executed or shared."""
+        return self.executed + self.suppressed
+
+    def _count(self, leader: bool) -> None:
+        with self._lock:
+            if leader:
+                self.executed += 1
+            else:
+                self.suppressed += 1
+
+
+class SingleFlight(_Counters):
+    """Coalesces concurrent calls with the same key across threads.
+
+    Attributes:
+        executed (int): Number of calls that were actually run.
+        suppressed (int): Number of calls that shared the result of a call in flight.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._flights: dict[str, Future] = {}
+
+    def do(self, key: str, call: Callable[[], Any]) -> Any:
+        """Runs `call`, or waits for the call with the same key that is already in flight.
+
+        Parameters:
+            key (str): The identity of the call.
+            call (Callable[[], Any]): The call, run in the calling thread if it leads.
+
+        Returns:
+            Any: The result of the call; its exception is raised in every waiting caller.
+        """
+        with self._lock:
+            future = self._flights.get(key)
+            leader = future is None
+            if leader:
+                future = self._flights[key] = Future()
+        self._count(leader)
+        if not leader:
+            return future.result()
+
+        try:
+            future.set_result(call())
+        except BaseException as exception:
+            future.set_exception(exception)
+        finally:
+            with self._lock:
+                del self._flights[key]
+        return future.result()
+
+
+class AsyncSingleFlight(_Counters):
+    """Coalesces concurrent coroutine calls with the same key on one event loop.
+
+    Attributes:
+        executed (int): Number of calls that were actually run.
+        suppressed (int): Number of calls that shared the result of a call in flight.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._flights: dict[str, asyncio.Task] = {}
+
+    async def do(self, key: str, call: Callable[[], Awaitable[Any]]) -> Any:
+        """Awaits `call()`, or the call with the same key that is already in flight.
+
+        The call runs in its own task, so cancelling one waiting caller does not cancel it for
+        the others.
+        """
+        task = self._flights.get(key)
+        leader = task is None
+        if leader:
+            task = self._flights[key] = asyncio.ensure_future(call())
+            task.add_done_callback(lambda _: self._flights.pop(key, None))
+        self._count(leader)
+        return await asyncio.shield(task)
@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+"""
+This module provides a local, range-aware store for time series of the Energy Charts API.
+
+Classes:
+    RangeStore: Keeps fetched responses per query and fetches only the intervals it does not hold yet.
+
+Ranges are tracked in UNIX seconds; naive `start`/`end` values are interpreted as UTC.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from enum import Enum
+
+import numpy as np
+
+from app.api import EnergyChartsAPI
+from app.cache import SETTLED_AFTER
+from app.chunking import SERIES_KEYS, merge_responses, slice_response
+from app.enums import BindingZones, Countries, Endpoints, SubTypes
+from app.timerange import to_unix
+
+
+def missing_intervals(
+    intervals: list[tuple[int, int]], lower: int, upper: int
+) -> list[tuple[int, int]]:
+    """Returns the parts of [lower, upper) not covered by the sorted, disjoint intervals."""
+    gaps = []
+    for start, end in intervals:
+        if end <= lower:
+            continue
+        if start >= upper:
+            break
+        if start > lower:
+            gaps.append((lower, start))
+        lower = max(lower, end)
+    if lower < upper:
+        gaps.append((lower, upper))
+    return gaps
+
+
+def add_interval(intervals: list[tuple[int, int]], start: int, end: int) -> list[tuple[int, int]]:
+    """Adds [start, end) to the sorted, disjoint intervals, joining overlapping neighbours."""
+    merged = []
+    for lower, upper in sorted([*intervals, (start, end)]):
+        if merged and lower <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], upper))
+        else:
+            merged.append((lower, upper))
+    return merged
+
+
+def _last_valid_second(response: dict | None) -> int | None:
+    """Returns the last timestamp for which the response holds at least one value."""
+    if not response or not len(response.get("unix_seconds", [])):
+        return None
+    seconds = np.asarray(response["unix_seconds"], dtype=np.int64)
+    columns = [e.get("data") for key in SERIES_KEYS for e in response.get(key) or []]
+    columns += [
+        v
+        for k, v in response.items()
+        if k not in SERIES_KEYS and k != "unix_seconds" and isinstance(v, (list, np.ndarray))
+    ]
+    valid = np.zeros(len(seconds), dtype=bool)
+    for column in columns:
+        if column is None or len(column) != len(seconds):
+            continue
+        try:
+            valid |= ~np.isnan(np.asarray(column, dtype=np.float64))
+        except (TypeError, ValueError):  # non-numeric columns do not indicate published data
+            continue
+    return int(seconds[valid][-1]) if valid.any() else None
+
+
+def _step(seconds) -> int:
+    """Returns the median spacing of the timestamps, 0 for a single timestamp."""
+    if len(seconds) < 2:
+        return 0
+    return int(np.median(np.diff(np.asarray(seconds, dtype=np.int64))))
+
+
+class _Query:
+    """The held intervals and stored windows of one query."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.intervals: list[tuple[int, int]] = []
+        # Responses with disjoint, ascending timestamps as (first second, last second, response),
+        # separated by more than one sample step
+        self.windows: list[tuple[int, int, dict]] = []
+
+    def add(self, response: dict | None) -> None:
+        """Stores a response, replacing the overlapping parts of older windows and coalescing
+        it with the windows it overlaps or adjoins, so that consecutive fetches of a polled
+        range stay a single window."""
+        if not response or not len(response.get("unix_seconds", [])):
+            return
+        seconds = response["unix_seconds"]
+        first, last = int(seconds[0]), int(seconds[-1])
+        windows, neighbours = [], []
+        for start, end, window in self.windows:
+            if end < first or start > last:
+                parts = [window]
+            else:
+                parts = [
+                    slice_response(window, start, first - 1),
+                    slice_response(window, last + 1, end),
+                ]
+            for part in parts:
+                if not len(part_seconds := part.get("unix_seconds", [])):
+                    continue
+                lower, upper = int(part_seconds[0]), int(part_seconds[-1])
+                # Windows one sample step apart adjoin the response
+                step = max(_step(seconds), _step(part_seconds))
+                if upper + step >= first and lower - step <= last:
+                    neighbours.append((lower, upper, part))
+                else:
+                    windows.append((lower, upper, part))
+        if neighbours:
+            joined = sorted([*neighbours, (first, last, response)], key=lambda w: w[0])
+            response = merge_responses([w for _, _, w in joined])
+            first, last = joined[0][0], max(end for _, end, _ in joined)
+        windows.append((first, last, response))
+        self.windows = sorted(windows, key=lambda w: w[0])
+
+    def read(self, lower: int, upper: int) -> dict | None:
+        """Returns the stored series with lower <= unix_seconds <= upper."""
+        windows = [w for start, end, w in self.windows if end >= lower and start <= upper]
+        return slice_response(merge_responses(windows), lower, upper)
+
+
+class RangeStore:
+    """A local store beside EnergyChartsAPI that fetches only missing intervals.
+
+    For every (endpoint, country/zone, subtype) query, the store records which [start, end)
+    intervals it holds. A request fetches only the gaps and coalesces each fetched window with
+    the stored windows it overlaps or adjoins, so that reads merge only non-adjacent windows. Trailing timestamps without
+    values are not recorded as held unless the range is settled, so rolling-window polling
+    refetches only the most recent intervals.
+
+    Queries are fetched under a lock of their own, so concurrent requests for different queries
+    do not wait for each other. At most `max_queries` queries are held; the least recently used
+    ones are dropped beyond that.
+
+    Example:
+        store = RangeStore(EnergyChartsAPI())
+        response = store.get_public_power(Countries.GERMANY, "1704063600", "1704668400")
+    """
+
+    def __init__(self, api: EnergyChartsAPI, max_queries: int = 256):
+        """
+        Parameters:
+            api (EnergyChartsAPI): The client used to fetch missing intervals.
+            max_queries (int): Maximum number of queries whose series are held.
+        """
+        self.api = api
+        self.max_queries = max_queries
+        self.fetched_intervals = 0
+        self._queries: OrderedDict[tuple, _Query] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def intervals(self, endpoint: Endpoints, **params: Enum | str | None) -> list[tuple[int, int]]:
+        """Returns the [start, end) intervals in UNIX seconds held for the query."""
+        query = self._queries.get(self._key(endpoint, params))
+        return list(query.intervals) if query is not None else []
+
+    def get(
+        self, endpoint: Endpoints, start: str, end: str, **params: Enum | str | None
+    ) -> dict | None:
+        """Returns the time series of a query for the given range, fetching only missing parts.
+
+        Parameters:
+            endpoint (Endpoints): A time-series endpoint, e.g. Endpoints.PUBLIC_POWER.
+            start (str): Start of the range in a format accepted by the API.
+            end (str): End of the range in the same formats as start.
+            **params: Further query parameters, enums are passed by value.
+
+        Returns:
+            dict | None: The response for the range in the schema of the endpoint.
+        """
+        key = self._key(endpoint, params)
+        lower, upper = int(to_unix(start)), int(to_unix(end))
+        with self._lock:
+            if (query := self._queries.get(key)) is None:
+                query = self._queries[key] = _Query()
+            self._queries.move_to_end(key)
+            while len(self._queries) > self.max_queries:
+                self._queries.popitem(last=False)
+
+        with query.lock:
+            settled = time.time() - SETTLED_AFTER.total_seconds()
+            for gap_start, gap_end in missing_intervals(query.intervals, lower, upper):
+                response = self.api.get_range(
+                    endpoint, start=str(gap_start), end=str(gap_end), **dict(key[1])
+                )
+                with self._lock:
+                    self.fetched_intervals += 1
+                held_end = gap_end
+                if gap_end > settled:
+                    last = _last_valid_second(response)
+                    held_end = min(gap_end, last + 1) if last is not None else gap_start
+                if held_end > gap_start:
+                    query.intervals = add_interval(query.intervals, gap_start, held_end)
+                query.add(response)
+            return query.read(lower, upper)
+
+    def get_public_power(
+        self, country: Countries, start: str, end: str, subtype: SubTypes | None = None
+    ) -> dict | None:
+        """Returns the public net electricity production, see EnergyChartsAPI.get_public_power."""
+        return self.get(Endpoints.PUBLIC_POWER, start, end, country=country, subtype=subtype)
+
+    def get_total_power(self, country: Countries, start: str, end: str) -> dict | None:
+        """Returns the total net electricity production, see EnergyChartsAPI.get_total_power."""
+        return self.get(Endpoints.TOTAL_POWER, start, end, country=country)
+
+    def get_cbet(self, country: Countries, start: str, end: str) -> dict | None:
+        """Returns the cross-border electricity trading, see EnergyChartsAPI.get_cbet."""
+        return self.get(Endpoints.CBET, start, end, country=country)
+
+    def get_cbpf(self, country: Countries, start: str, end: str) -> dict | None:
+        """Returns the cross-border physical flows, see EnergyChartsAPI.get_cbpf."""
+        return self.get(Endpoints.CBPF, start, end, country=country)
+
+    def get_price(self, bzn: BindingZones, start: str, end: str) -> dict | None:
+        """Returns the day-ahead spot market price, see EnergyChartsAPI.get_price."""
+        return self.get(Endpoints.PRICE, start, end, bzn=bzn)
+
+    @staticmethod
+    def _key(endpoint: Endpoints, params: dict) -> tuple:
+        values = {k: v.value if isinstance(v, Enum) else v for k, v in params.items()}
+        return endpoint, tuple(sorted((k, v) for k, v in values.items() if v is not None))
@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+"""
+This module decodes JSON responses of the Energy Charts API incrementally from a stream of bytes.
+
+Arrays of numbers (e.g. 'unix_seconds' and every 'data' list) are parsed chunk by chunk straight
+into NumPy buffers, so no Python list of floats is ever built and the raw body is never held in
+memory as a whole. All other values are decoded with the json module.
+"""
+
+import json
+import re
+from collections.abc import Iterable, Iterator
+
+import numpy as np
+
+# Keys whose arrays hold integers; all other numeric arrays are decoded as float64
+INTEGER_KEYS = {"unix_seconds"}
+
+_WHITESPACE = b" \t\r\n"
+_NUMBER_START = b"-0123456789n"
+_LITERAL = re.compile(rb"-?[0-9.eE+-]+|true|false|null")
+
+
+class _GrowableArray:
+    """A NumPy buffer that doubles its capacity when full."""
+
+    def __init__(self, dtype: type, capacity: int = 4096):
+        self.array = np.empty(capacity, dtype=dtype)
+        self.size = 0
+
+    def extend(self, values: np.ndarray) -> None:
+        needed = self.size + len(values)
+        if needed > len(self.array):
+            self.array.resize(max(needed, 2 * len(self.array)), refcheck=False)
+        self.array[self.size : needed] = values
+        self.size = needed
+
+    def finish(self) -> np.ndarray:
+        self.array.resize(self.size, refcheck=False)  # shrinks in place
+        return self.array
+
+
+class _StreamDecoder:
+    """A pull parser over an iterator of byte chunks."""
+
+    def __init__(self, chunks: Iterator[bytes]):
+        self.chunks = chunks
+        self.buffer = b""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self) -> bool:
+        """Appends the next chunk to the buffer, dropping consumed bytes. Returns False at EOF."""
+        for chunk in self.chunks:
+            if chunk:
+                self.buffer = self.buffer[self.pos :] + chunk
+                self.pos = 0
+                return True
+        self.eof = True
+        return False
+
+    def _peek(self) -> int:
+        """Skips whitespace and returns the next byte without consuming it."""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                raise ValueError("Unexpected end of JSON stream.")
+
+    def _expect(self, char: bytes) -> None:
+        if self._peek() != char[0]:
+            found = chr(self.buffer[self.pos])
+            raise ValueError(f"Expected {char.decode()!r} but found {found!r} in JSON stream.")
+        self.pos += 1
+
+    def value(self, key: str | None = None):
+        match self._peek():
+            case 0x7B:  # {
+                return self._object()
+            case 0x5B:  # [
+                return self._array(key)
+            case 0x22:  # "
+                return self._string()
+            case _:
+                return self._literal()
+
+    def _object(self) -> dict:
+        self._expect(b"{")
+        result = {}
+        if self._peek() == ord("}"):
+            self.pos += 1
+            return result
+        while True:
+            key = self._string()
+            self._expect(b":")
+            result[key] = self.value(key)
+            if self._peek() == ord("}"):
+                self.pos += 1
+                return result
+            self._expect(b",")
+
+    def _array(self, key: str | None):
+        self._expect(b"[")
+        if self._peek() in _NUMBER_START:
+            return self._numbers(np.int64 if key in INTEGER_KEYS else np.float64)
+        result = []
+        if self._peek() == ord("]"):
+            self.pos += 1
+            return np.empty(0, dtype=np.int64) if key in INTEGER_KEYS else result
+        while True:
+            result.append(self.value())
+            if self._peek() == ord("]"):
+                self.pos += 1
+                return result
+            self._expect(b",")
+
+    def _numbers(self, dtype: type) -> np.ndarray:
+        """Parses the remainder of an array of numbers and nulls into a NumPy array."""
+        values = _GrowableArray(dtype)
+        while True:
+            end = self.buffer.find(b"]", self.pos)
+            cut = end if end != -1 else self.buffer.rfind(b",", self.pos)
+            if cut == -1:
+                if not self._fill():
+                    raise ValueError("Unexpected end of JSON stream.")
+                continue
+            segment = self.buffer[self.pos : cut].replace(b"null", b"nan")
+            self.pos = cut + 1
+            if segment.strip():
+                values.extend(np.array(segment.split(b",")).astype(dtype))
+            if end != -1:
+                return values.finish()
+
+    def _string(self) -> str:
+        self._expect(b'"')
+        self.pos -= 1  # keep the opening quote for json.loads
+        while True:
+            end = self.pos + 1
+            while (end := self.buffer.find(b'"', end)) != -1:
+                backslashes = len(self.buffer[self.pos : end]) - len(
+                    self.buffer[self.pos : end].rstrip(b"\\")
+                )
+                if backslashes % 2 == 0:
+                    text = self.buffer[self.pos : end + 1]
+                    self.pos = end + 1
+                    return json.loads(text)
+                end += 1
+            if not self._fill():
+                raise ValueError("Unexpected end of JSON stream.")
+
+    def _literal(self):
+        while True:
+            match = _LITERAL.match(self.buffer, self.pos)
+            # A literal touching the end of the buffer may continue in the next chunk
+            if match and (match.end() < len(self.buffer) or self.eof):
+                self.pos = match.end()
+                return json.loads(match.group())
+            if not self._fill() and not match:
+                raise ValueError("Invalid literal in JSON stream.")
+
+
+def decode_stream(chunks: Iterable[bytes]) -> dict:
+    """Decodes a JSON response from an iterable of byte chunks.
+
+    Parameters:
+        chunks (Iterable[bytes]): The body, e.g. requests.Response.iter_content(chunk_size).
+
+    Returns:
+        dict: The decoded response. Arrays of numbers are returned as NumPy arrays, int64 for
+            'unix_seconds' and float64 (with NaN for null) for all others.
+    """
+    return _StreamDecoder(iter(chunks)).value()
@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+"""
+This module provides shared time axes for the responses of the Energy Charts API.
+
+Classes:
+    TimeAxis: The timestamps of a response, stored as start + step when they form a regular grid,
+        with cached timezone-aware pandas indexes.
+
+Axes are interned: responses with the same timestamps (or the same 'days'/'time' labels) get the
+same TimeAxis object, so the timestamps are parsed, checked for regularity and turned into a
+pandas index once, and all frames built from these responses share one index object. The interned
+axes are bounded by count (MAX_AXES) and by the memory of their arrays and indexes (MAX_BYTES);
+clear() releases all of them.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from collections.abc import Sequence
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Number of interned axes
+MAX_AXES = 256
+
+# Memory of the timestamps and cached indexes of all interned axes; least recently used axes
+# are released first, and an axis larger than this is not kept at all
+MAX_BYTES = 64 * 2**20
+
+# Label formats of the 'days' and 'time' fields by label length:
+# (datetime64 unit, positions of year, month and day characters in the label)
+_LABEL_FORMATS = {
+    10: ("D", [6, 7, 8, 9, 2, 3, 4, 5, 0, 1]),  # dd.mm.yyyy -> yyyy.mm.dd
+    7: ("M", [3, 4, 5, 6, 2, 0, 1]),  # mm.yyyy -> yyyy.mm
+    4: ("Y", [0, 1, 2, 3]),  # yyyy
+}
+
+
+class TimeAxis:
+    """The timestamps of a response in UNIX seconds.
+
+    Attributes:
+        start (int | None): The first timestamp of a regular grid, None if irregular.
+        step (int | None): The spacing of a regular grid in seconds, None if irregular.
+        calendar (bool): If true, the timestamps are calendar dates or months (parsed labels)
+            rather than instants; their indexes are localized rather than converted.
+    """
+
+    __slots__ = ("start", "step", "calendar", "_seconds", "_length", "_indexes", "_lock")
+
+    def __init__(self, seconds: np.ndarray, calendar: bool = False):
+        self.calendar = calendar
+        self._length = len(seconds)
+        self._indexes: dict = {}
+        self._lock = threading.Lock()
+        spacing = np.diff(seconds)
+        if len(seconds) >= 2 and spacing[0] > 0 and (spacing == spacing[0]).all():
+            self.start, self.step = int(seconds[0]), int(spacing[0])
+            self._seconds = None  # materialized on demand
+        else:
+            self.start = self.step = None
+            self._seconds = seconds
+            self._seconds.flags.writeable = False
+
+    def __repr__(self) -> str:
+        if self.is_regular:
+            return f"TimeAxis(start={self.start}, step={self.step}, length={len(self)})"
+        return f"TimeAxis(length={len(self)})"
+
+    def __len__(self) -> int:
+        return self._length
+
+    @property
+    def is_regular(self) -> bool:
+        return self.step is not None
+
+    @property
+    def nbytes(self) -> int:
+        """Memory of the materialized timestamps and the cached indexes."""
+        seconds = self._seconds.nbytes if self._seconds is not None else 0
+        return seconds + sum(index.nbytes for index in list(self._indexes.values()))
+
+    @property
+    def seconds(self) -> np.ndarray:
+        """The timestamps as a read-only int64 array."""
+        if self._seconds is None:
+            seconds = self.start + self.step * np.arange(len(self), dtype=np.int64)
+            seconds.flags.writeable = False
+            self._seconds = seconds
+        return self._seconds
+
+    def index(self, tz: str | None = None, name: str = "timestamp") -> "pd.DatetimeIndex":
+        """Returns the timestamps as a pandas index, built once per timezone.
+
+        Parameters:
+            tz (str | None): 'UTC' or a zone such as 'Europe/Berlin'. None returns naive UTC
+                timestamps for instants and naive dates for calendar axes.
+            name (str): Name of the index.
+
+        Returns:
+            pd.DatetimeIndex: The index; calendar dates are localized to `tz`, instants are
+                converted to it, so DST transitions are handled by pandas.
+        """
+        with self._lock:
+            index = self._indexes.get((tz, name))
+            built = index is None
+            if built:
+                index = self._indexes[tz, name] = self._make_index(tz, name)
+        if built:  # the axis grew; keep the interned axes within MAX_BYTES
+            _trim()
+        return index
+
+    def _make_index(self, tz: str | None, name: str) -> "pd.DatetimeIndex":
+        import pandas as pd
+
+        if self.is_regular and not self.calendar:
+            index = pd.date_range(
+                pd.Timestamp(self.start, unit="s"),
+                periods=len(self),
+                freq=pd.Timedelta(seconds=self.step),
+                name=name,
+            )
+        else:
+            index = pd.DatetimeIndex(self.seconds.astype("datetime64[s]"), name=name)
+        index = index.as_unit("ns")  # the resolution of pd.to_datetime
+        if tz is None:
+            return index
+        if self.calendar:
+            return index.tz_localize(tz, ambiguous="NaT", nonexistent="shift_forward")
+        return index.tz_localize("UTC").tz_convert(tz)
+
+
+_axes: OrderedDict[tuple, TimeAxis] = OrderedDict()
+_lock = threading.Lock()
+
+
+def _intern(key: tuple, make) -> TimeAxis:
+    with _lock:
+        if (axis := _axes.get(key)) is not None:
+            _axes.move_to_end(key)
+            return axis
+    axis = make()
+    with _lock:
+        axis = _axes.setdefault(key, axis)
+        _axes.move_to_end(key)
+    _trim()
+    return axis
+
+
+def _trim() -> None:
+    """Releases the least recently used axes beyond MAX_AXES or MAX_BYTES."""
+    with _lock:
+        while len(_axes) > MAX_AXES:
+            _axes.popitem(last=False)
+        sizes = {key: axis.nbytes for key, axis in _axes.items()}
+        for key in [key for key, size in sizes.items() if size > MAX_BYTES]:
+            del _axes[key]  # would push out all others
+        total = sum(axis.nbytes for axis in _axes.values())
+        while _axes and total > MAX_BYTES:
+            _, axis = _axes.popitem(last=False)
+            total -= axis.nbytes
+
+
+def clear() -> None:
+    """Releases all interned axes; axes in use stay valid but are no longer shared."""
+    with _lock:
+        _axes.clear()
+
+
+def axis_from_seconds(seconds: Sequence[int] | np.ndarray) -> TimeAxis:
+    """Returns the shared axis of UNIX timestamps such as 'unix_seconds'."""
+    seconds = np.asarray(seconds if seconds is not None else [], dtype=np.int64)
+    digest = hashlib.blake2b(seconds.tobytes(), digest_size=16).digest()
+    return _intern(("seconds", len(seconds), digest), lambda: TimeAxis(seconds.copy()))
+
+
+def parse_labels(labels: Sequence[str]) -> np.ndarray:
+    """Parses 'dd.mm.yyyy', 'mm.yyyy' or 'yyyy' labels into UNIX seconds of their first day.
+
+    The labels are reordered into ISO dates as a character matrix and converted by NumPy in one
+    step, without parsing each label separately.
+
+    Raises:
+        ValueError: If the labels have mixed lengths or an unsupported format.
+    """
+    labels = np.asarray(labels, dtype=str)
+    if not len(labels):
+        return np.empty(0, dtype=np.int64)
+    width = labels.dtype.itemsize // 4
+    if width not in _LABEL_FORMATS or np.char.str_len(labels).min() != width:
+        raise ValueError(f"Unsupported time labels, e.g. {labels[0]!r}")
+    unit, order = _LABEL_FORMATS[width]
+    characters = np.ascontiguousarray(labels.view("U1").reshape(-1, width)[:, order])
+    characters[:, 4::3] = "-"  # separators between year, month and day
+    iso = characters.view(f"U{width}").ravel()
+    return iso.astype(f"datetime64[{unit}]").astype("datetime64[s]").astype(np.int64)
+
+
+def axis_from_labels(labels: Sequence[str]) -> TimeAxis:
+    """Returns the shared calendar axis of 'days' or 'time' labels of a response."""
+    labels = tuple(labels)
+    return _intern(("labels", labels), lambda: TimeAxis(parse_labels(labels), calendar=True))
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+"""
+This module provides helpers for the `start` and `end` arguments of the Energy Charts API.
+
+The API accepts ISO 8601 timestamps ('2024-01-01T17:00Z', '2024-01-01T18:00+01:00'), daily
+dates ('2024-01-01') and UNIX timestamps ('1704063600'). Naive values are kept naive so that
+the API interprets derived values the same way as the original ones.
+"""
+
+from datetime import UTC, datetime
+
+
+def parse_time(value: str | int | datetime) -> datetime:
+    """Parses a `start`/`end` value of the API into a datetime.
+
+    Parameters:
+        value (str | int | datetime): The value in one of the formats accepted by the API.
+
+    Returns:
+        datetime: The parsed datetime, timezone-aware for UNIX timestamps and offsets.
+    """
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, int) or str(value).lstrip("-").isdigit():
+        return datetime.fromtimestamp(int(value), UTC)
+    try:
+        return datetime.fromisoformat(str(value))
+    except ValueError:
+        raise ValueError(f"Unsupported time format: {value!r}") from None
+
+
+def format_time(value: datetime) -> str:
+    """Formats a datetime as an ISO 8601 string accepted by the API."""
+    timespec = "minutes" if value.second == 0 and value.microsecond == 0 else "seconds"
+    return value.isoformat(timespec=timespec)
+
+
+def to_unix(value: str | int | datetime) -> float:
+    """Converts a `start`/`end` value into UNIX seconds, treating naive values as UTC."""
+    value = parse_time(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=UTC)
+    return value.timestamp()
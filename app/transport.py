@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+"""
+This module configures the HTTP transport of the Energy Charts API client.
+
+Classes:
+    TransportConfig: Connection pool, keep-alive, compression and timeout settings.
+    TransportStats: Thread-safe counters of requests, revalidations and bytes on the wire.
+    ValidatorStore: An LRU store of ETag/Last-Modified validators and the responses they validate,
+        bounded by count and by body size.
+"""
+
+import importlib.util
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+from app.cache import copy_response
+
+if TYPE_CHECKING:
+    import requests
+
+
+@dataclass(frozen=True)
+class TransportConfig:
+    """Settings of the HTTP transport.
+
+    Attributes:
+        pool_connections (int): Number of hosts whose connection pools are kept.
+        pool_maxsize (int): Number of pooled connections per host.
+        keep_alive (bool): If false, connections are closed after every response.
+        compression (tuple[str, ...]): Accepted content encodings in order of preference.
+                                       'br' is only offered if a brotli decoder is installed.
+        connect_timeout (float | None): Seconds to wait for a connection, None waits forever.
+        read_timeout (float | None): Seconds to wait between bytes of the response.
+        conditional (bool): If true, responses with an ETag or Last-Modified header are kept
+                            and revalidated with If-None-Match/If-Modified-Since.
+        max_validators (int): Number of validated responses kept for revalidation.
+        max_validator_bytes (int): Total decoded body size of the validated responses kept.
+    """
+
+    pool_connections: int = 10
+    pool_maxsize: int = 10
+    keep_alive: bool = True
+    compression: tuple[str, ...] = ("br", "gzip", "deflate")
+    connect_timeout: float | None = 10.0
+    read_timeout: float | None = 120.0
+    conditional: bool = False
+    max_validators: int = 256
+    max_validator_bytes: int = 64 * 2**20
+
+    @property
+    def timeout(self) -> tuple[float | None, float | None]:
+        return self.connect_timeout, self.read_timeout
+
+    @property
+    def accept_encoding(self) -> str:
+        brotli = any(importlib.util.find_spec(m) for m in ("brotli", "brotlicffi"))
+        return ", ".join(c for c in self.compression if c != "br" or brotli) or "identity"
+
+    def configure(self, session: "requests.Session", min_pool_size: int = 1) -> None:
+        """Mounts connection pools and sets the default headers of a session."""
+        from requests.adapters import HTTPAdapter
+
+        adapter = HTTPAdapter(
+            pool_connections=self.pool_connections,
+            pool_maxsize=max(self.pool_maxsize, min_pool_size),
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers["Accept-Encoding"] = self.accept_encoding
+        session.headers["Connection"] = "keep-alive" if self.keep_alive else "close"
+
+
+@dataclass
+class TransportStats:
+    """Counters of the HTTP transport.
+
+    Attributes:
+        requests_sent (int): Number of HTTP requests sent.
+        not_modified (int): Number of requests answered with 304 Not Modified.
+        bytes_received (int): Number of response body bytes on the wire (before decompression).
+        bytes_decoded (int): Number of response body bytes after decompression.
+    """
+
+    requests_sent: int = 0
+    not_modified: int = 0
+    bytes_received: int = 0
+    bytes_decoded: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def record(self, response: "requests.Response", decoded: int) -> None:
+        """Counts a response whose body has been read completely."""
+        try:
+            wire = response.raw.tell()
+        except AttributeError:
+            wire = int(response.headers.get("Content-Length", decoded))
+        self.count(response.status_code, wire, decoded)
+
+    def count(self, status_code: int, wire: int, decoded: int) -> None:
+        """Counts a response by its status code and body sizes on the wire and decoded."""
+        with self._lock:
+            self.requests_sent += 1
+            self.not_modified += status_code == 304
+            self.bytes_received += wire
+            self.bytes_decoded += decoded
+
+
+class ValidatorStore:
+    """An LRU store mapping request keys to (validator headers, response data).
+
+    Entries are evicted when there are more than `max_entries` of them or when the decoded
+    body sizes of their responses add up to more than `max_bytes`; a single response larger
+    than `max_bytes` is not stored. Responses are copied when stored and when returned (see
+    cache.copy_response), so callers that modify a revalidated response do not change the
+    stored one.
+    """
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 64 * 2**20):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: OrderedDict[str, tuple[dict[str, str], Any, int]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def headers(self, key: str) -> dict[str, str]:
+        """Returns the conditional request headers for a key, empty if nothing is stored."""
+        with self._lock:
+            entry = self._entries.get(key)
+            return dict(entry[0]) if entry is not None else {}
+
+    def data(self, key: str) -> Any | None:
+        """Returns the response data stored for a key and marks it as recently used."""
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+            data = self._entries[key][1]
+        return copy_response(data)
+
+    def store(self, key: str, response: "requests.Response", data: Any, size: int = 0) -> None:
+        """Stores the data of a response if the response carries a validator.
+
+        Parameters:
+            key (str): The request key.
+            response (requests.Response): The response providing the validators.
+            data (Any): The decoded response.
+            size (int): The decoded body size in bytes, counted against `max_bytes`.
+        """
+        headers = {}
+        if etag := response.headers.get("ETag"):
+            headers["If-None-Match"] = etag
+        if modified := response.headers.get("Last-Modified"):
+            headers["If-Modified-Since"] = modified
+        if not headers or size > self.max_bytes:
+            return
+        data = copy_response(data)
+        with self._lock:
+            if (previous := self._entries.pop(key, None)) is not None:
+                self.size -= previous[2]
+            self._entries[key] = (headers, data, size)
+            self.size += size
+            while len(self._entries) > self.max_entries or self.size > self.max_bytes:
+                _, (_, _, evicted) = self._entries.popitem(last=False)
+                self.size -= evicted
@@ -0,0 +1,299 @@
+# -*- coding: utf-8 -*-
+"""
+This module provides an archive of the successive vintages of the public power forecasts.
+
+Classes:
+    VintageStore: Records every forecast fetch with its retrieval time in a SQLite file and
+        answers as-of and lead-time error queries.
+
+Only the values that changed since the previous vintage are stored, one row per
+(series, target time, vintage) in a table clustered on that key, so the forecast of a target
+time as of any vintage is a single index lookup.
+"""
+
+import sqlite3
+import threading
+import time
+from collections.abc import Iterable
+from datetime import datetime, timedelta
+from enum import Enum
+from pathlib import Path
+
+import numpy as np
+
+from app.api import EnergyChartsAPI
+from app.enums import Countries, ForecastType, ProductionType
+from app.timerange import to_unix
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS series ("
+    "id INTEGER PRIMARY KEY, country TEXT, production_type TEXT, forecast_type TEXT, "
+    "UNIQUE (country, production_type, forecast_type))",
+    "CREATE TABLE IF NOT EXISTS vintages ("
+    "series_id INTEGER, vintage INTEGER, PRIMARY KEY (series_id, vintage)) WITHOUT ROWID",
+    "CREATE TABLE IF NOT EXISTS changes ("
+    "series_id INTEGER, target INTEGER, vintage INTEGER, value REAL, "
+    "PRIMARY KEY (series_id, target, vintage)) WITHOUT ROWID",
+)
+
+
+def _value(member: Enum | str) -> str:
+    return member.value if isinstance(member, Enum) else member
+
+
+def _time(value: datetime | str | int | float) -> int:
+    return int(value) if isinstance(value, (int, float)) else to_unix(value)
+
+
+class VintageStore:
+    """An archive of public power forecast vintages.
+
+    Example:
+        store = VintageStore("forecasts.sqlite")
+        store.fetch(api, Countries.GERMANY, ProductionType.SOLAR, ForecastType.DAY_AHEAD,
+                    "2024-06-01", "2024-06-03")
+        store.as_of(Countries.GERMANY, ProductionType.SOLAR, ForecastType.DAY_AHEAD,
+                    vintage="2024-05-31T12:00Z", start="2024-06-01", end="2024-06-02")
+    """
+
+    def __init__(self, path: str | Path = ":memory:"):
+        """
+        Parameters:
+            path (str | Path): The SQLite file, defaults to an in-memory database.
+        """
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        for statement in _SCHEMA:
+            self._connection.execute(statement)
+
+    def close(self) -> None:
+        """Closes the underlying database connection."""
+        self._connection.close()
+
+    def _series_id(
+        self, country, production_type, forecast_type, create: bool = False
+    ) -> int | None:
+        key = (_value(country), _value(production_type), _value(forecast_type))
+        row = self._connection.execute(
+            "SELECT id FROM series WHERE country = ? AND production_type = ? AND forecast_type = ?",
+            key,
+        ).fetchone()
+        if row is None and create:
+            return self._connection.execute(
+                "INSERT INTO series (country, production_type, forecast_type) VALUES (?, ?, ?)", key
+            ).lastrowid
+        return row[0] if row else None
+
+    def fetch(
+        self,
+        api: EnergyChartsAPI,
+        country: Countries,
+        production_type: ProductionType,
+        forecast_type: ForecastType,
+        start: str,
+        end: str,
+    ) -> dict | None:
+        """Fetches the current forecast and records it as a vintage retrieved now.
+
+        Returns:
+            dict | None: The API response.
+        """
+        response = api.get_public_power_forecast(
+            country, production_type, forecast_type, start, end
+        )
+        if response:
+            self.record(response, country, production_type, forecast_type, retrieved=time.time())
+        return response
+
+    def record(
+        self,
+        response: dict,
+        country: Countries | str,
+        production_type: ProductionType | str,
+        forecast_type: ForecastType | str,
+        retrieved: datetime | str | int | float | None = None,
+    ) -> int:
+        """Records a forecast response as the vintage retrieved at `retrieved`.
+
+        Parameters:
+            response (dict): A public_power_forecast response.
+            country (Countries | str): The forecast country.
+            production_type (ProductionType | str): The production type.
+            forecast_type (ForecastType | str): The forecast type.
+            retrieved (datetime | str | int | float | None): The retrieval time, defaults to now.
+
+        Returns:
+            int: The number of stored values, i.e. the values that changed since the previous
+                vintage.
+        """
+        vintage = _time(retrieved if retrieved is not None else time.time())
+        targets = response.get("unix_seconds")
+        targets = np.asarray(targets if targets is not None else [], dtype=np.int64)
+        values = response.get("forecast_values")
+        if isinstance(values, list):  # streamed and typed responses already hold arrays
+            values = [np.nan if v is None else v for v in values]
+        values = np.asarray(values if values is not None else [], dtype=np.float64)[: len(targets)]
+        targets = targets[: len(values)]
+        with self._lock, self._connection:
+            series_id = self._series_id(country, production_type, forecast_type, create=True)
+            self._connection.execute(
+                "INSERT OR IGNORE INTO vintages VALUES (?, ?)", (series_id, vintage)
+            )
+            if not len(targets):
+                return 0
+            known_targets, known_values = self._latest(
+                series_id, int(targets.min()), int(targets.max()), vintage
+            )
+            positions = np.clip(
+                np.searchsorted(known_targets, targets), 0, max(len(known_targets) - 1, 0)
+            )
+            previous = np.full(len(targets), np.nan)
+            known = np.zeros(len(targets), dtype=bool)
+            if len(known_targets):
+                known = known_targets[positions] == targets
+                previous[known] = known_values[positions[known]]
+            same = known & ((previous == values) | (np.isnan(previous) & np.isnan(values)))
+            changed = ~same
+            rows = [
+                (series_id, int(t), vintage, None if np.isnan(v) else float(v))
+                for t, v in zip(targets[changed], values[changed])
+            ]
+            self._connection.executemany("INSERT OR REPLACE INTO changes VALUES (?, ?, ?, ?)", rows)
+        return len(rows)
+
+    def _latest(
+        self, series_id: int, lower: int, upper: int, vintage: int
+    ) -> tuple[np.ndarray, np.ndarray]:
+        # SQLite returns the bare columns of the row holding the MAX() of each group
+        rows = self._connection.execute(
+            "SELECT target, value, MAX(vintage) FROM changes "
+            "WHERE series_id = ? AND target BETWEEN ? AND ? AND vintage <= ? GROUP BY target",
+            (series_id, lower, upper, vintage),
+        ).fetchall()
+        targets = np.fromiter((r[0] for r in rows), dtype=np.int64, count=len(rows))
+        values = np.fromiter(
+            (np.nan if r[1] is None else r[1] for r in rows), dtype=np.float64, count=len(rows)
+        )
+        return targets, values
+
+    def vintages(self, country, production_type, forecast_type) -> list[int]:
+        """Returns the retrieval times (UNIX seconds) of all recorded vintages of a series."""
+        series_id = self._series_id(country, production_type, forecast_type)
+        rows = self._connection.execute(
+            "SELECT vintage FROM vintages WHERE series_id = ? ORDER BY vintage", (series_id,)
+        )
+        return [vintage for (vintage,) in rows]
+
+    def value_at(
+        self,
+        country: Countries | str,
+        production_type: ProductionType | str,
+        forecast_type: ForecastType | str,
+        target: datetime | str | int,
+        vintage: datetime | str | int,
+    ) -> float | None:
+        """Returns the forecast for one target time as known at a vintage time.
+
+        Returns:
+            float | None: The forecast value, None if nothing was forecast yet.
+        """
+        series_id = self._series_id(country, production_type, forecast_type)
+        row = self._connection.execute(
+            "SELECT value FROM changes WHERE series_id = ? AND target = ? AND vintage <= ? "
+            "ORDER BY vintage DESC LIMIT 1",
+            (series_id, _time(target), _time(vintage)),
+        ).fetchone()
+        return row[0] if row else None
+
+    def as_of(
+        self,
+        country: Countries | str,
+        production_type: ProductionType | str,
+        forecast_type: ForecastType | str,
+        vintage: datetime | str | int,
+        start: datetime | str | int,
+        end: datetime | str | int,
+    ) -> dict:
+        """Returns the forecast of the target times in [start, end] as known at a vintage time.
+
+        Returns:
+            dict: A response-like dictionary with 'unix_seconds' and 'forecast_values'.
+        """
+        series_id = self._series_id(country, production_type, forecast_type)
+        targets, values = self._latest(series_id, _time(start), _time(end), _time(vintage))
+        return {
+            "unix_seconds": targets.tolist(),
+            "forecast_values": [None if np.isnan(v) else v for v in values.tolist()],
+            "production_type": _value(production_type),
+            "forecast_type": _value(forecast_type),
+        }
+
+    def lead_errors(
+        self,
+        country: Countries | str,
+        production_type: ProductionType | str,
+        forecast_type: ForecastType | str,
+        actual_seconds: Iterable[int],
+        actual_values: Iterable[float | None],
+        leads: Iterable[timedelta],
+    ) -> dict[str, list]:
+        """Computes the forecast error against actual values by lead time.
+
+        For each lead time L and each actual value at target time T, the forecast as of T - L
+        is compared with the actual value.
+
+        Parameters:
+            country (Countries | str): The forecast country.
+            production_type (ProductionType | str): The production type.
+            forecast_type (ForecastType | str): The forecast type.
+            actual_seconds (Iterable[int]): The target times of the actual values.
+            actual_values (Iterable[float | None]): The actual values, e.g. from public_power.
+            leads (Iterable[timedelta]): The lead times to evaluate.
+
+        Returns:
+            dict[str, list]: 'lead_seconds', 'count', 'bias', 'mae' and 'rmse' per lead time.
+        """
+        seconds = np.asarray(list(actual_seconds), dtype=np.int64)
+        actual = np.asarray([np.nan if v is None else v for v in actual_values], dtype=np.float64)
+        leads = [int(lead.total_seconds()) for lead in leads]
+        result = {"lead_seconds": leads, "count": [], "bias": [], "mae": [], "rmse": []}
+        series_id = self._series_id(country, production_type, forecast_type)
+        rows = []
+        if len(seconds) and series_id is not None:
+            rows = self._connection.execute(
+                "SELECT target, vintage, value FROM changes "
+                "WHERE series_id = ? AND target BETWEEN ? AND ? ORDER BY target, vintage",
+                (series_id, int(seconds.min()), int(seconds.max())),
+            ).fetchall()
+        targets = np.fromiter((r[0] for r in rows), dtype=np.int64, count=len(rows))
+        vintages = np.fromiter((r[1] for r in rows), dtype=np.int64, count=len(rows))
+        values = np.fromiter(
+            (np.nan if r[2] is None else r[2] for r in rows), dtype=np.float64, count=len(rows)
+        )
+
+        # Rows are sorted by (target, vintage): encode both into one sorted integer key
+        unique_targets, row_target = np.unique(targets, return_inverse=True)
+        first = int(vintages.min()) if len(vintages) else 0
+        span = int(vintages.max()) - first + 1 if len(vintages) else 1
+        row_keys = row_target * span + (vintages - first)
+        positions = np.clip(
+            np.searchsorted(unique_targets, seconds), 0, max(len(unique_targets) - 1, 0)
+        )
+        has_target = (
+            (unique_targets[positions] == seconds)
+            if len(unique_targets)
+            else np.zeros(len(seconds), bool)
+        )
+
+        for lead in leads:
+            offset = np.minimum(seconds - lead - first, span - 1)
+            found = np.searchsorted(row_keys, positions * span + offset, side="right") - 1
+            valid = has_target & (offset >= 0) & (found >= 0)
+            valid[valid] &= row_target[found[valid]] == positions[valid]
+            errors = values[found[valid]] - actual[valid]
+            errors = errors[~np.isnan(errors)]
+            result["count"].append(len(errors))
+            result["bias"].append(float(errors.mean()) if len(errors) else None)
+            result["mae"].append(float(np.abs(errors).mean()) if len(errors) else None)
+            result["rmse"].append(float(np.sqrt((errors**2).mean())) if len(errors) else None)
+        return result
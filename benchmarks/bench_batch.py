@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""
+This script measures how batch parsing scales with the number of worker processes.
+
+A batch of wide `total_power`-style JSON bodies is parsed once serially (json.loads and
+make_dataframe in this process) and once per worker count with app.batch.BatchParser. For every
+run the throughput in responses and megabytes per second, the speedup over the serial run and the
+parallel efficiency (speedup / workers) are reported. The pool is started and warmed up before
+timing, so the numbers reflect the steady state of a long fan-out. With --decoded, the responses
+are decoded before timing and passed as dictionaries, which measures the cost of pickling them to
+the workers against make_dataframe alone. With --baseline, the run fails if any worker count is
+slower than the baseline by more than --tolerance.
+
+Usage:
+    python -m benchmarks.bench_batch [--responses 64] [--timestamps 35040] [--series 20]
+                                     [--workers 1 2 4 8] [--decoded] [--save results.json]
+                                     [--baseline results.json]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+from app.batch import BatchParser
+from app.parser import make_dataframe
+from benchmarks.bench_parser import synthetic_response
+
+
+def serial(bodies: list[bytes | dict]) -> float:
+    """Returns the wall-clock time of parsing the bodies one after another in this process."""
+    started = time.perf_counter()
+    for body in bodies:
+        make_dataframe(json.loads(body) if isinstance(body, bytes) else body)
+    return time.perf_counter() - started
+
+
+def parallel(bodies: list[bytes | dict], workers: int) -> float:
+    """Returns the wall-clock time of parsing the bodies with a warmed-up BatchParser."""
+    with BatchParser(workers=workers) as parser:
+        for _ in parser.parse(bodies[:workers]):  # starts the worker processes
+            pass
+        started = time.perf_counter()
+        for _, _, error in parser.parse(bodies):
+            if error is not None:
+                raise error
+        return time.perf_counter() - started
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--responses", type=int, default=64)
+    parser.add_argument("--timestamps", type=int, default=35_040, help="a year of 15 minutes")
+    parser.add_argument("--series", type=int, default=20)
+    cores = os.cpu_count() or 1
+    default_workers = sorted({1, *(2**i for i in range(1, 6) if 2**i <= cores), cores})
+    parser.add_argument("--workers", type=int, nargs="+", default=default_workers)
+    parser.add_argument(
+        "--decoded", action="store_true", help="pass decoded responses instead of JSON bodies"
+    )
+    parser.add_argument("--save", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="compare against results saved with --save")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    bodies = [
+        json.dumps(synthetic_response(args.timestamps, args.series, seed)).encode()
+        for seed in range(args.responses)
+    ]
+    megabytes = sum(len(body) for body in bodies) / 1e6
+    print(
+        f"{args.responses} {'decoded responses' if args.decoded else 'bodies'} of "
+        f"{args.timestamps} x {args.series}, {megabytes:.0f} MB of JSON, {cores} CPUs"
+    )
+    if args.decoded:
+        bodies = [json.loads(body) for body in bodies]
+
+    reference = serial(bodies)
+    print(f"{'workers':>7} {'time [s]':>9} {'resp/s':>8} {'MB/s':>8} {'speedup':>8} {'eff.':>6}")
+    print(
+        f"{'serial':>7} {reference:>9.2f} {args.responses / reference:>8.1f} "
+        f"{megabytes / reference:>8.1f} {1:>7.2f}x {1:>6.2f}"
+    )
+    results = {}
+    for workers in args.workers:
+        elapsed = parallel(bodies, workers)
+        speedup = reference / elapsed
+        results[str(workers)] = {"seconds": elapsed, "speedup": speedup}
+        print(
+            f"{workers:>7} {elapsed:>9.2f} {args.responses / elapsed:>8.1f} "
+            f"{megabytes / elapsed:>8.1f} {speedup:>7.2f}x {speedup / workers:>6.2f}"
+        )
+
+    if args.save:
+        with open(args.save, "w") as file:
+            json.dump(results, file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        regressions = [
+            f"{workers} workers: {result['seconds']:.2f} s vs. {baseline[workers]['seconds']:.2f} s"
+            for workers, result in results.items()
+            if workers in baseline
+            and result["seconds"] > baseline[workers]["seconds"] * (1 + args.tolerance)
+        ]
+        if regressions:
+            print("Batch parsing regressions:\n  " + "\n  ".join(regressions))
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+"""
+This script benchmarks the client and the parser offline against the local mock server.
+
+Scenarios:
+    single: sequential get_public_power calls for one day
+    fanout: get_many of get_public_power over all Countries for one day
+    backfill: chunked get_total_power over five years
+    parse: make_dataframe on a wide get_total_power response
+
+Every scenario runs in a fresh interpreter, separate from the mock server, and reports
+throughput, latency percentiles and the increase of the peak RSS. With --baseline, the run fails
+if any scenario is slower than the baseline by more than --tolerance.
+
+Usage:
+    python -m benchmarks.bench_client [--scenarios single fanout] [--latency 0.02]
+                                      [--save results.json] [--baseline results.json]
+"""
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from app.api import EnergyChartsAPI
+from app.enums import Countries, Endpoints
+from app.parser import make_dataframe
+from app.scheduler import RequestScheduler
+from benchmarks.mock_server import MockServer, synthetic_response
+
+
+def peak_rss_mib() -> float:
+    """Returns the peak resident set size of this process in MiB."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def measure(operations: list[Callable[[], object]], run: Callable[[list], None]) -> dict:
+    """Runs the operations through `run` and returns throughput, latencies and peak memory."""
+    latencies = []
+
+    def timed(operation):
+        def call():
+            started = time.perf_counter()
+            result = operation()
+            latencies.append(time.perf_counter() - started)
+            return result
+
+        return call
+
+    baseline = peak_rss_mib()
+    started = time.perf_counter()
+    run([timed(operation) for operation in operations])
+    elapsed = time.perf_counter() - started
+    return {
+        "operations": len(operations),
+        "seconds": elapsed,
+        "throughput": len(operations) / elapsed,
+        "p50": float(np.percentile(latencies, 50)),
+        "p95": float(np.percentile(latencies, 95)),
+        "peak_mib": peak_rss_mib() - baseline,
+    }
+
+
+def client(url: str, args, **kwargs) -> EnergyChartsAPI:
+    """Returns a client of the mock server, retrying injected errors if there are any."""
+    if args.error_rate > 0:
+        kwargs["scheduler"] = RequestScheduler(
+            rate=10_000, burst=args.workers, max_concurrency=args.workers, backoff_base=0.01
+        )
+    api = EnergyChartsAPI(**kwargs)
+    api.BASE_URL = url
+    return api
+
+
+def sequential(calls: list) -> None:
+    for call in calls:
+        call()
+
+
+def scenario_single(url: str, args) -> dict:
+    api = client(url, args)
+    operations = [
+        lambda: api.get_public_power(Countries.GERMANY, "2024-01-01", "2024-01-02")
+    ] * args.repeat
+    return measure(operations, sequential)
+
+
+def scenario_fanout(url: str, args) -> dict:
+    api = client(url, args, max_workers=args.workers)
+    operations = [lambda: api.get_public_power(c, "2024-01-01", "2024-01-02") for c in Countries]
+
+    def concurrent(calls: list) -> None:
+        with ThreadPoolExecutor(max_workers=args.workers) as pool:
+            list(pool.map(lambda call: call(), calls))
+
+    return measure(operations, concurrent)
+
+
+def scenario_backfill(url: str, args) -> dict:
+    api = client(url, args, chunked=True, max_workers=args.workers)
+    operations = [lambda: api.get_total_power(Countries.GERMANY, "2019-01-01", "2024-01-01")]
+    return measure(operations, sequential)
+
+
+def scenario_parse(url: str, args) -> dict:
+    query = {"start": "2023-01-01", "end": "2024-01-01"}
+    response = synthetic_response(Endpoints.TOTAL_POWER, query, series=args.series)
+    operations = [lambda: make_dataframe(response)] * args.repeat
+    return measure(operations, sequential)
+
+
+SCENARIOS = {
+    "single": scenario_single,
+    "fanout": scenario_fanout,
+    "backfill": scenario_backfill,
+    "parse": scenario_parse,
+}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--series", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--save", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="compare against results saved with --save")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument("--run", choices=SCENARIOS, help=argparse.SUPPRESS)
+    parser.add_argument("--url", help=argparse.SUPPRESS)
+    args, _ = parser.parse_known_args()
+
+    if args.run:
+        print(json.dumps(SCENARIOS[args.run](args.url, args)))
+        sys.exit()
+
+    results = {}
+    header = (
+        f"{'scenario':>10} {'ops':>5} {'ops/s':>9} {'p50 [s]':>9} {'p95 [s]':>9} {'peak [MiB]':>11}"
+    )
+    print(header)
+    with MockServer(latency=args.latency, error_rate=args.error_rate, series=args.series) as server:
+        for name in args.scenarios:
+            command = [sys.executable, "-m", "benchmarks.bench_client", *sys.argv[1:]]
+            output = subprocess.run(
+                [*command, "--run", name, "--url", server.url],
+                check=True,
+                stdout=subprocess.PIPE,
+                text=True,
+            ).stdout
+            result = results[name] = json.loads(output)
+            print(
+                f"{name:>10} {result['operations']:>5} {result['throughput']:>9.2f} "
+                f"{result['p50']:>9.4f} {result['p95']:>9.4f} {result['peak_mib']:>11.1f}"
+            )
+
+    if args.save:
+        with open(args.save, "w") as file:
+            json.dump(results, file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        regressions = [
+            f"{name}: {result['throughput']:.2f} ops/s vs. {baseline[name]['throughput']:.2f}"
+            for name, result in results.items()
+            if name in baseline
+            and result["throughput"] < baseline[name]["throughput"] * (1 - args.tolerance)
+        ]
+        if regressions:
+            print("Performance regressions:\n  " + "\n  ".join(regressions))
+            sys.exit(1)
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""
+This script measures the cold-start import cost of the public entry points of the package.
+
+Every entry point is imported in a fresh interpreter with `python -X importtime`, repeated
+--repeat times; the median cumulative import time of the statement is reported together with
+the heaviest modules it loaded and whether NumPy, pandas or requests were pulled in. With
+--baseline, the run fails if any entry point is slower than the baseline by more than
+--tolerance.
+
+Usage:
+    python -m benchmarks.bench_import [--repeat 5] [--top 5]
+                                      [--save results.json] [--baseline results.json]
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+# Name -> statement importing the entry point
+ENTRY_POINTS = {
+    "package": "import app",
+    "client": "from app import EnergyChartsAPI, Countries",
+    "api": "import app.api",
+    "parser": "import app.parser",
+    "async": "from app import AsyncEnergyChartsAPI",
+}
+
+# Dependencies that the lightweight entry points should not load
+HEAVY_MODULES = ("numpy", "pandas", "requests", "aiohttp")
+
+
+def _importtime(code: str) -> tuple[list[tuple[str, int, int]], str]:
+    """Runs code with -X importtime in a fresh interpreter and returns (module, depth,
+    cumulative microseconds) in load order, and the standard output."""
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True, check=True
+    )
+    modules = []
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        modules.append((name.strip(), depth, int(cumulative)))
+    return modules, process.stdout
+
+
+def measure(statement: str) -> dict:
+    """Imports in a fresh interpreter and returns the total time in ms, the cumulative time of
+    every module loaded by the statement and the heavy modules among them."""
+    startup = {name for name, _, _ in _importtime("pass")[0]}
+    probe = f"{statement}\nimport sys\nprint(*(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    modules, stdout = _importtime(probe)
+    loaded = [(name, depth, us) for name, depth, us in modules if name not in startup]
+    return {
+        "total_ms": sum(us for _, depth, us in loaded if depth == 0) / 1000,
+        "modules": {name: us / 1000 for name, _, us in loaded},
+        "heavy": stdout.split(),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "--entry-points", nargs="+", choices=ENTRY_POINTS, default=list(ENTRY_POINTS)
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=5, help="number of heaviest modules to list")
+    parser.add_argument("--save", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="compare against results saved with --save")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    results = {}
+    for name in args.entry_points:
+        runs = [measure(ENTRY_POINTS[name]) for _ in range(args.repeat)]
+        median = statistics.median(run["total_ms"] for run in runs)
+        heaviest = sorted(runs[-1]["modules"].items(), key=lambda item: -item[1])
+        results[name] = {"total_ms": median, "heavy": runs[-1]["heavy"]}
+        print(f"{name:<10} {median:8.1f} ms  loads: {', '.join(runs[-1]['heavy']) or '-'}")
+        for module, ms in heaviest[: args.top]:
+            print(f"{'':<10} {ms:8.1f} ms  {module}")
+
+    if args.save:
+        with open(args.save, "w") as file:
+            json.dump(results, file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        regressions = [
+            f"{name}: {result['total_ms']:.1f} ms vs. {baseline[name]['total_ms']:.1f} ms"
+            for name, result in results.items()
+            if name in baseline
+            and result["total_ms"] > baseline[name]["total_ms"] * (1 + args.tolerance)
+        ]
+        if regressions:
+            print("Import time regressions:\n  " + "\n  ".join(regressions))
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""
+This script benchmarks the single-pass `make_dataframe` against the previous
+merge-based implementation on synthetic `total_power`-style responses.
+
+Usage:
+    python -m benchmarks.bench_parser [--sizes 10000 100000] [--series 5 20] [--repeat 3]
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from app.parser import make_dataframe
+
+
+def make_dataframe_merge(response: dict) -> pd.DataFrame:
+    """The previous implementation running one outer merge per series (reference only)."""
+    timestamps = pd.to_datetime(response.get("unix_seconds", []), unit="s")
+    df = pd.DataFrame({"timestamp": timestamps})
+    for key in ("production_types", "countries"):
+        for entry in response.get(key, []):
+            temp_df = pd.DataFrame({"timestamp": timestamps, entry["name"]: entry["data"]})
+            df = pd.merge(df, temp_df, on="timestamp", how="outer")
+    for key, values in response.items():
+        if key in {"production_types", "countries", "unix_seconds"}:
+            continue
+        if isinstance(values, list):
+            temp_df = pd.DataFrame({"timestamp": timestamps, key: values})
+            df = pd.merge(df, temp_df, on="timestamp", how="outer")
+        else:
+            df[key] = values
+    return df.sort_values(by="timestamp")
+
+
+def synthetic_response(n_timestamps: int, n_series: int, seed: int = 0) -> dict:
+    """Builds a response in the `total_power` schema with a 15-minute grid."""
+    rng = np.random.default_rng(seed)
+    start = 1704063600
+    return {
+        "unix_seconds": list(range(start, start + 900 * n_timestamps, 900)),
+        "production_types": [
+            {"name": f"series_{i}", "data": rng.random(n_timestamps).tolist()}
+            for i in range(n_series)
+        ],
+        "deprecated": False,
+    }
+
+
+def best_of(func, response: dict, repeat: int) -> float:
+    """Returns the fastest wall-clock time in seconds over `repeat` runs."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(response)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--series", type=int, nargs="+", default=[5, 20, 100])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'timestamps':>10} {'series':>6} {'merge [s]':>10} {'single [s]':>10} {'speedup':>8}")
+    for n_timestamps in args.sizes:
+        for n_series in args.series:
+            response = synthetic_response(n_timestamps, n_series)
+            merge = best_of(make_dataframe_merge, response, args.repeat)
+            single = best_of(make_dataframe, response, args.repeat)
+            print(
+                f"{n_timestamps:>10} {n_series:>6} {merge:>10.3f} {single:>10.3f} "
+                f"{merge / single:>7.1f}x"
+            )
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""
+This script compares the peak memory (RSS) of decoding a large response with response.json()
+against the streaming decoder, each followed by make_dataframe.
+
+Every mode runs in a fresh interpreter that reads a synthetic body from disk in 64 KiB chunks,
+mimicking a socket. The default body is one month of 1-second frequency data.
+
+Usage:
+    python -m benchmarks.bench_stream_memory [--timestamps 2678400] [--series 1]
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+
+CHUNK_SIZE = 2**16
+
+
+def write_body(path: str, n_timestamps: int, n_series: int) -> None:
+    """Writes a synthetic response with `n_series` data lists to `path`."""
+    rng = np.random.default_rng(0)
+    start = 1704067200
+    with open(path, "w") as file:
+        file.write('{"unix_seconds": [')
+        file.write(",".join(map(str, range(start, start + n_timestamps))))
+        file.write('], "production_types": [')
+        for i in range(n_series):
+            values = np.round(50 + rng.standard_normal(n_timestamps) * 0.02, 3)
+            file.write(("," if i else "") + json.dumps({"name": f"series_{i}", "data": []})[:-2])
+            file.write(",".join(map(str, values.tolist())) + "]}")
+        file.write('], "deprecated": false}')
+
+
+def peak_rss_mib() -> float:
+    """Returns the peak resident set size of this process in MiB."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run(mode: str, path: str) -> None:
+    """Decodes and parses the body in the given mode and prints the peak RSS increase."""
+    from app.parser import make_dataframe
+    from app.streaming import decode_stream
+
+    baseline = peak_rss_mib()
+    with open(path, "rb") as file:
+        if mode == "json":
+            response = json.loads(file.read())
+        else:
+            response = decode_stream(iter(lambda: file.read(CHUNK_SIZE), b""))
+    df = make_dataframe(response)
+    del response
+    frame = df.memory_usage(deep=True).sum() / 2**20
+    print(f"{mode:>6} {peak_rss_mib() - baseline:>12.1f} {frame:>12.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--timestamps", type=int, default=31 * 86400)
+    parser.add_argument("--series", type=int, default=1)
+    parser.add_argument("--run", choices=["json", "stream"], help=argparse.SUPPRESS)
+    parser.add_argument("--path", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        run(args.run, args.path)
+        sys.exit()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "body.json")
+        write_body(path, args.timestamps, args.series)
+        print(f"body: {os.path.getsize(path) / 2**20:.1f} MiB")
+        print(f"{'mode':>6} {'peak [MiB]':>12} {'frame [MiB]':>12}")
+        for mode in ("json", "stream"):
+            command = [sys.executable, "-m", "benchmarks.bench_stream_memory"]
+            subprocess.run([*command, "--run", mode, "--path", path], check=True)
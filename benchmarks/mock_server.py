@@ -0,0 +1,239 @@
+# -*- coding: utf-8 -*-
+"""
+This module provides a local stand-in for the Energy Charts API serving synthetic responses.
+
+Every path of `Endpoints` is served in its documented schema. The number of timestamps follows
+the requested `start`/`end` range and the resolution of the endpoint, the number of named series
+is configurable, and latency and error rates can be injected.
+
+Usage:
+    with MockServer(latency=0.05, error_rate=0.01) as server:
+        api = EnergyChartsAPI()
+        api.BASE_URL = server.url
+        api.get_public_power(Countries.GERMANY, "2024-01-01", "2024-01-02")
+
+    python -m benchmarks.mock_server --port 8000   # serve until interrupted
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+import numpy as np
+
+from app.enums import Endpoints
+from app.timerange import to_unix
+
+# Resolution of the synthetic time series in seconds
+STEPS = {Endpoints.FREQUENCY: 1, Endpoints.PRICE: 3600}
+DEFAULT_STEP = 900
+
+# Endpoints with a value list per named series
+SERIES_KEYS = {
+    Endpoints.PUBLIC_POWER: "production_types",
+    Endpoints.TOTAL_POWER: "production_types",
+    Endpoints.CBET: "countries",
+    Endpoints.CBPF: "countries",
+}
+
+# Endpoints with one 'data' and one 'forecast' list
+SHARE_ENDPOINTS = {
+    Endpoints.SOLAR_SHARE,
+    Endpoints.WIND_ONSHORE_SHARE,
+    Endpoints.WIND_OFFSHORE_SHARE,
+}
+
+DAILY_AVG_ENDPOINTS = {
+    Endpoints.REN_SHARE_DAILY_AVG,
+    Endpoints.SOLAR_SHARE_DAILY_AVG,
+    Endpoints.WIND_ONSHORE_SHARE_DAILY_AVG,
+    Endpoints.WIND_OFFSHORE_SHARE_DAILY_AVG,
+}
+
+
+def synthetic_response(
+    endpoint: Endpoints, query: dict[str, str], series: int = 20, max_points: int = 2_000_000
+) -> dict:
+    """Builds a response of an endpoint for the given query parameters.
+
+    Parameters:
+        endpoint (Endpoints): The requested endpoint.
+        query (dict[str, str]): The query parameters, e.g. 'start' and 'end'.
+        series (int): Number of named series of the multi-series endpoints.
+        max_points (int): Upper bound of the number of timestamps.
+
+    Returns:
+        dict: The response in the documented schema of the endpoint.
+    """
+    # A stable seed, unlike hash(), which is salted per process for strings
+    rng = np.random.default_rng(zlib.crc32(urlencode(sorted(query.items())).encode()))
+    step = STEPS.get(endpoint, DEFAULT_STEP)
+    now = int(time.time()) // 86400 * 86400
+    lower = int(to_unix(query["start"])) if "start" in query else now
+    upper = int(to_unix(query["end"])) if "end" in query else now + 2 * 86400
+    lower = -(-lower // step) * step
+    seconds = np.arange(lower, upper + 1, step)[:max_points]
+    n = len(seconds)
+
+    def values(scale: float = 1000.0) -> list[float]:
+        return np.round(rng.random(n) * scale, 2).tolist()
+
+    if endpoint in DAILY_AVG_ENDPOINTS:
+        year = int(query.get("year", 2024))
+        year = time.gmtime().tm_year - 1 if year == -1 else year
+        days = np.arange(f"{year}-01-01", f"{year + 1}-01-01", dtype="datetime64[D]")
+        labels = [d.strftime("%d.%m.%Y") for d in days.astype(object)]
+        return {
+            "days": labels,
+            "data": np.round(rng.random(len(days)) * 100, 1).tolist(),
+            "deprecated": False,
+        }
+    if endpoint == Endpoints.INSTALLED_POWER:
+        years = range(2002, time.gmtime().tm_year + 1)
+        labels = [str(y) for y in years]
+        if query.get("time_step") == "monthly":
+            labels = [f"{m:02d}.{y}" for y in years for m in range(1, 13)]
+        return {
+            "time": labels,
+            "production_types": [
+                {"name": f"Type {i}", "data": np.round(rng.random(len(labels)) * 50, 3).tolist()}
+                for i in range(series)
+            ],
+            "deprecated": False,
+        }
+
+    response: dict = {"unix_seconds": seconds.tolist()}
+    if endpoint in SERIES_KEYS:
+        response[SERIES_KEYS[endpoint]] = [
+            {"name": f"Series {i}", "data": values()} for i in range(series)
+        ]
+    elif endpoint == Endpoints.PUBLIC_POWER_FORECAST:
+        response["forecast_values"] = values()
+        response["production_type"] = query.get("production_type", "solar")
+        response["forecast_type"] = query.get("forecast_type", "current")
+    elif endpoint == Endpoints.FREQUENCY:
+        response["data"] = np.round(50 + rng.standard_normal(n) * 0.02, 3).tolist()
+    elif endpoint == Endpoints.PRICE:
+        response = {
+            "license_info": "synthetic",
+            **response,
+            "price": values(200.0),
+            "unit": "EUR / MWh",
+        }
+    elif endpoint == Endpoints.SIGNAL:
+        response["share"] = values(100.0)
+        response["signal"] = rng.integers(-1, 3, n).tolist()
+        response["substitute"] = False
+    elif endpoint == Endpoints.REN_SHARE_FORECAST:
+        for key in ("ren_share", "solar_share", "wind_onshore_share", "wind_offshore_share"):
+            response[key] = values(100.0)
+        response["substitute"] = False
+    elif endpoint in SHARE_ENDPOINTS:
+        response["data"] = values(100.0)
+        response["forecast"] = values(100.0)
+    response["deprecated"] = False
+    return response
+
+
+class MockServer:
+    """A threaded HTTP server serving synthetic Energy Charts responses in the background.
+
+    Attributes:
+        url (str): The base URL to assign to EnergyChartsAPI.BASE_URL.
+        requests (int): Number of requests served.
+    """
+
+    def __init__(
+        self,
+        port: int = 0,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        series: int = 20,
+        max_points: int = 2_000_000,
+    ):
+        """
+        Parameters:
+            port (int): The port to listen on, 0 for a free port.
+            latency (float): Seconds to wait before answering each request.
+            error_rate (float): Fraction of requests answered with 429 or 503.
+            series (int): Number of named series of the multi-series endpoints.
+            max_points (int): Upper bound of the number of timestamps per response.
+        """
+        self.latency = latency
+        self.error_rate = error_rate
+        self.series = series
+        self.max_points = max_points
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self.url = f"http://127.0.0.1:{self._server.server_port}"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handler(self):
+        server = self
+        endpoints = {e.value: e for e in Endpoints}
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                with server._lock:
+                    server.requests += 1
+                url = urlsplit(self.path)
+                endpoint = endpoints.get(url.path.strip("/"))
+                query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+                time.sleep(server.latency)
+                if endpoint is None:
+                    return self._send(404, {"detail": "Not Found"})
+                if random.random() < server.error_rate:
+                    return self._send(random.choice((429, 503)), {"detail": "Injected error"})
+                try:
+                    body = synthetic_response(endpoint, query, server.series, server.max_points)
+                except ValueError as error:
+                    return self._send(422, {"detail": [{"msg": str(error)}]})
+                self._send(200, body)
+
+            def _send(self, status: int, body: dict):
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                if status in (429, 503):
+                    self.send_header("Retry-After", "0")
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--series", type=int, default=20)
+    args = parser.parse_args()
+
+    with MockServer(args.port, args.latency, args.error_rate, args.series) as server:
+        print(f"Serving synthetic Energy Charts API on {server.url}")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.aggregate import Aggregator
+
+HOUR = 3600
+START = 1704067200  # 2024-01-01 00:00 UTC
+
+
+def quarter_hours():
+    """A day of 15-minute values with gaps, including an hour without any value."""
+    seconds = START + 900 * np.arange(96)
+    values = np.sin(np.arange(96) / 7.0) * 100
+    values[[3, 17, 18, 50]] = np.nan
+    values[40:44] = np.nan  # 10:00 to 11:00
+    return seconds, values
+
+
+@pytest.mark.parametrize("sizes", [[96], [10, 30, 1, 55], [7] * 13 + [5]])
+def test_chunked_updates_match_a_pandas_resample(sizes):
+    seconds, values = quarter_hours()
+    aggregator = Aggregator(HOUR, stats=("mean", "min", "max", "sum", "count"))
+    for chunk in np.split(np.arange(96), np.cumsum(sizes)[:-1]):
+        aggregator.update(seconds[chunk], {"load": values[chunk]})
+    result = aggregator.result()
+
+    series = pd.Series(values, index=pd.to_datetime(seconds, unit="s"))
+    expected = series.resample("1h").agg(["mean", "min", "max", "sum", "count"])
+    pd.testing.assert_index_equal(
+        pd.to_datetime(result["unix_seconds"], unit="s"), expected.index, check_names=False
+    )
+    for stat in expected.columns:
+        np.testing.assert_allclose(result[f"load_{stat}"], expected[stat], err_msg=stat)
+    assert np.isnan(result["load_mean"][10]) and result["load_count"][10] == 0
+
+
+def test_energy_integrates_until_the_next_sample_across_chunks():
+    seconds = START + HOUR * np.array([0, 1, 2, 4, 5])
+    values = np.array([10.0, 20.0, np.nan, 40.0, 50.0])
+    one_shot = Aggregator(2 * HOUR, stats=("energy",), energy_scale=1.0)
+    one_shot.update(seconds, {"power": values})
+    chunked = Aggregator(2 * HOUR, stats=("energy",), energy_scale=1.0)
+    for part in ([0], [1, 2], [3, 4]):
+        chunked.update(seconds[part], {"power": values[part]})
+
+    # 10 and 20 for one hour, NaN adds nothing, 40 for one hour and 50 for the median spacing
+    expected = [10.0 + 20.0, 0.0, 40.0 + 50.0]
+    np.testing.assert_allclose(one_shot.result()["power_energy"], expected)
+    np.testing.assert_allclose(chunked.result()["power_energy"], expected)
+
+
+def test_energy_is_scaled():
+    aggregator = Aggregator(HOUR, stats=("energy",))
+    aggregator.update(START + 900 * np.arange(4), {"power": [1000.0] * 4})
+    np.testing.assert_allclose(aggregator.result()["power_energy"], [1.0])
+
+
+def test_weighted_mean_ignores_samples_without_value_or_weight():
+    aggregator = Aggregator(2 * HOUR, stats=("weighted_mean", "mean"))
+    seconds = START + HOUR * np.arange(4)
+    aggregator.update_response(
+        {
+            "unix_seconds": list(seconds),
+            "price": [10.0, 40.0, np.nan, 30.0],
+            "load": [3.0, 1.0, 5.0, np.nan],
+        },
+        weights="load",
+    )
+    result = aggregator.result()
+    np.testing.assert_allclose(result["price_weighted_mean"], [(10 * 3 + 40 * 1) / 4, np.nan])
+    np.testing.assert_allclose(result["price_mean"], [25.0, 30.0])
+
+
+def test_unknown_statistics_are_rejected():
+    with pytest.raises(ValueError, match="median"):
+        Aggregator(HOUR, stats=("mean", "median"))
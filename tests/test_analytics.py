@@ -0,0 +1,58 @@
+import numpy as np
+
+from app.analytics import MarketPanel, mean_align
+
+
+def test_mean_align_holds_coarser_samples():
+    grid = np.arange(0, 2 * 3600, 900)
+    aligned = mean_align(np.array([0, 3600]), np.full((2, 1), 100.0), grid)
+    assert aligned.ravel().tolist() == [100.0] * 8
+
+
+def test_mean_align_averages_finer_samples():
+    aligned = mean_align(np.arange(0, 3600, 300), np.arange(12.0)[:, None], np.arange(0, 3600, 900))
+    assert aligned.ravel().tolist() == [1.0, 4.0, 7.0, 10.0]
+
+
+def test_energy_of_hourly_generation_on_quarter_hour_prices():
+    prices = {"FR": {"unix_seconds": list(range(0, 7200, 900)), "price": [10.0] * 8}}
+    power = {
+        "fr": {
+            "unix_seconds": [0, 3600],
+            "production_types": [{"name": "Solar", "data": [100.0, 100.0]}],
+        }
+    }
+    metrics = MarketPanel.from_responses(prices, power).metrics(None)
+    assert metrics["energy"][0, 0, 0] == 200.0
+    assert metrics["revenue"][0, 0, 0] == 2000.0
+
+
+def test_zone_sums_ignore_series_missing_from_one_member():
+    seconds = [0, 3600]
+    prices = {"DE-LU": {"unix_seconds": seconds, "price": [50.0, 70.0]}}
+    power = {
+        "de": {
+            "unix_seconds": seconds,
+            "production_types": [
+                {"name": "Solar", "data": [10.0, 20.0]},
+                {"name": "Wind offshore", "data": [100.0, 300.0]},
+            ],
+        },
+        "lu": {
+            "unix_seconds": seconds,
+            "production_types": [{"name": "Solar", "data": [1.0, None]}],
+        },
+    }
+    installed = {
+        "de": {"time": ["2024"], "production_types": [{"name": "Wind offshore", "data": [1.0]}]},
+        "lu": {"time": ["2024"], "production_types": [{"name": "Solar", "data": [0.5]}]},
+    }
+    panel = MarketPanel.from_responses(prices, power, installed)
+    metrics = panel.metrics(None)
+    solar, onshore, offshore = range(3)
+
+    np.testing.assert_array_equal(panel.generation[0, :, solar], [11.0, 20.0])
+    assert np.isnan(panel.generation[0, :, onshore]).all()
+    np.testing.assert_array_equal(metrics["energy"][0, 0], [31.0, 0.0, 400.0])
+    assert metrics["capture_price"][0, 0, offshore] == (100 * 50 + 300 * 70) / 400
+    np.testing.assert_array_equal(panel.capacity[0, 0], [500.0, np.nan, 1000.0])
@@ -0,0 +1,47 @@
+import json
+import threading
+import time
+from datetime import timedelta
+
+from app.api import EnergyChartsAPI
+from app.enums import BindingZones
+from app.timerange import to_unix
+
+
+class FakeResponse:
+    status_code = 200
+    headers = {}
+    elapsed = timedelta(0)
+
+    def __init__(self, body):
+        self.content = json.dumps(body).encode()
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class CountingSession:
+    """Records the highest number of concurrent requests."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.active = 0
+        self.peak = 0
+
+    def get(self, url, params=None, **kwargs):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(0.01)
+        with self.lock:
+            self.active -= 1
+        return FakeResponse({"unix_seconds": [int(to_unix(params["start"]))], "price": [1.0]})
+
+
+def test_get_many_in_chunked_mode_keeps_max_workers_requests_in_flight():
+    api = EnergyChartsAPI(chunked=True, max_workers=4)
+    api.session = CountingSession()
+    zones = list(BindingZones)[:6]
+    responses = api.get_many(api.get_price, zones, "1704067200", "1735689600")
+    assert list(responses) == zones
+    assert 1 < api.session.peak <= 4
@@ -0,0 +1,44 @@
+import numpy as np
+
+from app.api import EnergyChartsAPI
+from app.archive import FrequencyArchive
+from app.enums import Regions
+from benchmarks.mock_server import MockServer
+
+FEBRUARY = 1706745600  # 2024-02-01 00:00 UTC
+
+
+def test_write_slice_and_summary_across_a_month_boundary(tmp_path):
+    archive = FrequencyArchive(tmp_path)
+    seconds = np.arange(FEBRUARY - 120, FEBRUARY + 120)
+    values = 50 + (seconds - seconds[0]) / 1000
+    assert archive.write(Regions.UCTE, seconds, values) == 240
+    assert archive.months(Regions.UCTE) == ["2024-01", "2024-02"]
+    assert archive.extent(Regions.UCTE) == (FEBRUARY - 120, FEBRUARY + 120)
+
+    part = archive.slice(Regions.UCTE, FEBRUARY - 60, FEBRUARY + 60)
+    assert part.start == FEBRUARY - 60 and len(part) == 120
+    np.testing.assert_allclose(part.values, values[60:180], rtol=1e-6)
+
+    # Reopening reads the header index and the month files again
+    summary = FrequencyArchive(tmp_path).summary(Regions.UCTE, FEBRUARY - 120, FEBRUARY + 120)
+    assert list(summary["unix_seconds"]) == [FEBRUARY - 120 + 60 * i for i in range(4)]
+    assert list(summary["count"]) == [60] * 4
+    np.testing.assert_allclose(summary["min"], values[::60], rtol=1e-6)
+    np.testing.assert_allclose(summary["max"], values[59::60], rtol=1e-6)
+
+
+def test_ingest_resumes_after_the_last_archived_second(tmp_path):
+    archive = FrequencyArchive(tmp_path)
+    with MockServer() as server:
+        api = EnergyChartsAPI()
+        api.BASE_URL = server.url
+        first = archive.ingest(api, Regions.UCTE, str(FEBRUARY), str(FEBRUARY + 3600))
+        requests = server.requests
+        second = archive.ingest(api, Regions.UCTE, str(FEBRUARY), str(FEBRUARY + 7200))
+        assert server.requests == requests + 1
+
+    # The mock server includes the end of the requested range
+    assert first == 3601 and second == 3600
+    assert archive.extent(Regions.UCTE) == (FEBRUARY, FEBRUARY + 7201)
+    assert not np.isnan(archive.slice(Regions.UCTE, FEBRUARY, FEBRUARY + 7201).values).any()
@@ -0,0 +1,223 @@
+import asyncio
+from datetime import timedelta
+
+import pandas as pd
+import pytest
+
+from app import instrumentation
+from app.async_api import AsyncEnergyChartsAPI
+from app.capabilities import CapabilityTable
+from app.enums import (
+    BindingZones,
+    Countries,
+    Endpoints,
+    ForecastType,
+    ProductionType,
+    Regions,
+    SubTypes,
+    TimeSteps,
+)
+from app.exceptions import ValidationError
+from app.scheduler import RequestScheduler
+from app.transport import TransportConfig
+from benchmarks.mock_server import MockServer
+
+START, END = "2024-01-01", "2024-01-02"
+DE, ZONE = Countries.GERMANY, BindingZones.GERMANY_LUXEMBOURG
+
+# Every endpoint method with arguments and a key of its response
+ENDPOINT_CALLS = {
+    "get_public_power": ((DE, START, END), "production_types"),
+    "get_public_power_forecast": (
+        (DE, ProductionType.SOLAR, ForecastType.CURRENT, START, END),
+        "forecast_values",
+    ),
+    "get_total_power": ((DE, START, END), "production_types"),
+    "get_installed_power": ((DE, TimeSteps.YEARLY, False), "time"),
+    "get_frequency": ((Regions.UCTE, "2024-01-01T00:00Z", "2024-01-01T00:01Z"), "data"),
+    "get_cbet": ((DE, START, END), "countries"),
+    "get_cbpf": ((DE, START, END), "countries"),
+    "get_price": ((ZONE, START, END), "price"),
+    "get_signal": ((DE, "79104"), "signal"),
+    "get_ren_share_forecast": ((DE,), "ren_share"),
+    "get_ren_share_daily_avg": ((DE, 2023), "days"),
+    "get_solar_share": ((DE,), "data"),
+    "get_solar_share_daily_avg": ((DE, 2023), "days"),
+    "get_wind_onshore_share": ((DE,), "data"),
+    "get_wind_onshore_share_daily_avg": ((DE, 2023), "days"),
+    "get_wind_offshore_share": ((DE,), "data"),
+    "get_wind_offshore_share_daily_avg": ((DE, 2023), "days"),
+}
+
+
+@pytest.fixture(scope="module")
+def server():
+    with MockServer(series=2) as server:
+        yield server
+
+
+def client(server, **kwargs):
+    api = AsyncEnergyChartsAPI(**kwargs)
+    api.BASE_URL = server.url
+    return api
+
+
+def run(api, call):
+    async def main():
+        async with api:
+            return await call(api)
+
+    return asyncio.run(main())
+
+
+@pytest.mark.parametrize("method", sorted(ENDPOINT_CALLS))
+def test_endpoint_methods_are_awaitable(server, method):
+    args, key = ENDPOINT_CALLS[method]
+    response = run(client(server), lambda api: getattr(api, method)(*args))
+    assert key in response
+
+
+def test_get_and_chunked_get_range(server):
+    api = client(server, chunked=True, chunk_sizes={Endpoints.PRICE: timedelta(hours=6)})
+    direct = run(api, lambda api: api.get(Endpoints.PRICE, bzn=ZONE.value, start=START, end=END))
+    chunked = run(api, lambda api: api.get_range(Endpoints.PRICE, START, END, bzn=ZONE.value))
+    assert chunked["unix_seconds"] == direct["unix_seconds"]
+
+
+def test_gather_and_get_many(server):
+    zones = [ZONE, BindingZones.FRANCE]
+    gathered = run(client(server), lambda api: api.gather(api.get_price, zones, START, END))
+    many = run(client(server), lambda api: api.get_many(api.get_price, zones, START, END))
+    assert list(gathered) == list(many) == zones
+    assert many[ZONE]["price"] == gathered[ZONE]["price"]
+
+
+def test_get_panel(server):
+    zones = [ZONE, BindingZones.FRANCE]
+    panel = run(client(server), lambda api: api.get_panel(api.get_price, zones, START, END))
+    assert isinstance(panel, pd.DataFrame) and len(panel) == 25
+    assert {area for area, _ in panel.columns} == {ZONE.value, BindingZones.FRANCE.value}
+
+
+def test_iter_range_yields_windows_without_overlap(server):
+    api = client(server, limit_per_host=2, chunk_sizes={Endpoints.PRICE: timedelta(hours=6)})
+
+    async def collect(api):
+        return [r async for r in api.iter_range(Endpoints.PRICE, START, END, bzn=ZONE.value)]
+
+    windows = run(api, collect)
+    seconds = [s for window in windows for s in window["unix_seconds"]]
+    assert len(windows) == 4
+    assert seconds == sorted(set(seconds)) and len(seconds) == 25
+
+
+def test_aggregate(server):
+    api = client(server, chunk_sizes={Endpoints.PRICE: timedelta(hours=6)})
+    result = run(
+        api,
+        lambda api: api.aggregate(
+            Endpoints.PRICE, START, END, timedelta(hours=12), ("count",), bzn=ZONE.value
+        ),
+    )
+    assert list(result["price_count"]) == [12, 12, 1]
+
+
+def test_shares_the_state_of_the_sync_client():
+    api = AsyncEnergyChartsAPI(capabilities=CapabilityTable(), limit_per_host=3)
+    assert api.capabilities is not None and api.max_workers == 3
+    assert api.cache_hits == api.cache_misses == api.coalesced_requests == 0
+    with pytest.raises(ValidationError):
+        run(api, lambda api: api.get_public_power(DE, START, END, SubTypes.SOLARLOG))
+
+
+@pytest.mark.parametrize("option", [{"scheduler": RequestScheduler()}, {"stream": True}])
+def test_unsupported_options_are_rejected(option):
+    with pytest.raises(TypeError):
+        AsyncEnergyChartsAPI(**option)
+
+
+class FakeResponse:
+    def __init__(self, status, body=b"", headers=None):
+        self.status = status
+        self.body = body
+        self.headers = headers or {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        pass
+
+    async def read(self):
+        return self.body
+
+
+class ConditionalSession:
+    """Answers with an ETag and with 304 whenever If-None-Match is sent."""
+
+    closed = False
+
+    def __init__(self):
+        self.sent = []
+
+    def get(self, url, params=None, headers=None):
+        self.sent.append(dict(headers or {}))
+        if headers and "If-None-Match" in headers:
+            return FakeResponse(304, headers={"ETag": '"1"'})
+        return FakeResponse(200, b'{"unix_seconds": [1], "signal": [2]}', {"ETag": '"1"'})
+
+    async def close(self):
+        pass
+
+
+def test_conditional_requests_follow_the_transport_config():
+    api = AsyncEnergyChartsAPI(transport=TransportConfig(conditional=True))
+    api.session = session = ConditionalSession()
+
+    async def twice(api):
+        return [await api.get_signal(DE, "79104") for _ in range(2)]
+
+    first, second = run(api, twice)
+    assert first == second == {"unix_seconds": [1], "signal": [2]}
+    assert session.sent == [{}, {"If-None-Match": '"1"'}]
+    assert api.transport_stats.not_modified == 1
+
+
+def test_session_uses_the_transport_timeouts():
+    api = AsyncEnergyChartsAPI(transport=TransportConfig(connect_timeout=3, read_timeout=7))
+
+    async def timeout(api):
+        return api._get_session().timeout
+
+    timeout = run(api, timeout)
+    assert (timeout.sock_connect, timeout.sock_read) == (3, 7)
+
+
+def test_requests_are_instrumented(server):
+    stats = instrumentation.enable()
+    try:
+        prices = run(client(server), lambda api: api.get_price(ZONE, START, END))
+    finally:
+        instrumentation.disable()
+    assert len(prices["unix_seconds"]) == 25
+    assert stats.summary()[Endpoints.PRICE.value]["total"]["count"] == 1
+    assert stats.counters[Endpoints.PRICE.value, "response_bytes"] > 0
+
+
+def test_connection_errors_are_instrumented():
+    import aiohttp
+
+    stats = instrumentation.enable()
+    records = []
+    stats.add_post_request_hook(lambda endpoint, params, record: records.append(record))
+    api = AsyncEnergyChartsAPI()
+    api.BASE_URL = "http://127.0.0.1:1"  # nothing listens on port 1
+    try:
+        with pytest.raises(aiohttp.ClientConnectionError):
+            run(api, lambda api: api.get_signal(DE, "79104"))
+    finally:
+        instrumentation.disable()
+    ((endpoint, error),) = stats.failures
+    assert endpoint == Endpoints.SIGNAL.value and stats.failures[endpoint, error] == 1
+    assert [(r["status_code"], r["error"]) for r in records] == [(None, error)]
+    assert stats.counters[Endpoints.SIGNAL.value, "errors"] == 1
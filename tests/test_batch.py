@@ -0,0 +1,57 @@
+import json
+import os
+
+import pandas as pd
+import pytest
+
+from app.batch import BatchParser
+from app.parser import make_dataframe
+from benchmarks.bench_parser import synthetic_response
+
+SHM = "/dev/shm"
+
+
+def blocks():
+    return {name for name in os.listdir(SHM) if name.startswith("psm_")}
+
+
+@pytest.fixture(scope="module")
+def parser():
+    with BatchParser(workers=2, max_pending=4) as parser:
+        yield parser
+
+
+@pytest.mark.parametrize("tz", [None, "Europe/Berlin"])
+def test_dataframes_match_make_dataframe(parser, tz):
+    responses = {
+        "power": synthetic_response(96, 3),
+        "price": {"unix_seconds": [7200, 0, 3600], "price": [3.0, None, 2.0], "unit": "EUR/MWh"},
+        "daily": {"days": ["01.01.2024", "02.01.2024"], "data": [1.5, 2.5], "deprecated": False},
+    }
+    bodies = {key: json.dumps(response).encode() for key, response in responses.items()}
+    parser.tz = tz
+    try:
+        results = {key: (df, error) for key, df, error in parser.parse(bodies)}
+        decoded = {key: df for key, df, _ in parser.parse(responses)}
+    finally:
+        parser.tz = None
+    for key, response in responses.items():
+        assert results[key][1] is None
+        pd.testing.assert_frame_equal(results[key][0], make_dataframe(response, tz))
+        pd.testing.assert_frame_equal(decoded[key], make_dataframe(response, tz))
+
+
+def test_bad_body_yields_error(parser):
+    results = dict((key, error) for key, _, error in parser.parse([b"{broken", b"{}"]))
+    assert isinstance(results[0], json.JSONDecodeError)
+    assert isinstance(results[1], ValueError)
+
+
+@pytest.mark.skipif(not os.path.isdir(SHM), reason="needs /dev/shm")
+def test_early_close_frees_shared_blocks(parser):
+    before = blocks()
+    bodies = (json.dumps(synthetic_response(96, 3, seed)).encode() for seed in range(16))
+    results = parser.parse(bodies)
+    next(results)
+    results.close()
+    assert blocks() == before
@@ -0,0 +1,53 @@
+import time
+
+import numpy as np
+
+from app.cache import SETTLED_AFTER, MemoryCache, SQLiteCache, make_key, ttl_for
+from app.enums import Endpoints
+
+
+def test_ttl_for_settled_ranges_and_forecasts():
+    now = time.time()
+    old_end = str(int(now - SETTLED_AFTER.total_seconds() - 86400))
+    assert ttl_for(Endpoints.PUBLIC_POWER, {"end": old_end}, now) is None
+    assert ttl_for(Endpoints.PUBLIC_POWER, {"end": str(int(now))}, now) == 3600
+    assert ttl_for(Endpoints.SIGNAL, {"country": "de"}, now) == 900
+
+
+def test_memory_cache_expires_entries(monkeypatch):
+    cache = MemoryCache()
+    cache.set("key", {"a": 1}, ttl=10)
+    assert cache.get("key") == {"a": 1}
+    later = time.time() + 11
+    monkeypatch.setattr(time, "time", lambda: later)
+    assert cache.get("key") is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_memory_cache_returns_copies():
+    cache = MemoryCache()
+    response = {"unix_seconds": [1, 2], "production_types": [{"name": "Solar", "data": [1.0]}]}
+    cache.set("key", response, ttl=None)
+    response["unix_seconds"].append(3)
+    cached = cache.get("key")
+    cached["production_types"][0]["data"][0] = 99.0
+    assert cache.get("key") == {
+        "unix_seconds": [1, 2],
+        "production_types": [{"name": "Solar", "data": [1.0]}],
+    }
+
+
+def test_sqlite_cache_round_trips_json_and_arrays(tmp_path):
+    cache = SQLiteCache(tmp_path / "cache.sqlite")
+    key = make_key(Endpoints.PRICE, {"bzn": "DE-LU"})
+    response = {
+        "unix_seconds": np.array([1, 2], dtype=np.int64),
+        "price": np.array([1.5, np.nan]),
+        "unit": "EUR/MWh",
+        "deprecated": False,
+    }
+    cache.set(key, response, ttl=None)
+    cached = cache.get(key)
+    assert cached["unix_seconds"].dtype == np.int64
+    np.testing.assert_array_equal(cached["price"], response["price"])
+    assert cached["unit"] == "EUR/MWh" and cached["deprecated"] is False
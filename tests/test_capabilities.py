@@ -0,0 +1,37 @@
+import pytest
+
+from app.api import EnergyChartsAPI
+from app.capabilities import CapabilityTable
+from app.enums import Countries, Endpoints, SubTypes
+from app.exceptions import ValidationError
+
+
+class FailingSession:
+    def get(self, *args, **kwargs):
+        raise AssertionError("no request may be sent")
+
+
+def test_unsupported_parameter_raises_validation_error_before_sending():
+    api = EnergyChartsAPI(capabilities=CapabilityTable())
+    api.session = FailingSession()
+    with pytest.raises(ValidationError):
+        api.get_public_power(Countries.GERMANY, "2024-01-01", "2024-01-02", SubTypes.SOLARLOG)
+
+
+@pytest.mark.parametrize(
+    "params",
+    [
+        {"country": "de", "start": "2024-01-02", "end": "2024-01-01"},
+        {"country": "de", "start": "yesterday"},
+    ],
+)
+def test_invalid_times_raise_validation_error(params):
+    with pytest.raises(ValidationError):
+        CapabilityTable().validate(Endpoints.PUBLIC_POWER, params)
+
+
+def test_validate_normalizes_times():
+    params = {"country": "de", "start": "2024-01-01T17:00:00.000Z"}
+    assert CapabilityTable().validate(Endpoints.PUBLIC_POWER, params)["start"] == (
+        "2024-01-01T17:00+00:00"
+    )
@@ -0,0 +1,48 @@
+import numpy as np
+
+from app.chunking import merge_responses, slice_response, split_range
+from app.enums import ChunkSize
+
+
+def test_merge_keeps_shared_timestamps_once_with_the_last_values():
+    first = {
+        "unix_seconds": [0, 900, 1800],
+        "production_types": [{"name": "Solar", "data": [1.0, 2.0, 3.0]}],
+        "deprecated": False,
+    }
+    second = {
+        "unix_seconds": [1800, 2700],
+        "production_types": [
+            {"name": "Solar", "data": [30.0, 4.0]},
+            {"name": "Wind", "data": [5.0, 6.0]},
+        ],
+        "deprecated": True,
+    }
+    merged = merge_responses([first, None, second])
+    assert merged["unix_seconds"] == [0, 900, 1800, 2700]
+    assert merged["production_types"] == [
+        {"name": "Solar", "data": [1.0, 2.0, 30.0, 4.0]},
+        {"name": "Wind", "data": [None, None, 5.0, 6.0]},
+    ]
+    assert merged["deprecated"] is True
+
+
+def test_merge_orders_arrays_by_timestamp():
+    later = {"unix_seconds": np.array([3600, 7200]), "price": np.array([2.0, 3.0])}
+    earlier = {"unix_seconds": np.array([0, 3600]), "price": np.array([1.0, np.nan])}
+    merged = merge_responses([later, earlier])
+    np.testing.assert_array_equal(merged["unix_seconds"], [0, 3600, 7200])
+    np.testing.assert_array_equal(merged["price"], [1.0, np.nan, 3.0])
+
+
+def test_split_and_slice_cover_the_range_without_gaps():
+    windows = split_range("2024-01-30", "2024-03-02", ChunkSize.MONTH)
+    assert [w[0][:10] for w in windows] == ["2024-01-30", "2024-02-01", "2024-03-01"]
+    assert all(a[1] == b[0] for a, b in zip(windows, windows[1:]))
+
+    response = {"unix_seconds": [0, 900, 1800], "price": [1.0, 2.0, 3.0], "unit": "EUR/MWh"}
+    assert slice_response(response, 900, 1800) == {
+        "unix_seconds": [900, 1800],
+        "price": [2.0, 3.0],
+        "unit": "EUR/MWh",
+    }
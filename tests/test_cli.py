@@ -0,0 +1,27 @@
+from app.cli import Job, make_units, run_units
+from app.enums import BindingZones, ChunkSize
+
+
+class FakeAPI:
+    def __init__(self):
+        self.sent = []
+
+    def get(self, endpoint, start, end, **params):
+        self.sent.append((start, end))
+        lower, upper = int(start), int(end)
+        seconds = list(range(lower, upper + 1, 3600))  # the end is inclusive
+        return {"unix_seconds": seconds, "price": [1.0] * len(seconds)}
+
+
+def test_windows_are_sent_and_sliced_as_unix_seconds():
+    api = FakeAPI()
+    units = make_units([BindingZones.FRANCE], "2024-01-01", "2024-01-03", ChunkSize.DAY)
+    results = list(run_units(api, "price", units, workers=2))
+    assert api.sent == [("1704067200", "1704153600"), ("1704153600", "1704240000")]
+    assert [len(response["unix_seconds"]) for _, response, _ in results] == [24, 24]
+
+
+def test_job_resumes_from_checkpoint(tmp_path):
+    units = make_units([BindingZones.FRANCE], "2024-01-01", "2024-01-03", ChunkSize.DAY)
+    Job(units, tmp_path / "checkpoint.jsonl").complete(units[0], 24)
+    assert Job(units, tmp_path / "checkpoint.jsonl").pending == units[1:]
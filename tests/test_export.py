@@ -0,0 +1,58 @@
+import os
+
+import pytest
+
+from app.enums import Countries, Endpoints
+from app.export import read_dataset, write_dataset
+from app.results import wrap_response
+
+DAY = 86400
+START = 1704067200  # 2024-01-01 00:00 UTC
+
+
+def response(first, count, value):
+    seconds = [START + (first + i) * DAY for i in range(count)]
+    return {"unix_seconds": seconds, "price": [value] * count, "unit": "EUR/MWh"}
+
+
+@pytest.mark.parametrize("file_format", ["parquet", "ipc"])
+def test_overlapping_appends_keep_the_newest_rows(tmp_path, file_format):
+    old = write_dataset(
+        response(0, 3, 1.0), tmp_path, Endpoints.PRICE, "DE-LU", file_format=file_format
+    )
+    new = write_dataset(
+        response(2, 3, 2.0), tmp_path, Endpoints.PRICE, "DE-LU", file_format=file_format
+    )
+    # Modification times (e.g. after copying the dataset) don't affect which write is newer
+    for age, paths in ((100, old), (200, new)):
+        for path in paths:
+            os.utime(path, (START - age, START - age))
+
+    df = read_dataset(tmp_path, Endpoints.PRICE, "DE-LU", file_format=file_format)
+    assert len(df) == 5
+    assert df["timestamp"].is_monotonic_increasing
+    assert list(df["price"]) == [1.0, 1.0, 2.0, 2.0, 2.0]
+
+
+def test_rewriting_a_part_replaces_its_files_and_makes_them_newest(tmp_path):
+    write_dataset(response(0, 2, 1.0), tmp_path, Endpoints.PRICE, "de", part="first")
+    write_dataset(response(0, 2, 2.0), tmp_path, Endpoints.PRICE, "de", part="second")
+    (path,) = write_dataset(response(0, 2, 3.0), tmp_path, Endpoints.PRICE, "de", part="first")
+
+    assert path.name == "part-000000000003-first.parquet"
+    assert sorted(p.name for p in path.parent.iterdir()) == [
+        "part-000000000002-second.parquet",
+        "part-000000000003-first.parquet",
+    ]
+    assert list(read_dataset(tmp_path, Endpoints.PRICE, "de")["price"]) == [3.0, 3.0]
+
+
+def test_typed_results_are_exported(tmp_path):
+    typed = wrap_response(response(0, 2, 3.0))
+    write_dataset(typed, tmp_path, Endpoints.PRICE, Countries.GERMANY)
+    assert list(read_dataset(tmp_path, Endpoints.PRICE, "de")["price"]) == [3.0, 3.0]
+
+
+def test_unknown_format_lists_supported_formats(tmp_path):
+    with pytest.raises(ValueError, match="parquet, ipc"):
+        write_dataset(response(0, 1, 1.0), tmp_path, Endpoints.PRICE, "DE-LU", file_format="csv")
@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+
+from app.enums import Countries
+from app.flows import FlowNetwork
+
+HOUR = 3600
+START = 1704067200  # 2024-01-01 00:00 UTC
+SECONDS = [START, START + HOUR, START + 2 * HOUR]
+
+# Positive values are imports of the reporting country
+RESPONSES = {
+    Countries.GERMANY: {
+        "unix_seconds": SECONDS,
+        "countries": [
+            {"name": "France", "data": [1.0, -2.0, 0.0]},
+            {"name": "Austria", "data": [0.5, 0.5, None]},
+            {"name": "sum", "data": [1.5, -1.5, 0.0]},
+        ],
+    },
+    Countries.FRANCE: {
+        "unix_seconds": SECONDS,
+        "countries": [{"name": "Germany", "data": [-1.0, 2.0, 0.0]}],
+    },
+    # Austria disagrees with Germany in the first hour and does not report the second
+    Countries.AUSTRIA: {
+        "unix_seconds": SECONDS,
+        "countries": [{"name": "Germany", "data": [-0.7, None, -0.3]}],
+    },
+}
+
+
+@pytest.fixture
+def network():
+    return FlowNetwork.from_responses(RESPONSES)
+
+
+def test_flows_reconcile_both_sides_of_each_border(network):
+    assert network.index == ["at", "de", "fr"]
+    np.testing.assert_allclose(network.flow("fr", "de"), [1.0, -2.0, 0.0])
+    np.testing.assert_allclose(network.flow(Countries.AUSTRIA, Countries.GERMANY), [0.6, 0.5, 0.3])
+    np.testing.assert_allclose(network.flows, -network.flows.swapaxes(1, 2))
+
+
+def test_net_positions_match_the_raw_responses(network):
+    net = network.net_position()
+    at, de, fr = range(3)
+
+    # France and Germany agree, so their border nets out to France's own report
+    france = RESPONSES[Countries.FRANCE]["countries"][0]["data"]
+    np.testing.assert_allclose(net[:, fr], [-v for v in france])
+    np.testing.assert_allclose(net[:, at], [0.6, 0.5, 0.3])
+    np.testing.assert_allclose(net[:, de], [-1.6, 1.5, -0.3])
+    np.testing.assert_allclose(net.sum(axis=1), 0.0, atol=1e-12)
+
+    exports = np.nansum(np.clip(network.flows, 0, None), axis=2)
+    imports = np.nansum(np.clip(-network.flows, 0, None), axis=2)
+    np.testing.assert_allclose(exports - imports, net)
+    np.testing.assert_allclose(imports[:, de], [1.6, 0.5, 0.3])
+    np.testing.assert_allclose(exports[:, de], [0.0, 2.0, 0.0])
+
+
+def test_windows_are_views_of_the_network(network):
+    window = network.window(START + HOUR, START + 2 * HOUR)
+    assert list(window.unix_seconds) == SECONDS[1:]
+    for name in ("unix_seconds", "reported", "flows"):
+        assert np.shares_memory(getattr(window, name), getattr(network, name))
+    np.testing.assert_allclose(window.net_position(), network.net_position()[1:])
+    np.testing.assert_allclose(
+        network.net_position(start=START + HOUR, end=START + HOUR), network.net_position()[1:2]
+    )
+
+
+def test_consistency_reports_the_disagreeing_border(network):
+    worst, agreeing = network.consistency(tolerance=0.1)
+    assert (worst["from"], worst["to"]) == ("at", "de")
+    assert worst["count"] == 1  # the only hour reported by both sides
+    assert worst["max_difference"] == pytest.approx(0.2)
+    assert worst["violations"] == 1
+    assert (agreeing["from"], agreeing["to"], agreeing["max_difference"]) == ("de", "fr", 0.0)
@@ -0,0 +1,47 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import app
+
+HEAVY = ("numpy", "pandas", "requests", "aiohttp", "pyarrow")
+
+
+def loaded_modules(statement):
+    """Runs an import statement in a fresh interpreter and returns the heavy modules it loaded."""
+    code = f"import json, sys; {statement}; print(json.dumps([m for m in {HEAVY!r} if m in sys.modules]))"
+    output = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=Path(__file__).parents[1],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return json.loads(output)
+
+
+@pytest.mark.parametrize(
+    "statement", ["import app", "from app import Countries, EnergyChartsAPI, Endpoints"]
+)
+def test_importing_the_client_loads_no_heavy_dependencies(statement):
+    assert loaded_modules(statement) == []
+
+
+def test_make_dataframe_loads_pandas_on_first_use():
+    assert "pandas" in loaded_modules("from app import make_dataframe; make_dataframe({'a': [1]})")
+
+
+@pytest.mark.parametrize("name", app.__all__)
+def test_every_public_name_resolves(name):
+    assert getattr(app, name) is getattr(__import__(app._EXPORTS[name], fromlist=[name]), name)
+
+
+def test_public_names_are_listed_once():
+    assert sorted(app.__all__) == sorted(set(app._EXPORTS))
+    assert len(app.__all__) == len(set(app.__all__))
+    assert set(dir(app)) >= set(app.__all__)
+    with pytest.raises(AttributeError):
+        app.missing
@@ -0,0 +1,90 @@
+import json
+from datetime import timedelta
+
+import pytest
+import requests
+
+from app import instrumentation
+from app.api import EnergyChartsAPI
+from app.enums import Countries, Endpoints
+from app.scheduler import RequestScheduler
+
+
+class FakeResponse:
+    def __init__(self, status_code, body=None, headers=None):
+        self.status_code = status_code
+        self.content = json.dumps(body).encode() if body is not None else b""
+        self.headers = headers or {}
+        self.elapsed = timedelta(milliseconds=1)
+
+    def json(self):
+        return json.loads(self.content)
+
+    def close(self):
+        pass
+
+
+class FakeSession:
+    """Throttles the first request with a Retry-After of 0.2 seconds."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def get(self, url, **kwargs):
+        self.calls += 1
+        if self.calls == 1:
+            return FakeResponse(429, headers={"Retry-After": "0.2"})
+        return FakeResponse(200, {"unix_seconds": [1], "signal": [2]})
+
+
+@pytest.fixture
+def stats():
+    yield instrumentation.enable()
+    instrumentation.disable()
+
+
+def test_backoff_is_recorded_apart_from_download(stats):
+    api = EnergyChartsAPI(scheduler=RequestScheduler(rate=1000, backoff_base=0.001))
+    api.session = FakeSession()
+    api.get_signal(Countries.GERMANY, "79104")
+
+    phases = stats.summary()[Endpoints.SIGNAL.value]
+    assert phases["backoff"]["mean"] == pytest.approx(0.2)
+    assert phases["wait"]["mean"] >= 0.2
+    assert phases["download"]["mean"] < 0.1
+    assert phases["total"]["mean"] >= 0.2
+
+
+class FailingSession:
+    """Fails the first `failures` requests with a timeout, then answers."""
+
+    def __init__(self, failures):
+        self.failures = failures
+
+    def get(self, url, **kwargs):
+        if self.failures:
+            self.failures -= 1
+            raise requests.ConnectTimeout("timed out")
+        return FakeResponse(200, {"unix_seconds": [1], "signal": [2]})
+
+
+def test_failed_attempts_are_counted_by_error(stats):
+    records = []
+    stats.add_post_request_hook(lambda endpoint, params, record: records.append(record))
+    api = EnergyChartsAPI(scheduler=RequestScheduler(rate=1000, max_retries=2, backoff_base=0.001))
+    api.session = FailingSession(failures=1)
+    api.get_signal(Countries.GERMANY, "79104")
+    assert dict(stats.failures) == {(Endpoints.SIGNAL.value, "ConnectTimeout"): 1}
+    assert records[-1]["status_code"] == 200
+
+    api.session = FailingSession(failures=3)
+    with pytest.raises(requests.ConnectTimeout):
+        api.get_signal(Countries.GERMANY, "79105")
+    assert dict(stats.failures) == {(Endpoints.SIGNAL.value, "ConnectTimeout"): 4}
+    assert records[-1]["status_code"] is None and records[-1]["error"] == "ConnectTimeout"
+    assert records[-1]["backoff"] > 0
+    assert stats.counters[Endpoints.SIGNAL.value, "errors"] == 1
+    assert (
+        'energy_charts_failed_attempts_total{endpoint="signal",error="ConnectTimeout"} 4'
+        in stats.prometheus()
+    )
@@ -0,0 +1,30 @@
+import subprocess
+import sys
+from pathlib import Path
+
+from app.enums import Endpoints
+from benchmarks.mock_server import synthetic_response
+
+QUERY = {"country": "de", "start": "2024-01-01", "end": "2024-01-02"}
+
+
+def test_responses_are_reproducible_across_processes():
+    code = (
+        "import json; from app.enums import Endpoints; "
+        "from benchmarks.mock_server import synthetic_response; "
+        f"print(json.dumps(synthetic_response(Endpoints.PRICE, {QUERY!r})['price']))"
+    )
+    outputs = {
+        subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=Path(__file__).parents[1],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        for _ in range(2)
+    }
+    assert len(outputs) == 1
+    assert synthetic_response(Endpoints.PRICE, dict(reversed(QUERY.items()))) == (
+        synthetic_response(Endpoints.PRICE, QUERY)
+    )
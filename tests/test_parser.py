@@ -0,0 +1,118 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.parser import make_dataframe, make_panel
+
+
+def reference_make_dataframe(response):
+    """The merge-based make_dataframe that the single-pass implementation replaced."""
+    if not response:
+        raise ValueError("The response is empty or invalid.")
+    timestamps = pd.to_datetime(response["unix_seconds"], unit="s")
+    df = pd.DataFrame({"timestamp": timestamps})
+    for key in ("production_types", "countries"):
+        for entry in response.get(key, []):
+            temp_df = pd.DataFrame({"timestamp": timestamps, entry["name"]: entry["data"]})
+            df = pd.merge(df, temp_df, on="timestamp", how="outer")
+    for key, values in response.items():
+        if key in ("production_types", "countries", "unix_seconds"):
+            continue
+        if isinstance(values, list):
+            temp_df = pd.DataFrame({"timestamp": timestamps, key: values})
+            df = pd.merge(df, temp_df, on="timestamp", how="outer")
+        else:
+            df[key] = values
+    return df.sort_values(by="timestamp")
+
+
+def expected_frame(response, tz=None):
+    """The reference output with the intended differences: float64 series, nanosecond
+    timestamps and timestamps converted to the requested timezone."""
+    df = reference_make_dataframe(response)
+    names = [e["name"] for key in ("production_types", "countries") for e in response.get(key, [])]
+    df = df.astype({name: "float64" for name in names})
+    timestamps = df["timestamp"].astype("datetime64[ns]")
+    if tz is not None:
+        timestamps = timestamps.dt.tz_localize("UTC").dt.tz_convert(tz)
+    return df.assign(timestamp=timestamps).reset_index(drop=True)
+
+
+SECONDS = [1704067200, 1704070800, 1704074400]
+
+RESPONSES = {
+    "scalar series": {
+        "unix_seconds": SECONDS,
+        "price": [50.5, None, 70.0],
+        "unit": "EUR/MWh",
+        "deprecated": False,
+    },
+    "production types": {
+        "unix_seconds": SECONDS,
+        "production_types": [
+            {"name": "Solar", "data": [0, 5, 10]},
+            {"name": "Wind onshore", "data": [1.5, None, 3.5]},
+        ],
+        "deprecated": False,
+    },
+    "list of series": {
+        "unix_seconds": SECONDS,
+        "production_types": [{"name": "Load", "data": [60.0, 61.0, 62.0]}],
+        "countries": [
+            {"name": "fr", "data": [1.0, -2.0, 3.0]},
+            {"name": "at", "data": [None, None, None]},
+        ],
+    },
+    "unsorted timestamps": {"unix_seconds": SECONDS[::-1], "signal": [1, 2, 3]},
+    "empty series": {"unix_seconds": [], "price": [], "unit": "EUR/MWh"},
+}
+
+
+@pytest.mark.parametrize("tz", [None, "UTC", "Europe/Berlin"])
+@pytest.mark.parametrize("name", RESPONSES)
+def test_make_dataframe_matches_the_merge_based_implementation(name, tz):
+    response = RESPONSES[name]
+    pd.testing.assert_frame_equal(make_dataframe(response, tz), expected_frame(response, tz))
+
+
+@pytest.mark.parametrize("response", [None, {}])
+def test_make_dataframe_rejects_empty_responses(response):
+    with pytest.raises(ValueError, match="empty or invalid"):
+        make_dataframe(response)
+
+
+@pytest.mark.parametrize("tz", [None, "Europe/Berlin"])
+def test_make_dataframe_parses_day_and_time_labels(tz):
+    # The merge-based implementation failed without 'unix_seconds'; labels are now parsed dates
+    days = make_dataframe({"days": ["31.12.2023", "01.01.2024"], "data": [1.0, 2.0]}, tz)
+    expected = pd.to_datetime(["2023-12-31", "2024-01-01"]).astype("datetime64[ns]")
+    if tz is not None:
+        expected = expected.tz_localize(tz)
+    assert list(days.columns) == ["days", "data"]
+    pd.testing.assert_index_equal(pd.DatetimeIndex(days["days"]), expected.rename("days"))
+    assert list(days["data"]) == [1.0, 2.0]
+
+    time = make_dataframe(
+        {"time": ["2023", "2024"], "production_types": [{"name": "Solar", "data": [1, 2]}]}
+    )
+    assert list(time["time"]) == [pd.Timestamp("2023-01-01"), pd.Timestamp("2024-01-01")]
+    assert time["Solar"].dtype == np.float64
+    # Labels in another format are kept as strings
+    weeks = make_dataframe({"time": ["2024-W01", "2024-W02"], "data": [1.0, 2.0]})
+    assert list(weeks["time"]) == ["2024-W01", "2024-W02"]
+
+
+def test_make_panel_fits_series_to_the_timestamps():
+    responses = {
+        "de": {
+            "unix_seconds": [0, 3600, 7200],
+            "production_types": [{"name": "Solar", "data": [1.0, 2.0]}],
+        },
+        "fr": {
+            "unix_seconds": [0, 3600],
+            "production_types": [{"name": "Solar", "data": [3.0, 4.0, 5.0]}],
+        },
+    }
+    panel = make_panel(responses)
+    np.testing.assert_array_equal(panel["de", "Solar"], [1.0, 2.0, np.nan])
+    np.testing.assert_array_equal(panel["fr", "Solar"], [3.0, 4.0, np.nan])
@@ -0,0 +1,90 @@
+import asyncio
+import threading
+from datetime import timedelta
+
+from app.enums import Countries, Endpoints
+from app.poller import LiveFeedPoller, Subscription
+
+
+class FakeAPI:
+    def __init__(self):
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def get(self, endpoint, **params):
+        with self.lock:
+            self.calls += 1
+            second = self.calls
+        return {"unix_seconds": [second], "signal": [second]}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def poll_due(poller):
+    """Polls every feed that is due at the current time, as the background thread would."""
+    while True:
+        with poller._condition:
+            feed = poller._pop_due()
+        if feed is None:
+            return
+        poller._poll(feed)
+
+
+def test_resubscribe_before_stale_entry_polls_once_per_interval():
+    api, clock = FakeAPI(), FakeClock()
+    poller = LiveFeedPoller(api, {Endpoints.SIGNAL: timedelta(seconds=0.2)}, clock=clock)
+    params = {"country": Countries.GERMANY}
+    first = poller.subscribe(Endpoints.SIGNAL, **params)
+    first.cancel()  # leaves the schedule entry of the removed feed queued
+    second = poller.subscribe(Endpoints.SIGNAL, **params)
+    key = second.key
+    assert sorted(poller._schedule) == [(0.0, key, 0), (0.0, key, 1)]
+    assert poller._feeds[key].generation == 1
+
+    polls = []
+    for now in (0.0, 0.1, 0.2, 0.3, 0.45, 1.0, 1.1):
+        clock.now = now
+        poll_due(poller)
+        polls.append(poller.requests)
+    # The stale entry of generation 0 is dropped; a late poll is rescheduled from its own time
+    assert polls == [1, 1, 2, 2, 3, 4, 4]
+    assert poller._schedule == [(1.2, key, 1)]
+
+
+def test_background_thread_polls_subscribed_feeds():
+    polled = threading.Event()
+    poller = LiveFeedPoller(FakeAPI())
+    poller.subscribe(Endpoints.SIGNAL, lambda changes: polled.set(), country="de")
+    with poller:
+        assert polled.wait(5)
+    assert not poller._thread.is_alive()
+
+
+def test_deliver_to_closed_loop_drops_subscription():
+    poller = LiveFeedPoller(FakeAPI())
+
+    async def subscribe():
+        return poller.subscribe(Endpoints.SIGNAL, queue=asyncio.Queue(), country="de")
+
+    loop = asyncio.new_event_loop()
+    subscription = loop.run_until_complete(subscribe())
+    loop.close()
+
+    subscription.deliver({"unix_seconds": [1]})
+    assert subscription.key not in poller._feeds
+
+
+def test_callback_subscription_receives_latest():
+    poller = LiveFeedPoller(FakeAPI())
+    received = []
+    feed_key = poller.subscribe(Endpoints.SIGNAL, country="de").key
+    poller._poll(poller._feeds[feed_key])
+    subscription = poller.subscribe(Endpoints.SIGNAL, received.append, country="de")
+    assert isinstance(subscription, Subscription)
+    assert received and list(received[0]["unix_seconds"]) == [1]
@@ -0,0 +1,115 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.parser import make_dataframe
+from app.results import (
+    DailyAverageResult,
+    InstalledPowerResult,
+    MultiSeriesResult,
+    TimeSeriesResult,
+    wrap_response,
+)
+
+SECONDS = [1704067200, 1704070800, 1704074400]
+
+RESPONSES = {
+    TimeSeriesResult: {
+        "unix_seconds": SECONDS,
+        "price": [50.5, None, 70.0],
+        "unit": "EUR/MWh",
+        "deprecated": False,
+    },
+    MultiSeriesResult: {
+        "unix_seconds": SECONDS,
+        "production_types": [
+            {"name": "Solar", "data": [0.0, 5.0, 10.0]},
+            {"name": "Wind onshore", "data": [1.5, None, 3.5]},
+        ],
+        "deprecated": False,
+    },
+    DailyAverageResult: {
+        "days": ["30.12.2023", "31.12.2023", "01.01.2024"],
+        "data": [1.0, None, 3.0],
+        "deprecated": False,
+    },
+    InstalledPowerResult: {
+        "time": ["2022", "2023", "2024"],
+        "production_types": [{"name": "Solar", "data": [60.0, 80.0, 90.0]}],
+        "deprecated": False,
+    },
+}
+
+INDEX = {
+    TimeSeriesResult: "timestamp",
+    MultiSeriesResult: "timestamp",
+    DailyAverageResult: "days",
+    InstalledPowerResult: "time",
+}
+
+
+def assert_same_values(actual, expected):
+    """Compares response values, treating arrays and lists with NaN for None as equal."""
+    if isinstance(expected, list) and expected and isinstance(expected[0], dict):
+        assert [e["name"] for e in actual] == [e["name"] for e in expected]
+        for a, e in zip(actual, expected):
+            assert_same_values(a["data"], e["data"])
+    elif isinstance(expected, list) and not isinstance(expected[0], str):
+        np.testing.assert_array_equal(actual, np.array(expected, dtype=np.float64))
+    else:
+        assert list(actual) == expected if isinstance(expected, list) else actual == expected
+
+
+@pytest.mark.parametrize("cls", RESPONSES)
+def test_results_are_mappings_of_the_response(cls):
+    response = RESPONSES[cls]
+    result = wrap_response(response)
+
+    assert type(result) is cls
+    assert list(result) == list(response)
+    assert len(result) == len(response)
+    assert set(result.keys()) == set(response)
+    assert "missing" not in result and result.get("missing", 1) == 1
+    for key, value in response.items():
+        assert key in result
+        assert_same_values(result[key], value)
+        assert_same_values(dict(result)[key], value)
+    with pytest.raises(KeyError):
+        result["missing"]
+
+
+@pytest.mark.parametrize("cls", RESPONSES)
+def test_results_have_no_instance_dictionary(cls):
+    result = wrap_response(RESPONSES[cls])
+    assert not hasattr(result, "__dict__")
+    with pytest.raises(AttributeError):
+        result.extra = 1
+
+
+@pytest.mark.parametrize("cls", RESPONSES)
+def test_to_pandas_matches_make_dataframe(cls):
+    response = RESPONSES[cls]
+    result = wrap_response(response)
+    frame = result.to_pandas()
+    expected = make_dataframe(response).set_index(INDEX[cls])[list(frame.columns)]
+
+    pd.testing.assert_frame_equal(frame, expected, check_names=False, check_freq=False)
+    pd.testing.assert_frame_equal(make_dataframe(result), make_dataframe(response))
+    assert np.shares_memory(frame.to_numpy(), result.block)
+    assert np.shares_memory(result.to_numpy(), result.block)
+
+
+def test_to_pandas_converts_timestamps_to_the_timezone():
+    frame = wrap_response(RESPONSES[TimeSeriesResult]).to_pandas("Europe/Berlin")
+    assert frame.index[0] == pd.Timestamp("2024-01-01 01:00", tz="Europe/Berlin")
+
+
+def test_series_are_padded_to_the_timestamps():
+    result = wrap_response({"unix_seconds": SECONDS, "countries": [{"name": "fr", "data": [1.0]}]})
+    assert result.key == "countries"
+    np.testing.assert_array_equal(result["countries"][0]["data"], [1.0, np.nan, np.nan])
+
+
+@pytest.mark.parametrize("response", [None, {"unexpected": 1}, {"time": ["2024"], "data": [1]}])
+def test_unrecognized_responses_are_returned_unchanged(response):
+    assert wrap_response(response) is response
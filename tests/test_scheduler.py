@@ -0,0 +1,67 @@
+import time
+
+import pytest
+import requests
+
+from app.scheduler import RequestScheduler
+
+
+class FakeResponse:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def no_sleep(monkeypatch):
+    delays = []
+    monkeypatch.setattr(time, "sleep", delays.append)
+    return delays
+
+
+def test_retries_server_errors_and_closes_failed_responses(no_sleep):
+    scheduler = RequestScheduler(rate=1000, max_retries=3)
+    responses = [FakeResponse(503), FakeResponse(500), FakeResponse(200)]
+    sent = iter(responses)
+    assert scheduler.run(lambda: next(sent)) is responses[2]
+    assert scheduler.retries == 2
+    assert [r.closed for r in responses] == [True, True, False]
+    assert len(no_sleep) == 2
+
+
+def test_returns_last_response_when_retries_are_exhausted(no_sleep):
+    scheduler = RequestScheduler(rate=1000, max_retries=2)
+    assert scheduler.run(lambda: FakeResponse(503)).status_code == 503
+    assert scheduler.retries == 2
+
+
+def test_raises_last_connection_error(no_sleep):
+    scheduler = RequestScheduler(rate=1000, max_retries=1)
+
+    def send():
+        raise requests.ConnectionError("refused")
+
+    with pytest.raises(requests.ConnectionError):
+        scheduler.run(send)
+
+
+def test_backoff_honours_retry_after():
+    scheduler = RequestScheduler(backoff_base=0.001, backoff_max=60)
+    assert scheduler._backoff(0, FakeResponse(429, {"Retry-After": "7"})) == 7
+    assert scheduler._backoff(0, FakeResponse(429, {"Retry-After": "100"})) == 60
+
+
+def test_backoff_ignores_malformed_retry_after():
+    scheduler = RequestScheduler(backoff_base=0.001)
+    assert scheduler._backoff(0, FakeResponse(429, {"Retry-After": "soon"})) <= 0.001
+
+
+def test_throttling_halves_the_rate(no_sleep):
+    scheduler = RequestScheduler(rate=8, max_retries=1)
+    sent = iter([FakeResponse(429), FakeResponse(200)])
+    scheduler.run(lambda: next(sent))
+    assert scheduler.bucket.rate == 4 + 8 / 20
@@ -0,0 +1,115 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.singleflight import AsyncSingleFlight, SingleFlight
+
+
+def test_concurrent_identical_calls_run_once():
+    flight, started, release = SingleFlight(), threading.Event(), threading.Event()
+    runs = []
+
+    def call():
+        runs.append(1)
+        started.set()
+        release.wait(5)
+        return {"price": [1.0]}
+
+    with ThreadPoolExecutor(4) as pool:
+        leader = pool.submit(flight.do, "price", call)
+        assert started.wait(5)
+        followers = [pool.submit(flight.do, "price", call) for _ in range(3)]
+        while flight.calls < 4:
+            time.sleep(0.001)
+        release.set()
+        results = [f.result(5) for f in (leader, *followers)]
+
+    assert len(runs) == 1
+    assert all(r is results[0] for r in results)
+    assert (flight.executed, flight.suppressed) == (1, 3)
+    assert flight._flights == {}
+
+
+def test_exceptions_reach_every_waiter():
+    flight, started, release = SingleFlight(), threading.Event(), threading.Event()
+
+    def call():
+        started.set()
+        release.wait(5)
+        raise ConnectionError("down")
+
+    with ThreadPoolExecutor(3) as pool:
+        leader = pool.submit(flight.do, "price", call)
+        assert started.wait(5)
+        followers = [pool.submit(flight.do, "price", call) for _ in range(2)]
+        while flight.calls < 3:
+            time.sleep(0.001)
+        release.set()
+        for future in (leader, *followers):
+            with pytest.raises(ConnectionError, match="down"):
+                future.result(5)
+    assert flight._flights == {}
+
+
+def test_keys_are_released_after_completion():
+    flight = SingleFlight()
+    assert flight.do("a", lambda: 1) == 1
+    assert flight.do("a", lambda: 2) == 2
+    with pytest.raises(ValueError):
+        flight.do("a", lambda: int("x"))
+    assert flight.do("a", lambda: 3) == 3
+    assert (flight.executed, flight.suppressed, flight._flights) == (4, 0, {})
+
+
+def test_async_identical_calls_run_once_and_share_exceptions():
+    flight = AsyncSingleFlight()
+    runs = []
+
+    async def call():
+        runs.append(1)
+        await asyncio.sleep(0.01)
+        return len(runs)
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ConnectionError("down")
+
+    async def main():
+        results = await asyncio.gather(*(flight.do("price", call) for _ in range(3)))
+        errors = await asyncio.gather(
+            *(flight.do("load", fail) for _ in range(2)), return_exceptions=True
+        )
+        return results, errors
+
+    results, errors = asyncio.run(main())
+    assert results == [1, 1, 1]
+    assert [type(e) for e in errors] == [ConnectionError, ConnectionError]
+    assert (flight.executed, flight.suppressed) == (2, 3)
+    assert flight._flights == {}
+
+
+def test_cancelling_one_async_waiter_keeps_the_shared_call():
+    flight = AsyncSingleFlight()
+
+    async def call():
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def main():
+        leader = asyncio.create_task(flight.do("price", call))
+        follower = asyncio.create_task(flight.do("price", call))
+        await asyncio.sleep(0)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        result = await follower
+        assert flight._flights == {}
+        # A later call with the same key runs again
+        again = await flight.do("price", call)
+        return result, again
+
+    assert asyncio.run(main()) == ("done", "done")
+    assert (flight.executed, flight.suppressed) == (2, 1)
@@ -0,0 +1,91 @@
+import threading
+
+from app.enums import Countries, Endpoints
+from app.store import RangeStore
+
+HOUR = 3600
+START = 1704067200  # 2024-01-01 00:00 UTC, long settled
+
+
+class FakeAPI:
+    """Returns hourly values equal to the timestamp, including the end of the range."""
+
+    def __init__(self):
+        self.calls = []
+
+    def get_range(self, endpoint, start, end, **params):
+        self.calls.append((int(start), int(end), params))
+        seconds = list(range(int(start), int(end) + 1, HOUR))
+        return {"unix_seconds": seconds, "price": [float(s) for s in seconds], "unit": "EUR/MWh"}
+
+
+def test_fetches_only_gaps_and_merges_windows():
+    api = FakeAPI()
+    store = RangeStore(api)
+    store.get(Endpoints.PRICE, str(START), str(START + 4 * HOUR), bzn="DE-LU")
+    store.get(Endpoints.PRICE, str(START + 8 * HOUR), str(START + 12 * HOUR), bzn="DE-LU")
+    response = store.get(Endpoints.PRICE, str(START), str(START + 12 * HOUR), bzn="DE-LU")
+
+    assert [call[:2] for call in api.calls] == [
+        (START, START + 4 * HOUR),
+        (START + 8 * HOUR, START + 12 * HOUR),
+        (START + 4 * HOUR, START + 8 * HOUR),
+    ]
+    expected = list(range(START, START + 13 * HOUR, HOUR))
+    assert list(response["unix_seconds"]) == expected
+    assert list(response["price"]) == [float(s) for s in expected]
+    assert store.intervals(Endpoints.PRICE, bzn="DE-LU") == [(START, START + 12 * HOUR)]
+
+
+def test_queries_do_not_wait_for_each_other():
+    release, entered = threading.Event(), threading.Event()
+
+    class BlockingAPI(FakeAPI):
+        def get_range(self, endpoint, start, end, **params):
+            if params["country"] == Countries.GERMANY.value:
+                entered.set()
+                release.wait(5)
+            return super().get_range(endpoint, start, end, **params)
+
+    store = RangeStore(BlockingAPI())
+    args = (str(START), str(START + HOUR))
+    thread = threading.Thread(target=store.get_total_power, args=(Countries.GERMANY, *args))
+    thread.start()
+    assert entered.wait(5)
+    try:
+        assert store.get_total_power(Countries.FRANCE, *args) is not None
+        assert thread.is_alive()
+    finally:
+        release.set()
+        thread.join()
+
+
+def test_least_recently_used_queries_are_evicted():
+    store = RangeStore(FakeAPI(), max_queries=2)
+    for bzn in ("DE-LU", "FR", "AT"):
+        store.get(Endpoints.PRICE, str(START), str(START + HOUR), bzn=bzn)
+    assert store.intervals(Endpoints.PRICE, bzn="DE-LU") == []
+    assert store.intervals(Endpoints.PRICE, bzn="AT") == [(START, START + HOUR)]
+
+
+def test_adjacent_windows_are_coalesced_on_insert():
+    class ExclusiveAPI(FakeAPI):
+        """Excludes the end of the range, so consecutive windows only adjoin."""
+
+        def get_range(self, endpoint, start, end, **params):
+            response = super().get_range(endpoint, start, end, **params)
+            return {k: v[:-1] if isinstance(v, list) else v for k, v in response.items()}
+
+    store = RangeStore(ExclusiveAPI())
+    for hour in range(0, 12, 2):
+        store.get(
+            Endpoints.PRICE, str(START + hour * HOUR), str(START + (hour + 2) * HOUR), bzn="FR"
+        )
+    store.get(Endpoints.PRICE, str(START + 20 * HOUR), str(START + 22 * HOUR), bzn="FR")
+
+    query = store._queries[store._key(Endpoints.PRICE, {"bzn": "FR"})]
+    assert [w[:2] for w in query.windows] == [
+        (START, START + 11 * HOUR),
+        (START + 20 * HOUR, START + 21 * HOUR),
+    ]
+    assert list(query.windows[0][2]["unix_seconds"]) == list(range(START, START + 12 * HOUR, HOUR))
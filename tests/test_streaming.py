@@ -0,0 +1,53 @@
+import json
+
+import numpy as np
+import pytest
+
+from app.streaming import decode_stream
+
+RESPONSE = {
+    "unix_seconds": [1704067200, 1704068100, 1704069000],
+    "production_types": [
+        {"name": 'Wind "offshore"\\ é', "data": [1.5, None, -2.25e3]},
+        {"name": "Solar", "data": [0, 12, 3.125]},
+        {"name": "Empty", "data": []},
+    ],
+    "unit": "MW",
+    "nested": {"flag": True, "missing": None, "count": -7},
+    "labels": ["a", "b,]"],
+    "deprecated": False,
+}
+
+
+def chunked(body, size):
+    return (body[i : i + size] for i in range(0, len(body), size))
+
+
+def assert_same(decoded, expected):
+    if isinstance(expected, dict):
+        assert decoded.keys() == expected.keys()
+        for key in expected:
+            assert_same(decoded[key], expected[key])
+    elif isinstance(decoded, np.ndarray):
+        np.testing.assert_array_equal(decoded, np.array(expected, dtype=decoded.dtype))
+    elif isinstance(expected, list):
+        assert len(decoded) == len(expected)
+        for value, other in zip(decoded, expected):
+            assert_same(value, other)
+    else:
+        assert decoded == expected and type(decoded) is type(expected)
+
+
+@pytest.mark.parametrize("size", [1, 7, 64, 2**16])
+def test_matches_json_loads_for_any_chunk_size(size):
+    body = json.dumps(RESPONSE, indent=1).encode()
+    decoded = decode_stream(chunked(body, size))
+    assert_same(decoded, json.loads(body))
+    assert decoded["unix_seconds"].dtype == np.int64
+    assert np.isnan(decoded["production_types"][0]["data"][1])
+
+
+def test_truncated_stream_raises():
+    body = json.dumps(RESPONSE).encode()
+    with pytest.raises(ValueError):
+        decode_stream(chunked(body[: len(body) // 2], 16))
@@ -0,0 +1,31 @@
+import numpy as np
+
+from app import timeaxis
+from app.parser import make_dataframe
+
+
+def test_interned_axes_are_bounded_by_bytes(monkeypatch):
+    monkeypatch.setattr(timeaxis, "MAX_BYTES", 10_000)
+    timeaxis.clear()
+    small = timeaxis.axis_from_seconds([1, 2, 4])
+    assert timeaxis.axis_from_seconds([1, 2, 4]) is small
+
+    seconds = np.arange(0, 100_000, dtype=np.int64)
+    make_dataframe({"unix_seconds": seconds, "data": np.zeros(len(seconds))})
+    assert sum(axis.nbytes for axis in timeaxis._axes.values()) <= 10_000
+    assert timeaxis.axis_from_seconds([1, 2, 4]) is small
+
+
+def test_clear_releases_all_axes():
+    axis = timeaxis.axis_from_seconds([10, 20, 30])
+    axis.index()
+    timeaxis.clear()
+    assert not timeaxis._axes
+    assert timeaxis.axis_from_seconds([10, 20, 30]) is not axis
+    assert len(axis.index()) == 3
+
+
+def test_parse_labels():
+    seconds = timeaxis.parse_labels(["01.02.2024", "02.02.2024"])
+    assert seconds.tolist() == [1706745600, 1706832000]
+    assert timeaxis.parse_labels(["2024"]).tolist() == [1704067200]
@@ -0,0 +1,77 @@
+import json
+
+from app.api import EnergyChartsAPI
+from app.enums import Countries
+from app.transport import TransportConfig, ValidatorStore
+
+
+class FakeResponse:
+    def __init__(self, status_code, body=None, headers=None):
+        self.status_code = status_code
+        self.content = json.dumps(body).encode() if body is not None else b""
+        self.headers = headers or {}
+        self.closed = False
+
+    def json(self):
+        return json.loads(self.content)
+
+    def close(self):
+        self.closed = True
+
+
+class FakeSession:
+    """Answers with an ETag and with 304 whenever If-None-Match is sent."""
+
+    def __init__(self):
+        self.sent = []
+
+    def get(self, url, params=None, headers=None, **kwargs):
+        self.sent.append(dict(headers or {}))
+        if headers and "If-None-Match" in headers:
+            return FakeResponse(304, headers={"ETag": '"1"'})
+        return FakeResponse(200, {"unix_seconds": [1], "signal": [2]}, {"ETag": '"1"'})
+
+
+def test_revalidation_is_opt_in():
+    api = EnergyChartsAPI()
+    api.session = FakeSession()
+    api.get_signal(Countries.GERMANY, "79104")
+    api.get_signal(Countries.GERMANY, "79104")
+    assert api.session.sent == [{}, {}]
+    assert api.validators.size == 0
+
+
+def test_304_after_eviction_refetches_unconditionally():
+    api = EnergyChartsAPI(transport=TransportConfig(conditional=True))
+    api.session = FakeSession()
+    first = api.get_signal(Countries.GERMANY, "79104")
+    assert api.get_signal(Countries.GERMANY, "79104") == first
+    assert api.session.sent[-1] == {"If-None-Match": '"1"'}
+
+    # Evict the body but keep sending the validator, as if it was evicted between both steps
+    api.validators.data = lambda key: None
+    assert api.get_signal(Countries.GERMANY, "79104") == first
+    assert api.session.sent[-1] == {}
+
+
+def test_validator_store_is_bounded_by_bytes():
+    store = ValidatorStore(max_entries=10, max_bytes=100)
+    response = FakeResponse(200, headers={"ETag": '"1"'})
+    store.store("a", response, "a", 60)
+    store.store("b", response, "b", 60)
+    assert store.data("a") is None and store.data("b") == "b"
+    store.store("c", response, "c", 101)
+    assert store.data("c") is None
+    assert store.size == 60
+
+
+def test_revalidated_responses_are_copies():
+    api = EnergyChartsAPI(transport=TransportConfig(conditional=True))
+    api.session = FakeSession()
+    first = api.get_signal(Countries.GERMANY, "79104")
+    first["signal"].append(3)
+    second = api.get_signal(Countries.GERMANY, "79104")
+    assert api.session.sent[-1] == {"If-None-Match": '"1"'}
+    assert list(second["signal"]) == [2]
+    second["signal"][0] = 4
+    assert list(api.get_signal(Countries.GERMANY, "79104")["signal"]) == [2]
@@ -0,0 +1,83 @@
+from datetime import timedelta
+
+import pytest
+
+from app.enums import Countries, ForecastType, ProductionType
+from app.vintages import VintageStore
+
+HOUR = 3600
+TARGET = 1704153600  # 2024-01-02 00:00 UTC
+SERIES = (Countries.GERMANY, ProductionType.SOLAR, ForecastType.DAY_AHEAD)
+
+# Forecasts of TARGET and TARGET + 1 hour by retrieval time
+VINTAGES = {
+    TARGET - 24 * HOUR: [100.0, 200.0],
+    TARGET - 6 * HOUR: [110.0, 200.0],
+    TARGET - HOUR: [None, 190.0],
+}
+
+
+def forecast(values):
+    return {"unix_seconds": [TARGET, TARGET + HOUR], "forecast_values": values}
+
+
+@pytest.fixture
+def store():
+    store = VintageStore()
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def recorded(store):
+    stored = [store.record(forecast(v), *SERIES, retrieved=t) for t, v in VINTAGES.items()]
+    assert stored == [2, 1, 2]  # only the changed values are stored
+    return store
+
+
+def test_vintages_are_listed_in_order(recorded):
+    assert recorded.vintages(*SERIES) == list(VINTAGES)
+    assert recorded.vintages("fr", "solar", "day-ahead") == []
+
+
+def test_values_are_looked_up_as_of_a_vintage(recorded):
+    first, second, third = VINTAGES
+    assert recorded.value_at(*SERIES, TARGET, first - 1) is None
+    assert recorded.value_at(*SERIES, TARGET, first) == 100.0
+    assert recorded.value_at(*SERIES, TARGET, third - 1) == 110.0
+    assert recorded.value_at(*SERIES, TARGET + HOUR, third - 1) == 200.0
+    assert recorded.value_at(*SERIES, TARGET, third) is None
+
+    as_of = recorded.as_of(*SERIES, vintage=second, start=TARGET, end=TARGET + HOUR)
+    assert as_of["unix_seconds"] == [TARGET, TARGET + HOUR]
+    assert as_of["forecast_values"] == [110.0, 200.0]
+    latest = recorded.as_of(*SERIES, vintage=third, start=TARGET, end=TARGET)
+    assert latest["forecast_values"] == [None]
+
+
+def test_lead_errors_compare_the_forecast_known_a_lead_time_earlier(recorded):
+    leads = [timedelta(hours=30), timedelta(hours=12), timedelta(hours=3), timedelta(hours=1)]
+    errors = recorded.lead_errors(
+        *SERIES, [TARGET, TARGET + HOUR, TARGET + 2 * HOUR], [105.0, 195.0, 1.0], leads
+    )
+
+    assert errors["lead_seconds"] == [30 * HOUR, 12 * HOUR, 3 * HOUR, HOUR]
+    # 30 h: before the first vintage; 12 h: first vintage, errors -5 and +5;
+    # 3 h: second vintage, errors +5 and +5; 1 h: third vintage, no value for TARGET and -5
+    assert errors["count"] == [0, 2, 2, 1]
+    assert errors["bias"] == [None, 0.0, 5.0, -5.0]
+    assert errors["mae"] == [None, 5.0, 5.0, 5.0]
+    assert errors["rmse"] == [None, 5.0, 5.0, 5.0]
+
+
+def test_fetch_records_a_vintage_retrieved_now(store):
+    class FakeAPI:
+        def get_public_power_forecast(self, *args):
+            self.args = args
+            return forecast([1.0, 2.0])
+
+    api = FakeAPI()
+    store.fetch(api, *SERIES, "2024-01-02", "2024-01-03")
+    assert api.args == (*SERIES, "2024-01-02", "2024-01-03")
+    (vintage,) = store.vintages(*SERIES)
+    assert store.value_at(*SERIES, TARGET + HOUR, vintage) == 2.0